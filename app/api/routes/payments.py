@@ -7,8 +7,7 @@ from app.models.booking import Booking
 from app.models.truck import Truck
 from app.models.load import Load
 from app.models.enums import BookingStatus, PaymentStatus, FreightStatus
-import json
-from app.whatsapp.logger import logger
+from app.whatsapp.logger import log_event
 
 router = APIRouter()
 
@@ -38,15 +37,13 @@ async def handle_payment_webhook(payload: PaymentWebhookPayload, db: AsyncSessio
         if truck and load:
             booking.payment_status = PaymentStatus.PAID
             booking.status = BookingStatus.PAID
-            truck.status = FreightStatus.BOOKED
+            # A truck with capacity left stays open for more loads
+            if truck.status == FreightStatus.RESERVED:
+                truck.status = FreightStatus.BOOKED
             load.status = FreightStatus.BOOKED
             
             await db.commit()
             
-            logger.info(json.dumps({
-                "action": "payment_processed",
-                "reference_id": payload.reference_id,
-                "booking_id": str(booking.id)
-            }))
+            log_event("payment_processed", reference_id=payload.reference_id, booking_id=str(booking.id))
             return {"status": "success"}
     return {"status": "idempotent"}
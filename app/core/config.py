@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -23,6 +24,98 @@ class Settings(BaseSettings):
     WHATSAPP_TOKEN: str = ""
     WHATSAPP_VERIFY_TOKEN: str = ""
     WHATSAPP_PHONE_NUMBER_ID: str = ""
+    # Override to point outbound sends at a local fake Graph API
+    WHATSAPP_API_BASE_URL: str = "https://graph.facebook.com"
+    WHATSAPP_API_VERSION: str = "21.0"
+    # "threads": blocking client on OUTBOUND_WORKERS threads; "async": pooled async client
+    WHATSAPP_TRANSPORT: str = "threads"
+    WHATSAPP_HTTP2: bool = True
+    WHATSAPP_MAX_CONNECTIONS: int = 16
+    WHATSAPP_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    WHATSAPP_KEEPALIVE_EXPIRY: float = 30.0
+    WHATSAPP_CONNECT_TIMEOUT: float = 5.0
+    WHATSAPP_READ_TIMEOUT: float = 10.0
+    WHATSAPP_POOL_TIMEOUT: float = 5.0
+    # Offer match results as a tappable list message; off sends them as plain text
+    WHATSAPP_INTERACTIVE_LISTS: bool = True
+    
+    # Matching
+    LANE_INDEX_ENABLED: bool = True
+    MATCH_TOP_K: int = 5
+    # Most matches one post can page through with MORE (MATCH_TOP_K per page)
+    MATCH_MORE_MAX_RESULTS: int = 50
+    MATCH_WEIGHT_CAPACITY: float = 0.5
+    MATCH_WEIGHT_TIME: float = 0.3
+    MATCH_WEIGHT_RATING: float = 0.2
+    # "city" matches on canonical city ids; "geo" matches origin/destination within a radius
+    MATCHING_MODE: str = "city"
+    GEO_MATCH_RADIUS_KM: float = 50.0
+    GEO_GRID_CELL_DEG: float = 0.5
+    
+    # Batch matcher (periodic global re-pairing of open inventory)
+    BATCH_MATCH_INTERVAL_SECONDS: int = 900
+    BATCH_MATCH_CHUNK_SIZE: int = 5000
+    BATCH_MATCH_PROCESSES: int = 2
+    
+    # Reverse matching alerts on new inventory
+    INVENTORY_EVENT_QUEUE_SIZE: int = 1000
+    INVENTORY_EVENT_PUBLISH_TIMEOUT: float = 0.5
+    NOTIFY_COALESCE_SECONDS: float = 30.0
+    NOTIFY_MAX_PER_SECOND: float = 20.0
+    NOTIFY_MAX_PENDING_USERS: int = 10000
+    
+    # Chained trips (follow-on loads from a truck's destination)
+    CHAIN_MATCHING_ENABLED: bool = True
+    CHAIN_MAX_LEGS: int = 3
+    CHAIN_PICKUP_WINDOW_HOURS: float = 48.0
+    CHAIN_BRANCHING: int = 4
+    CHAIN_AVG_SPEED_KMH: float = 45.0
+    CHAIN_ROAD_FACTOR: float = 1.3
+    CHAIN_DEFAULT_TRANSIT_HOURS: float = 24.0
+    
+    # Outbound WhatsApp sender
+    OUTBOUND_WORKERS: int = 8
+    OUTBOUND_QUEUE_SIZE: int = 5000
+    OUTBOUND_RATE_PER_SECOND: float = 80.0
+    OUTBOUND_BURST: int = 80
+    OUTBOUND_MAX_RETRIES: int = 4
+    OUTBOUND_RETRY_BASE_SECONDS: float = 0.5
+    OUTBOUND_RETRY_MAX_SECONDS: float = 8.0
+    
+    # Incoming webhook dispatcher (keep consumers below the DB pool size)
+    WEBHOOK_CONSUMERS: int = 8
+    WEBHOOK_QUEUE_SIZE: int = 2000
+    WEBHOOK_ENQUEUE_TIMEOUT: float = 2.0
+    WEBHOOK_DRAIN_TIMEOUT: float = 20.0
+    # "memory" (per process) or "postgres" (shared across workers)
+    WEBHOOK_DEDUP_BACKEND: str = "memory"
+    WEBHOOK_DEDUP_TTL_SECONDS: int = 86400
+    WEBHOOK_DEDUP_MAX_ENTRIES: int = 100000
+    
+    # Conversation state cache; "postgres" invalidation is for multi-worker deployments
+    CONVERSATION_CACHE_ENABLED: bool = True
+    CONVERSATION_CACHE_TTL_SECONDS: int = 600
+    CONVERSATION_CACHE_MAX_ENTRIES: int = 50000
+    CONVERSATION_CACHE_INVALIDATION: str = "none"
+    
+    # Abandoned conversation flows are deleted after this much idle time
+    SESSION_TTL_SECONDS: int = 7200
+    SESSION_SWEEP_INTERVAL_SECONDS: int = 300
+    SESSION_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Numbered matches kept for BOOK <n>; "postgres" shares them across workers
+    PENDING_MATCH_BACKEND: str = "memory"
+    PENDING_MATCH_TTL_SECONDS: int = 86400
+    PENDING_MATCH_MAX_USERS: int = 200000
+    
+    # Phone -> user id cache for get_or_create_by_phone
+    USER_ID_CACHE_MAX_ENTRIES: int = 100000
+    
+    # Logging: records are written by a background thread; sampled actions keep only this fraction
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: Dict[str, float] = {"incoming_webhook": 0.01, "message_parsed": 0.1}
     
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated columns with RETURNING during the flush instead of a later refresh
+    __mapper_args__ = {"eager_defaults": True}
 
@@ -20,10 +20,13 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 from app.db.base import Base
 import app.models.user  # Import models here so Alembic can discover them
+import app.models.city
 import app.models.truck
 import app.models.load
 import app.models.booking
 import app.models.conversation_session
+import app.models.processed_message
+import app.models.pending_match
 target_metadata = Base.metadata
 
 from app.core.config import settings
@@ -0,0 +1,90 @@
+"""Add canonical cities and city id columns on trucks/loads
+
+Revision ID: a3c9e1f4b2d7
+Revises: 71234f1c7ec5
+Create Date: 2026-10-17 09:12:41.201733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f4b2d7'
+down_revision: Union[str, Sequence[str], None] = '71234f1c7ec5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must agree with app.services.city_service.normalize_city
+NORMALIZE_SQL = "lower(regexp_replace(btrim({col}), '\\s+', ' ', 'g'))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cities',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('display_name', sa.String(length=100), nullable=False),
+    sa.Column('aliases', postgresql.ARRAY(sa.String(length=100)), nullable=False, server_default='{}'),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cities_key'), 'cities', ['key'], unique=True)
+    op.create_index('ix_cities_aliases', 'cities', ['aliases'], unique=False, postgresql_using='gin')
+
+    op.add_column('trucks', sa.Column('source_city_id', sa.UUID(), nullable=True))
+    op.add_column('trucks', sa.Column('destination_city_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('fk_trucks_source_city_id_cities', 'trucks', 'cities', ['source_city_id'], ['id'])
+    op.create_foreign_key('fk_trucks_destination_city_id_cities', 'trucks', 'cities', ['destination_city_id'], ['id'])
+    op.add_column('loads', sa.Column('pickup_city_id', sa.UUID(), nullable=True))
+    op.add_column('loads', sa.Column('drop_city_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('fk_loads_pickup_city_id_cities', 'loads', 'cities', ['pickup_city_id'], ['id'])
+    op.create_foreign_key('fk_loads_drop_city_id_cities', 'loads', 'cities', ['drop_city_id'], ['id'])
+
+    # Backfill: one canonical city per distinct normalized name, then point rows at it
+    op.execute(f"""
+        INSERT INTO cities (id, key, display_name, aliases, created_at)
+        SELECT gen_random_uuid(), names.key, initcap(names.key), '{{}}', now()
+        FROM (
+            SELECT {NORMALIZE_SQL.format(col='source_city')} AS key FROM trucks
+            UNION SELECT {NORMALIZE_SQL.format(col='destination_city')} FROM trucks
+            UNION SELECT {NORMALIZE_SQL.format(col='pickup_city')} FROM loads
+            UNION SELECT {NORMALIZE_SQL.format(col='drop_city')} FROM loads
+        ) AS names
+        WHERE names.key <> ''
+        ON CONFLICT (key) DO NOTHING
+    """)
+    for table, name_col, id_col in [
+        ('trucks', 'source_city', 'source_city_id'),
+        ('trucks', 'destination_city', 'destination_city_id'),
+        ('loads', 'pickup_city', 'pickup_city_id'),
+        ('loads', 'drop_city', 'drop_city_id'),
+    ]:
+        op.execute(f"""
+            UPDATE {table} SET {id_col} = cities.id
+            FROM cities
+            WHERE cities.key = {NORMALIZE_SQL.format(col=f'{table}.{name_col}')}
+        """)
+
+    op.create_index('ix_trucks_lane_status_departure', 'trucks', ['source_city_id', 'destination_city_id', 'status', 'departure_time'], unique=False)
+    op.create_index('ix_loads_lane_status_deadline', 'loads', ['pickup_city_id', 'drop_city_id', 'status', 'deadline'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loads_lane_status_deadline', table_name='loads')
+    op.drop_index('ix_trucks_lane_status_departure', table_name='trucks')
+    op.drop_constraint('fk_loads_drop_city_id_cities', 'loads', type_='foreignkey')
+    op.drop_constraint('fk_loads_pickup_city_id_cities', 'loads', type_='foreignkey')
+    op.drop_column('loads', 'drop_city_id')
+    op.drop_column('loads', 'pickup_city_id')
+    op.drop_constraint('fk_trucks_destination_city_id_cities', 'trucks', type_='foreignkey')
+    op.drop_constraint('fk_trucks_source_city_id_cities', 'trucks', type_='foreignkey')
+    op.drop_column('trucks', 'destination_city_id')
+    op.drop_column('trucks', 'source_city_id')
+    op.drop_index('ix_cities_aliases', table_name='cities')
+    op.drop_index(op.f('ix_cities_key'), table_name='cities')
+    op.drop_table('cities')
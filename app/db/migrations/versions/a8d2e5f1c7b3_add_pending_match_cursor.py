@@ -0,0 +1,29 @@
+"""Add the MORE paging cursor to pending_matches
+
+Revision ID: a8d2e5f1c7b3
+Revises: f3a6c8e2b9d4
+Create Date: 2026-10-17 20:12:04.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2e5f1c7b3'
+down_revision: Union[str, Sequence[str], None] = 'f3a6c8e2b9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pending_matches', sa.Column('cursor', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pending_matches', 'cursor')
@@ -0,0 +1,34 @@
+"""Add processed_messages for webhook dedup
+
+Revision ID: c4d8f2a61e93
+Revises: a3c9e1f4b2d7
+Create Date: 2026-10-17 16:20:05.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8f2a61e93'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f4b2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('processed_messages',
+    sa.Column('message_id', sa.String(length=128), nullable=False),
+    sa.Column('received_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index(op.f('ix_processed_messages_received_at'), 'processed_messages', ['received_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_processed_messages_received_at'), table_name='processed_messages')
+    op.drop_table('processed_messages')
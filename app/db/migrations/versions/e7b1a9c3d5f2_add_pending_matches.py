@@ -0,0 +1,38 @@
+"""Add unlogged pending_matches table
+
+Revision ID: e7b1a9c3d5f2
+Revises: c4d8f2a61e93
+Create Date: 2026-10-17 17:02:44.913507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b1a9c3d5f2'
+down_revision: Union[str, Sequence[str], None] = 'c4d8f2a61e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED: short-lived, rebuildable state that does not need WAL or replication
+    op.create_table('pending_matches',
+    sa.Column('phone_number', sa.String(length=20), nullable=False),
+    sa.Column('matches', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('phone_number'),
+    prefixes=['UNLOGGED']
+    )
+    op.create_index(op.f('ix_pending_matches_expires_at'), 'pending_matches', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pending_matches_expires_at'), table_name='pending_matches')
+    op.drop_table('pending_matches')
@@ -0,0 +1,27 @@
+"""Index conversation_sessions.updated_at for the idle-session sweeper
+
+Revision ID: f3a6c8e2b9d4
+Revises: e7b1a9c3d5f2
+Create Date: 2026-10-17 18:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6c8e2b9d4'
+down_revision: Union[str, Sequence[str], None] = 'e7b1a9c3d5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_conversation_sessions_updated_at'), 'conversation_sessions', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_conversation_sessions_updated_at'), table_name='conversation_sessions')
@@ -0,0 +1,54 @@
+import inspect
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Session.info key for the actions waiting on the current transaction
+AFTER_COMMIT = "after_commit"
+
+
+def after_commit(db: AsyncSession, action: Callable[[], Any]) -> None:
+    """
+    Run action (sync or async) once the session's current transaction commits.
+
+    Services called with commit=False only flush, so anything outside the
+    database (index updates, cache writes, events) waits here, and is dropped
+    if the transaction rolls back instead.
+    """
+    db.info.setdefault(AFTER_COMMIT, []).append(action)
+
+
+async def when_committed(db: AsyncSession, committed: bool, action: Callable[[], Any]) -> None:
+    """Run action now if the write was just committed, otherwise after the unit of work commits."""
+    if not committed:
+        after_commit(db, action)
+        return
+    result = action()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def save(db: AsyncSession, commit: bool) -> None:
+    """Commit, or with commit=False flush so later statements see the rows and server defaults come back."""
+    if commit:
+        await commit_unit(db)
+    else:
+        await db.flush()
+
+
+async def commit_unit(db: AsyncSession) -> None:
+    """Commit everything staged on the session, then run its after-commit actions in order."""
+    await db.commit()
+    actions = db.info.pop(AFTER_COMMIT, None) or []
+    for action in actions:
+        result = action()
+        if inspect.isawaitable(result):
+            await result
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit(session: Session, previous_transaction) -> None:
+    # Also covers rollbacks issued inside services (e.g. a refused booking)
+    session.info.pop(AFTER_COMMIT, None)
@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.services.city_service import normalize_city
+
+NGRAM = 3
+# Minimum Dice similarity over trigrams for a "did you mean" suggestion
+MIN_SIMILARITY = 0.5
+# Words users append to a city name that carry no signal ("Jaipur city")
+NOISE_WORDS = {"city", "district", "dist", "town"}
+
+
+class Resolution(NamedTuple):
+    name: str
+    score: float
+    exact: bool
+
+
+def _clean(text: str) -> str:
+    key = normalize_city(text)
+    words = [w for w in key.split(" ") if w not in NOISE_WORDS]
+    return " ".join(words) or key
+
+
+def _ngrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return [padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)]
+
+
+class CityResolver:
+    """
+    Typo-tolerant city name resolution over an n-gram inverted index.
+
+    Each known name (and alias) is split into padded trigrams; the index maps a
+    trigram to a NumPy array of the ids of the names containing it. A query
+    concatenates the postings of its own trigrams, counts shared trigrams with one
+    bincount and ranks by Dice similarity, all vectorized.
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, int] = {}
+        self._canonical: List[str] = []
+        self._gram_counts = np.zeros(0, dtype=np.int32)
+        self._postings: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._gram_counts)
+
+    def build(self, names: Iterable[Tuple[str, str]]) -> None:
+        """names: (name or alias, canonical display name) pairs."""
+        self._exact.clear()
+        self._canonical = []
+        gram_counts: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for name, canonical in names:
+            key = normalize_city(name)
+            if key in self._exact:
+                continue
+            key_id = len(self._canonical)
+            self._exact[key] = key_id
+            self._canonical.append(canonical)
+            grams = set(_ngrams(key))
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        self._gram_counts = np.array(gram_counts, dtype=np.int32)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def resolve(self, text: str) -> Optional[Resolution]:
+        key = _clean(text)
+        key_id = self._exact.get(key)
+        if key_id is None:
+            key_id = self._exact.get(normalize_city(text))
+        if key_id is not None:
+            return Resolution(self._canonical[key_id], 1.0, True)
+
+        grams = set(_ngrams(key))
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return None
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._gram_counts))
+        scores = 2.0 * shared / (len(grams) + self._gram_counts)
+        # argmax takes the lowest id on ties, which keeps results deterministic
+        best_id = int(np.argmax(scores))
+        best_score = float(scores[best_id])
+        if best_score < MIN_SIMILARITY:
+            return None
+        return Resolution(self._canonical[best_id], round(best_score, 3), False)
+
+
+city_resolver = CityResolver()
+
+
+def get_city_resolver() -> CityResolver:
+    """The shared resolver, built from the gazetteer on first use."""
+    if not len(city_resolver):
+        from app.geocoding.gazetteer import gazetteer
+        city_resolver.build(gazetteer.iter_names())
+    return city_resolver
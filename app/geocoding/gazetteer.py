@@ -0,0 +1,119 @@
+import bisect
+import csv
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.services.city_service import normalize_city
+from app.whatsapp.logger import log_event
+
+GAZETTEER_PATH = Path(__file__).parent / "data" / "cities.csv"
+
+
+class GeoPoint(NamedTuple):
+    name: str
+    lat: float
+    lng: float
+
+
+class Gazetteer:
+    """
+    Offline city -> coordinates lookup over the bundled gazetteer file.
+
+    Loaded once into flat arrays: coordinates in array('d'), and every normalized
+    name and alias in one sorted key list pointing at its city row. The sorted key
+    list doubles as the prefix index (a prefix is one contiguous bisect range), so
+    lookups never touch the network or the database.
+    """
+
+    def __init__(self, path: Path = GAZETTEER_PATH):
+        self.path = path
+        self.names: List[str] = []
+        self.lat = array("d")
+        self.lng = array("d")
+        self._keys: List[str] = []
+        self._key_rows = array("I")
+        self.loaded = False
+        self.load_stats: Dict[str, Any] = {}
+
+    def load(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+
+        names: List[str] = []
+        lat = array("d")
+        lng = array("d")
+        pairs = []
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                city_row = len(names)
+                names.append(row["name"].strip())
+                lat.append(float(row["lat"]))
+                lng.append(float(row["lng"]))
+                pairs.append((normalize_city(row["name"]), city_row))
+                for alias in filter(None, (row.get("aliases") or "").split("|")):
+                    pairs.append((normalize_city(alias), city_row))
+
+        pairs.sort()
+        self.names, self.lat, self.lng = names, lat, lng
+        self._keys = [key for key, _ in pairs]
+        self._key_rows = array("I", (city_row for _, city_row in pairs))
+        self.loaded = True
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        memory_bytes = tracemalloc.get_traced_memory()[0] - baseline
+        if not tracing:
+            tracemalloc.stop()
+
+        self.load_stats = {
+            "cities": len(self.names),
+            "keys": len(self._keys),
+            "load_ms": round(elapsed_ms, 2),
+            "memory_kib": round(memory_bytes / 1024, 1)
+        }
+        log_event("gazetteer_loaded", **self.load_stats)
+        return self.load_stats
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def _point(self, city_row: int) -> GeoPoint:
+        return GeoPoint(self.names[city_row], self.lat[city_row], self.lng[city_row])
+
+    def lookup(self, name: str) -> Optional[GeoPoint]:
+        """Exact match on the normalized name or any alias."""
+        self._ensure_loaded()
+        key = normalize_city(name)
+        pos = bisect.bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return self._point(self._key_rows[pos])
+        return None
+
+    def iter_names(self) -> Iterator[Tuple[str, str]]:
+        """(normalized name or alias, canonical name) for every key."""
+        self._ensure_loaded()
+        for key, city_row in zip(self._keys, self._key_rows):
+            yield key, self.names[city_row]
+
+    def complete(self, prefix: str, limit: int = 5) -> List[GeoPoint]:
+        """Distinct cities with a name or alias starting with prefix."""
+        self._ensure_loaded()
+        key = normalize_city(prefix)
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + "\uffff")
+        seen = []
+        for city_row in self._key_rows[lo:hi]:
+            if city_row not in seen:
+                seen.append(city_row)
+                if len(seen) == limit:
+                    break
+        return [self._point(city_row) for city_row in seen]
+
+
+gazetteer = Gazetteer()
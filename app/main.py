@@ -28,16 +28,80 @@ async def health_check_full():
         "diagnostics": report
     }
 
+@app.get("/health/metrics")
+async def health_metrics():
+    from app.matching.lane_index import lane_index
+    from app.matching.events import inventory_events
+    from app.whatsapp.notifier import match_notifier
+    from app.whatsapp.outbound import outbound_sender
+    from app.whatsapp.dispatcher import webhook_dispatcher
+    from app.whatsapp.dedup import message_dedup
+    from app.services.session_cache import session_cache
+    from app.whatsapp.match_store import pending_matches
+    from app.services.user_service import user_service
+    from app.workers.session_sweeper import sweeper_metrics
+    from app.whatsapp.logger import log_stats
+    from app.whatsapp.replies import reply_metrics
+    return {
+        "lane_index": lane_index.stats(),
+        "inventory_events": inventory_events.stats(),
+        "match_notifier": match_notifier.stats(),
+        "outbound": outbound_sender.stats(),
+        "webhook_dispatcher": webhook_dispatcher.stats(),
+        "webhook_dedup": message_dedup.stats(),
+        "session_cache": session_cache.stats(),
+        "pending_matches": pending_matches.stats(),
+        "user_id_cache": user_service.cache_stats(),
+        "session_sweeper": sweeper_metrics,
+        "logging": log_stats(),
+        "replies": reply_metrics
+    }
+
 @app.on_event("startup")
 async def startup_event():
     import asyncio
+    import logging
     from app.workers.expiry_worker import start_reservation_expiry_worker
+    from app.workers.batch_matcher import start_batch_matcher_worker
+    from app.workers.session_sweeper import start_session_sweeper_worker
+    from app.matching.events import inventory_events
+    from app.whatsapp.notifier import match_notifier
+    from app.whatsapp.outbound import outbound_sender
+    from app.whatsapp.transport import graph_transport
+    from app.whatsapp.dispatcher import webhook_dispatcher
+    from app.services.session_cache import session_cache
     from app.system.diagnostics import run_startup_diagnostics, format_diagnostic_report
+    from app.db.session import AsyncSessionLocal
+    from app.matching.lane_index import lane_index
+    from app.geocoding.gazetteer import gazetteer
+    from app.geocoding.fuzzy import get_city_resolver
+    from app.whatsapp.logger import log_event
     
-    # 1. Start Workers
+    # 1. Load the offline gazetteer once and report its footprint, then index it for fuzzy lookups
+    stats = gazetteer.load()
+    print(f"Gazetteer loaded: {stats['cities']} cities, {stats['keys']} names in {stats['load_ms']} ms, {stats['memory_kib']} KiB")
+    get_city_resolver()
+    
+    # 2. Warm the in-memory lane index from the database
+    if settings.LANE_INDEX_ENABLED:
+        try:
+            async with AsyncSessionLocal() as db:
+                await lane_index.rebuild(db)
+        except Exception as e:
+            log_event("lane_index_rebuild_failed", level=logging.ERROR, fallback="sql", error=str(e))
+    
+    # 3. Start Workers
+    graph_transport.start()
+    outbound_sender.start()
+    session_cache.start_listener()
+    webhook_dispatcher.start()
     asyncio.create_task(start_reservation_expiry_worker())
+    asyncio.create_task(start_session_sweeper_worker())
+    asyncio.create_task(start_batch_matcher_worker())
+    inventory_events.start()
+    match_notifier.start()
     
-    # 2. Run Diagnostics
+    # 4. Run Diagnostics
     report = await run_startup_diagnostics()
     banner, critical_failure = format_diagnostic_report(report)
     
@@ -45,3 +109,22 @@ async def startup_event():
     
     if critical_failure:
         raise RuntimeError("Critical system failure during startup. Abandoning boot sequence.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.workers.batch_matcher import shutdown_pool
+    from app.matching.events import inventory_events
+    from app.whatsapp.notifier import match_notifier
+    from app.whatsapp.outbound import outbound_sender
+    from app.whatsapp.transport import graph_transport
+    from app.whatsapp.dispatcher import webhook_dispatcher
+    from app.services.session_cache import session_cache
+    # Finish in-flight conversations first; their replies still need the sender
+    await webhook_dispatcher.stop()
+    await session_cache.stop_listener()
+    shutdown_pool()
+    await inventory_events.stop()
+    await match_notifier.stop()
+    # Last: the notifier's final flush goes through the outbound queue
+    await outbound_sender.stop()
+    await graph_transport.close()
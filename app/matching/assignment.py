@@ -0,0 +1,137 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Solver input rows. Plain tuples of primitives so they pickle cheaply into worker processes.
+# truck: (id, source_city_id, destination_city_id, capacity_available, departure_ts, driver_rating, driver_id)
+# load:  (id, pickup_city_id, drop_city_id, weight, deadline_ts, shipper_rating, shipper_id)
+TruckRow = Tuple[str, str, str, float, float, float, str]
+LoadRow = Tuple[str, str, str, float, float, float, str]
+
+
+def score_matrix(
+    trucks: Sequence[TruckRow],
+    loads: Sequence[LoadRow],
+    window_s: float,
+    weights: Tuple[float, float, float],
+    max_rating: float = 5.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized match_score over every truck x load pair on one lane.
+    Returns (scores, compatible) with trucks as rows and loads as columns.
+    """
+    capacity = np.array([t[3] for t in trucks])[:, None]
+    departure = np.array([t[4] for t in trucks])[:, None]
+    truck_rating = np.array([t[5] for t in trucks])[:, None]
+    weight = np.array([l[3] for l in loads])[None, :]
+    deadline = np.array([l[4] for l in loads])[None, :]
+    load_rating = np.array([l[5] for l in loads])[None, :]
+    driver = np.array([t[6] for t in trucks], dtype=object)[:, None]
+    shipper = np.array([l[6] for l in loads], dtype=object)[None, :]
+
+    gap = np.abs(departure - deadline)
+    # Nobody is proposed their own post
+    compatible = (weight <= capacity) & (gap <= window_s) & (driver != shipper)
+
+    w_capacity, w_time, w_rating = weights
+    total = (w_capacity + w_time + w_rating) or 1.0
+    capacity_fit = np.minimum(weight / np.where(capacity > 0, capacity, np.inf), 1.0)
+    time_fit = np.maximum(0.0, 1.0 - gap / window_s)
+    # Both sides' ratings count in a global assignment
+    rating_fit = np.clip((truck_rating + load_rating) / (2 * max_rating), 0.0, 1.0)
+    scores = (w_capacity * capacity_fit + w_time * time_fit + w_rating * rating_fit) / total
+    return np.where(compatible, scores, 0.0), compatible
+
+
+def max_weight_assignment(scores: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Rectangular assignment maximizing total score (Hungarian algorithm, O(n^2 m)
+    with the inner loop vectorized). Returns (row, col) pairs.
+    """
+    transposed = scores.shape[0] > scores.shape[1]
+    if transposed:
+        scores = scores.T
+    n, m = scores.shape
+    if n == 0:
+        return []
+
+    cost = scores.max() - scores
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            used_cols = np.nonzero(used)[0]
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j] != 0]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return pairs
+
+
+def solve_assignment(
+    trucks: Sequence[TruckRow],
+    loads: Sequence[LoadRow],
+    window_s: float,
+    weights: Tuple[float, float, float]
+) -> List[Tuple[str, str, float]]:
+    """
+    Global truck/load pairing maximizing total score.
+
+    Only trucks and loads on the same (source, destination) lane can pair, so the
+    bipartite graph splits into independent per-lane blocks solved separately.
+    Runs in a worker process; returns (truck_id, load_id, score) triples.
+    """
+    lanes_trucks: Dict[Tuple[str, str], List[TruckRow]] = defaultdict(list)
+    lanes_loads: Dict[Tuple[str, str], List[LoadRow]] = defaultdict(list)
+    for truck in trucks:
+        lanes_trucks[(truck[1], truck[2])].append(truck)
+    for load in loads:
+        lanes_loads[(load[1], load[2])].append(load)
+
+    proposals = []
+    for lane, lane_trucks in lanes_trucks.items():
+        lane_loads = lanes_loads.get(lane)
+        if not lane_loads:
+            continue
+        scores, compatible = score_matrix(lane_trucks, lane_loads, window_s, weights)
+        if not compatible.any():
+            continue
+        # Drop rows/columns with no compatible partner before the cubic solve
+        rows = np.nonzero(compatible.any(axis=1))[0]
+        cols = np.nonzero(compatible.any(axis=0))[0]
+        block = scores[np.ix_(rows, cols)]
+        for r, c in max_weight_assignment(block):
+            truck_idx, load_idx = rows[r], cols[c]
+            if compatible[truck_idx, load_idx]:
+                proposals.append((lane_trucks[truck_idx][0], lane_loads[load_idx][0], float(scores[truck_idx, load_idx])))
+    return proposals
@@ -0,0 +1,82 @@
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from app.core.config import settings
+from app.matching.geo_index import has_coordinates, haversine_km
+from app.matching.lane_index import lane_index, IndexedLoad
+
+
+def estimate_transit(from_lat: float, from_lng: float, to_lat: float, to_lng: float) -> timedelta:
+    """Driving time from great-circle distance, road factor and average speed."""
+    if not (has_coordinates(from_lat, from_lng) and has_coordinates(to_lat, to_lng)):
+        return timedelta(hours=settings.CHAIN_DEFAULT_TRANSIT_HOURS)
+    km = float(haversine_km(*map(math.radians, (from_lat, from_lng, to_lat, to_lng)))) * settings.CHAIN_ROAD_FACTOR
+    return timedelta(hours=km / settings.CHAIN_AVG_SPEED_KMH)
+
+
+class TripChain:
+    """Follow-on loads in order, with the estimated idle time between legs."""
+    __slots__ = ("loads", "idle")
+
+    def __init__(self, loads: List[IndexedLoad], idle: timedelta):
+        self.loads = loads
+        self.idle = idle
+
+    @property
+    def tonnage(self) -> float:
+        return sum(load.weight for load in self.loads)
+
+
+def _next_legs(city_id, arrival: datetime, capacity: float, used: Set, owner_id) -> List[IndexedLoad]:
+    window_end = arrival + timedelta(hours=settings.CHAIN_PICKUP_WINDOW_HOURS)
+    candidates = [
+        load for load in lane_index.loads_departing(city_id, arrival, window_end)
+        if load.deadline <= window_end and load.weight <= capacity
+        and load.id not in used and load.shipper_id != owner_id and load.drop_city_id is not None
+    ]
+    # Fullest and soonest first; only the best few branch further
+    return heapq.nsmallest(settings.CHAIN_BRANCHING, candidates, key=lambda load: (-load.weight, load.deadline))
+
+
+def find_chains(truck, max_legs: Optional[int] = None, limit: Optional[int] = None) -> List[TripChain]:
+    """
+    Chains of open loads a truck can pick up after arriving at its destination.
+
+    Each leg starts in the previous leg's drop city, with a pickup day between the
+    estimated arrival and CHAIN_PICKUP_WINDOW_HOURS after it. Lookups go through the
+    lane index's (pickup city, day) adjacency, and only CHAIN_BRANCHING candidates
+    per leg are expanded, so the search is bounded by branching ** legs.
+    """
+    max_legs = max_legs or settings.CHAIN_MAX_LEGS
+    limit = limit or settings.MATCH_TOP_K
+    if not lane_index.ready or truck.destination_city_id is None:
+        return []
+
+    capacity = truck.capacity_total
+    arrival = truck.departure_time + estimate_transit(truck.source_lat, truck.source_lng, truck.dest_lat, truck.dest_lng)
+    chains: List[TripChain] = []
+
+    def extend(city_id, arrival: datetime, path: List[IndexedLoad], used: Set, idle: timedelta) -> None:
+        legs = _next_legs(city_id, arrival, capacity, used, truck.driver_id) if len(path) < max_legs else []
+        if not legs:
+            if path:
+                chains.append(TripChain(list(path), idle))
+            return
+        for load in legs:
+            # Loads are dated by day: same-day pickups count as no wait
+            start = max(load.deadline, arrival)
+            path.append(load)
+            used.add(load.id)
+            extend(
+                load.drop_city_id,
+                start + estimate_transit(load.pickup_lat, load.pickup_lng, load.drop_lat, load.drop_lng),
+                path, used, idle + (start - arrival)
+            )
+            used.discard(load.id)
+            path.pop()
+
+    extend(truck.destination_city_id, arrival, [], set(), timedelta())
+    chains.sort(key=lambda chain: (-len(chain.loads), -chain.tonnage, chain.idle))
+    return chains[:limit]
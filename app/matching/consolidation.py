@@ -0,0 +1,53 @@
+import math
+from typing import List, Sequence
+
+# Weights are packed in units of 0.1 ton
+UNITS_PER_TON = 10
+# Above this many DP cells (loads x capacity units) fall back to first-fit-decreasing
+MAX_DP_CELLS = 200_000
+# Capacity at or below this is treated as a full truck
+CAPACITY_EPSILON = 1e-6
+
+
+def first_fit_decreasing(capacity: float, loads: Sequence) -> List:
+    """Heaviest loads first, taking each one that still fits."""
+    chosen, remaining = [], capacity
+    for load in sorted(loads, key=lambda l: (-l.weight, str(l.id))):
+        if load.weight <= remaining + CAPACITY_EPSILON:
+            chosen.append(load)
+            remaining -= load.weight
+    return chosen
+
+
+def pack_loads(capacity: float, loads: Sequence) -> List:
+    """
+    The subset of loads with the largest combined weight that fits in capacity.
+
+    Solved exactly as a subset-sum over 0.1 ton units when small enough (weights
+    round up, capacity rounds down, so a packed set always really fits), otherwise
+    first-fit-decreasing. Returns loads heaviest first.
+    """
+    if not loads or capacity <= CAPACITY_EPSILON:
+        return []
+    ordered = sorted(loads, key=lambda l: (-l.weight, str(l.id)))
+    units = int(math.floor(capacity * UNITS_PER_TON + CAPACITY_EPSILON))
+    if len(ordered) * units > MAX_DP_CELLS:
+        return first_fit_decreasing(capacity, ordered)
+
+    sizes = [int(math.ceil(l.weight * UNITS_PER_TON - CAPACITY_EPSILON)) for l in ordered]
+    # reachable total -> (previous total, index of the load that got there)
+    reachable = {0: None}
+    for idx, size in enumerate(sizes):
+        if size <= 0 or size > units:
+            continue
+        for total in sorted(reachable, reverse=True):
+            new_total = total + size
+            if new_total <= units and new_total not in reachable:
+                reachable[new_total] = (total, idx)
+
+    best = max(reachable)
+    chosen = []
+    while reachable[best] is not None:
+        best, idx = reachable[best]
+        chosen.append(ordered[idx])
+    return sorted(chosen, key=lambda l: (-l.weight, str(l.id)))
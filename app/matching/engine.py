@@ -1,35 +1,182 @@
-from typing import List
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import timedelta
+from sqlalchemy import select, func
+from app.core.config import settings
 from app.models.truck import Truck
 from app.models.load import Load
+from app.models.user import User
+from app.models.enums import FreightStatus
+from app.matching.lane_index import lane_index
+from app.matching.geo_index import has_coordinates
+from app.matching.scoring import MATCH_WINDOW, RankKey, match_score, top_k_ranked
+from app.matching.consolidation import pack_loads
+from app.matching.chains import TripChain, find_chains
+
+class MatchPage(list):
+    """
+    One page of ranked matches. `after` is the rank key of its last match when more
+    matches follow (pass it back as `after` for the next page), otherwise None.
+    """
+
+    def __init__(self, matches: List = (), after: Optional[RankKey] = None):
+        super().__init__(matches)
+        self.after = after
+
+
+def _next_after(ranked: List[Tuple[RankKey, Any]], k: int) -> Optional[RankKey]:
+    # One extra match is ranked only to tell whether another page exists
+    return ranked[k - 1][0] if len(ranked) > k else None
+
 
 class MatchingEngine:
     @staticmethod
-    async def find_loads_for_truck(db: AsyncSession, truck: Truck) -> List[Load]:
-        query = select(Load).where(
-            Load.pickup_city.ilike(truck.source_city),
-            Load.drop_city.ilike(truck.destination_city),
+    async def find_loads_for_truck(
+        db: AsyncSession, truck: Truck, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> MatchPage:
+        k = limit or settings.MATCH_TOP_K
+        if settings.LANE_INDEX_ENABLED and lane_index.ready:
+            if lane_index.geo and has_coordinates(truck.source_lat, truck.source_lng) and has_coordinates(truck.dest_lat, truck.dest_lng):
+                candidates = lane_index.loads_near_truck(truck)
+            else:
+                candidates = lane_index.loads_for_truck(truck)
+            ranked = top_k_ranked((
+                (match_score(load.weight, truck.capacity_available, truck.departure_time, load.deadline, lane_index.rating(load.shipper_id)), load.id, load)
+                for load in candidates
+            ), k + 1, after)
+            return MatchPage([load for _, load in ranked[:k]], _next_after(ranked, k))
+
+        rows = await MatchingEngine.load_candidates_sql(db, truck)
+        ranked = top_k_ranked((
+            (match_score(row.weight, truck.capacity_available, truck.departure_time, row.deadline, row.rating), row.id, row.id)
+            for row in rows
+        ), k + 1, after)
+        winner_ids = [load_id for _, load_id in ranked[:k]]
+        return MatchPage(await MatchingEngine._fetch_ranked(db, Load, winner_ids), _next_after(ranked, k))
+
+    @staticmethod
+    async def find_trucks_for_load(
+        db: AsyncSession, load: Load, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> MatchPage:
+        k = limit or settings.MATCH_TOP_K
+        if settings.LANE_INDEX_ENABLED and lane_index.ready:
+            if lane_index.geo and has_coordinates(load.pickup_lat, load.pickup_lng) and has_coordinates(load.drop_lat, load.drop_lng):
+                candidates = lane_index.trucks_near_load(load)
+            else:
+                candidates = lane_index.trucks_for_load(load)
+            ranked = top_k_ranked((
+                (match_score(load.weight, truck.capacity_available, truck.departure_time, load.deadline, lane_index.rating(truck.driver_id)), truck.id, truck)
+                for truck in candidates
+            ), k + 1, after)
+            return MatchPage([truck for _, truck in ranked[:k]], _next_after(ranked, k))
+
+        rows = await MatchingEngine.truck_candidates_sql(db, load)
+        ranked = top_k_ranked((
+            (match_score(load.weight, row.capacity_available, row.departure_time, load.deadline, row.rating), row.id, row.id)
+            for row in rows
+        ), k + 1, after)
+        winner_ids = [truck_id for _, truck_id in ranked[:k]]
+        return MatchPage(await MatchingEngine._fetch_ranked(db, Truck, winner_ids), _next_after(ranked, k))
+
+    @staticmethod
+    async def suggest_consolidation(db: AsyncSession, truck: Truck) -> List[Load]:
+        """Loads on the truck's lane that together fill the most of its remaining capacity."""
+        if settings.LANE_INDEX_ENABLED and lane_index.ready:
+            return pack_loads(truck.capacity_available, lane_index.loads_for_truck(truck))
+
+        rows = await MatchingEngine.load_candidates_sql(db, truck)
+        packed = pack_loads(truck.capacity_available, rows)
+        return await MatchingEngine._fetch_ranked(db, Load, [row.id for row in packed])
+
+    @staticmethod
+    def find_trip_chains(truck: Truck) -> List[TripChain]:
+        """Follow-on loads from the truck's destination; needs the lane index."""
+        if not (settings.CHAIN_MATCHING_ENABLED and settings.LANE_INDEX_ENABLED):
+            return []
+        return find_chains(truck)
+
+    @staticmethod
+    async def load_candidates_sql(db: AsyncSession, truck: Truck) -> Sequence:
+        # Only the scoring columns; full rows are loaded for the winners alone
+        query = select(Load.id, Load.weight, Load.deadline, User.rating).join(
+            User, User.id == Load.shipper_id
+        ).where(
+            Load.pickup_city_id == truck.source_city_id,
+            Load.drop_city_id == truck.destination_city_id,
+            Load.status == FreightStatus.OPEN,
             Load.weight <= truck.capacity_available,
-            Load.status == "open",
-            Load.deadline.between(truck.departure_time - timedelta(days=1), truck.departure_time + timedelta(days=1))
-        ).limit(5)
-        
+            Load.deadline.between(truck.departure_time - MATCH_WINDOW, truck.departure_time + MATCH_WINDOW)
+        )
         result = await db.execute(query)
-        return list(result.scalars().all())
+        return result.all()
 
     @staticmethod
-    async def find_trucks_for_load(db: AsyncSession, load: Load) -> List[Truck]:
-        query = select(Truck).where(
-            Truck.source_city.ilike(load.pickup_city),
-            Truck.destination_city.ilike(load.drop_city),
+    async def truck_candidates_sql(db: AsyncSession, load: Load) -> Sequence:
+        query = select(Truck.id, Truck.capacity_available, Truck.departure_time, User.rating).join(
+            User, User.id == Truck.driver_id
+        ).where(
+            Truck.source_city_id == load.pickup_city_id,
+            Truck.destination_city_id == load.drop_city_id,
+            Truck.status == FreightStatus.OPEN,
             Truck.capacity_available >= load.weight,
-            Truck.status == "open",
-            Truck.departure_time.between(load.deadline - timedelta(days=1), load.deadline + timedelta(days=1))
-        ).limit(5)
-        
+            Truck.departure_time.between(load.deadline - MATCH_WINDOW, load.deadline + MATCH_WINDOW)
+        )
         result = await db.execute(query)
-        return list(result.scalars().all())
+        return result.all()
+
+    @staticmethod
+    async def _fetch_ranked(db: AsyncSession, model: Type, ids: List[uuid.UUID]) -> List:
+        if not ids:
+            return []
+        result = await db.execute(select(model).where(model.id.in_(ids)))
+        by_id = {obj.id: obj for obj in result.scalars().all()}
+        return [by_id[i] for i in ids if i in by_id]
+
+    @staticmethod
+    async def _sample_open(db: AsyncSession, model: Type, sample_size: int) -> List:
+        ids = (await db.execute(
+            select(model.id).where(model.status == FreightStatus.OPEN).order_by(func.random()).limit(sample_size)
+        )).scalars().all()
+        if not ids:
+            return []
+        return (await db.execute(select(model).where(model.id.in_(ids)))).scalars().all()
+
+    @staticmethod
+    async def check_index_consistency(db: AsyncSession, sample_size: int = 50) -> Dict[str, Any]:
+        """
+        Compares the full candidate sets of the lane index and the SQL path for a
+        random sample of open trucks and loads, and the open totals against the index.
+        Only the sampled rows are loaded, so this stays cheap on large inventories.
+        """
+        open_trucks = (await db.execute(
+            select(func.count()).select_from(Truck).where(Truck.status == FreightStatus.OPEN)
+        )).scalar_one()
+        open_loads = (await db.execute(
+            select(func.count()).select_from(Load).where(Load.status == FreightStatus.OPEN)
+        )).scalar_one()
+        trucks = await MatchingEngine._sample_open(db, Truck, sample_size)
+        loads = await MatchingEngine._sample_open(db, Load, sample_size)
+
+        mismatches = []
+        for truck in trucks:
+            sql_ids = {row.id for row in await MatchingEngine.load_candidates_sql(db, truck)}
+            index_ids = {m.id for m in lane_index.loads_for_truck(truck)}
+            if sql_ids != index_ids:
+                mismatches.append({"truck_id": str(truck.id), "sql": len(sql_ids), "index": len(index_ids)})
+
+        for load in loads:
+            sql_ids = {row.id for row in await MatchingEngine.truck_candidates_sql(db, load)}
+            index_ids = {m.id for m in lane_index.trucks_for_load(load)}
+            if sql_ids != index_ids:
+                mismatches.append({"load_id": str(load.id), "sql": len(sql_ids), "index": len(index_ids)})
+
+        stats = lane_index.stats()
+        if stats["trucks"] != open_trucks or stats["loads"] != open_loads:
+            mismatches.append({"open_trucks": open_trucks, "open_loads": open_loads, "indexed": stats})
+
+        return {
+            "checked": len(trucks) + len(loads),
+            "mismatches": mismatches
+        }
 
 matching_engine = MatchingEngine()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Any, Dict, NamedTuple, Optional, Union
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.truck import Truck
+from app.models.load import Load
+from app.models.user import User
+from app.matching.lane_index import lane_index, IndexedTruck, IndexedLoad
+from app.whatsapp.formatters import truck_match_details, load_match_details
+from app.whatsapp.logger import logger, log_event
+
+
+class InventoryEvent(NamedTuple):
+    kind: str  # "truck" | "load"
+    item: Union[IndexedTruck, IndexedLoad]
+
+
+class InventoryEventBus:
+    """
+    Bounded queue of "new open inventory" events with a single reverse-matching
+    consumer. Publishers wait up to INVENTORY_EVENT_PUBLISH_TIMEOUT for room
+    (backpressure on bursts) and then drop the event, which is counted.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"published": 0, "dropped": 0, "processed": 0, "counterparts": 0}
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.INVENTORY_EVENT_QUEUE_SIZE)
+        return self._queue
+
+    async def publish_truck(self, truck: Truck) -> None:
+        await self._publish(InventoryEvent("truck", IndexedTruck(truck)))
+
+    async def publish_load(self, load: Load) -> None:
+        await self._publish(InventoryEvent("load", IndexedLoad(load)))
+
+    async def _publish(self, event: InventoryEvent) -> None:
+        if self._task is None:
+            # No consumer running (e.g. scripts, tests): nothing would drain the queue
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self.queue.put(event), timeout=settings.INVENTORY_EVENT_PUBLISH_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.metrics["dropped"] += 1
+                log_event("inventory_event_dropped", level=logging.WARNING, kind=event.kind, id=str(event.item.id))
+                return
+        self.metrics["published"] += 1
+
+    async def _handle(self, event: InventoryEvent) -> None:
+        from app.whatsapp.notifier import match_notifier
+
+        if not lane_index.ready:
+            return
+        # Counterparts come from the lane index, never from a table scan
+        if event.kind == "truck":
+            truck = event.item
+            counterparts = [load for load in lane_index.loads_for_truck(truck) if load.shipper_id != truck.driver_id]
+            owner_ids = {load.shipper_id for load in counterparts}
+        else:
+            load = event.item
+            counterparts = [truck for truck in lane_index.trucks_for_load(load) if truck.driver_id != load.shipper_id]
+            owner_ids = {truck.driver_id for truck in counterparts}
+        if not counterparts:
+            return
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User.id, User.phone_number).where(User.id.in_(owner_ids)))
+            phones = {user_id: phone for user_id, phone in result.all()}
+
+        for counterpart in counterparts:
+            if event.kind == "truck":
+                phone = phones.get(counterpart.shipper_id)
+                my_type, details = "load", truck_match_details(event.item)
+            else:
+                phone = phones.get(counterpart.driver_id)
+                my_type, details = "truck", load_match_details(event.item)
+            if phone:
+                match_notifier.notify(phone, my_type, str(counterpart.id), str(event.item.id), details)
+        self.metrics["counterparts"] += len(counterparts)
+
+    async def run(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                await self._handle(event)
+                self.metrics["processed"] += 1
+            except Exception as e:
+                logger.error(f"Inventory event error: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "queue_depth": self.queue.qsize()}
+
+
+inventory_events = InventoryEventBus()
@@ -0,0 +1,208 @@
+import itertools
+import math
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.matching.scoring import MATCH_WINDOW
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+_EPOCH = datetime(1970, 1, 1)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km. Inputs are radians; scalars and arrays broadcast."""
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def has_coordinates(lat: Optional[float], lng: Optional[float]) -> bool:
+    # 0.0/0.0 is what un-geocoded posts carry
+    return lat is not None and lng is not None and not (lat == 0.0 and lng == 0.0)
+
+
+def _seconds(when: datetime) -> float:
+    return (when - _EPOCH).total_seconds()
+
+
+class _GeoTable:
+    """
+    Column store of open inventory for one side of the market.
+
+    Coordinates live in preallocated NumPy arrays (radians) so distance filters run
+    vectorized; rows are bucketed by the grid cell of their origin so a radius query
+    only gathers the rows of the cells it overlaps. Freed rows are reused.
+    """
+
+    def __init__(self, cell_deg: float, initial_capacity: int = 1024):
+        self.cell_deg = cell_deg
+        self.origin_lat = np.zeros(initial_capacity)
+        self.origin_lng = np.zeros(initial_capacity)
+        self.dest_lat = np.zeros(initial_capacity)
+        self.dest_lng = np.zeros(initial_capacity)
+        self.amount = np.zeros(initial_capacity)
+        self.when = np.zeros(initial_capacity)
+        self.items: List = [None] * initial_capacity
+        self._row_cell: List[Optional[Tuple[int, int]]] = [None] * initial_capacity
+        self._rows: Dict[uuid.UUID, int] = {}
+        self._free: List[int] = []
+        self._high_water = 0
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _cell(self, lat_deg: float, lng_deg: float) -> Tuple[int, int]:
+        return (math.floor(lat_deg / self.cell_deg), math.floor(lng_deg / self.cell_deg))
+
+    def _grow(self) -> None:
+        capacity = len(self.items) * 2
+        for name in ("origin_lat", "origin_lng", "dest_lat", "dest_lng", "amount", "when"):
+            old = getattr(self, name)
+            new = np.zeros(capacity)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.items.extend([None] * (capacity - len(self.items)))
+        self._row_cell.extend([None] * (capacity - len(self._row_cell)))
+
+    def add(self, item, origin: Tuple[float, float], dest: Tuple[float, float], amount: float, when: datetime) -> None:
+        self.remove(item.id)
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._high_water == len(self.items):
+                self._grow()
+            row = self._high_water
+            self._high_water += 1
+
+        self.origin_lat[row] = math.radians(origin[0])
+        self.origin_lng[row] = math.radians(origin[1])
+        self.dest_lat[row] = math.radians(dest[0])
+        self.dest_lng[row] = math.radians(dest[1])
+        self.amount[row] = amount
+        self.when[row] = _seconds(when)
+        self.items[row] = item
+
+        cell = self._cell(*origin)
+        self._row_cell[row] = cell
+        self._cells.setdefault(cell, set()).add(row)
+        self._rows[item.id] = row
+
+    def remove(self, item_id: uuid.UUID) -> None:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        cell = self._row_cell[row]
+        rows = self._cells.get(cell)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self._cells[cell]
+        self.items[row] = None
+        self._row_cell[row] = None
+        self._free.append(row)
+
+    def clear(self) -> None:
+        self.__init__(self.cell_deg)
+
+    def query(
+        self,
+        origin: Tuple[float, float],
+        dest: Tuple[float, float],
+        radius_km: float,
+        when: datetime,
+        min_amount: float = -np.inf,
+        max_amount: float = np.inf
+    ) -> List:
+        lat, lng = origin
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        lng_span = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        lat_lo, lng_lo = self._cell(lat - lat_span, lng - lng_span)
+        lat_hi, lng_hi = self._cell(lat + lat_span, lng + lng_span)
+
+        buckets = (
+            self._cells.get((i, j), ())
+            for i in range(lat_lo, lat_hi + 1)
+            for j in range(lng_lo, lng_hi + 1)
+        )
+        rows = np.fromiter(itertools.chain.from_iterable(buckets), dtype=np.intp)
+        if rows.size == 0:
+            return []
+
+        window = MATCH_WINDOW.total_seconds()
+        t = _seconds(when)
+        amount = self.amount[rows]
+        keep = (
+            (np.abs(self.when[rows] - t) <= window)
+            & (amount >= min_amount)
+            & (amount <= max_amount)
+        )
+        rows = rows[keep]
+        if rows.size == 0:
+            return []
+
+        o_lat, o_lng = math.radians(lat), math.radians(lng)
+        rows = rows[haversine_km(o_lat, o_lng, self.origin_lat[rows], self.origin_lng[rows]) <= radius_km]
+        if rows.size == 0:
+            return []
+
+        d_lat, d_lng = math.radians(dest[0]), math.radians(dest[1])
+        rows = rows[haversine_km(d_lat, d_lng, self.dest_lat[rows], self.dest_lng[rows]) <= radius_km]
+        return [self.items[row] for row in rows.tolist()]
+
+
+class GeoIndex:
+    """Radius matching over open inventory: origin and destination must both be within range."""
+
+    def __init__(self, cell_deg: float):
+        self.trucks = _GeoTable(cell_deg)
+        self.loads = _GeoTable(cell_deg)
+
+    def add_truck(self, entry, truck) -> None:
+        if not (has_coordinates(truck.source_lat, truck.source_lng) and has_coordinates(truck.dest_lat, truck.dest_lng)):
+            return
+        self.trucks.add(
+            entry,
+            (truck.source_lat, truck.source_lng),
+            (truck.dest_lat, truck.dest_lng),
+            truck.capacity_available,
+            truck.departure_time
+        )
+
+    def add_load(self, entry, load) -> None:
+        if not (has_coordinates(load.pickup_lat, load.pickup_lng) and has_coordinates(load.drop_lat, load.drop_lng)):
+            return
+        self.loads.add(
+            entry,
+            (load.pickup_lat, load.pickup_lng),
+            (load.drop_lat, load.drop_lng),
+            load.weight,
+            load.deadline
+        )
+
+    def clear(self) -> None:
+        self.trucks.clear()
+        self.loads.clear()
+
+    def loads_near_truck(self, truck, radius_km: float) -> List:
+        return self.loads.query(
+            (truck.source_lat, truck.source_lng),
+            (truck.dest_lat, truck.dest_lng),
+            radius_km,
+            truck.departure_time,
+            max_amount=truck.capacity_available
+        )
+
+    def trucks_near_load(self, load, radius_km: float) -> List:
+        return self.trucks.query(
+            (load.pickup_lat, load.pickup_lng),
+            (load.drop_lat, load.drop_lng),
+            radius_km,
+            load.deadline,
+            min_amount=load.weight
+        )
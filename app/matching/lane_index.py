@@ -0,0 +1,258 @@
+import bisect
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.truck import Truck
+from app.models.load import Load
+from app.models.user import User
+from app.models.enums import FreightStatus
+from app.matching.scoring import MATCH_WINDOW
+from app.matching.geo_index import GeoIndex
+from app.whatsapp.logger import log_event
+
+DEFAULT_RATING = 5.0
+
+
+class IndexedTruck:
+    """Slim snapshot of an open truck, exposing the attributes the formatters read."""
+    __slots__ = (
+        "id", "driver_id", "source_city", "destination_city", "source_city_id", "destination_city_id",
+        "departure_time", "capacity_available"
+    )
+
+    def __init__(self, truck):
+        self.id = truck.id
+        self.driver_id = truck.driver_id
+        self.source_city = truck.source_city
+        self.destination_city = truck.destination_city
+        self.source_city_id = truck.source_city_id
+        self.destination_city_id = truck.destination_city_id
+        self.departure_time = truck.departure_time
+        self.capacity_available = truck.capacity_available
+
+
+class IndexedLoad:
+    """Slim snapshot of an open load, exposing the attributes the formatters read."""
+    __slots__ = (
+        "id", "shipper_id", "pickup_city", "drop_city", "pickup_city_id", "drop_city_id",
+        "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "deadline", "weight", "category"
+    )
+
+    def __init__(self, load):
+        self.id = load.id
+        self.shipper_id = load.shipper_id
+        self.pickup_city = load.pickup_city
+        self.drop_city = load.drop_city
+        self.pickup_city_id = load.pickup_city_id
+        self.drop_city_id = load.drop_city_id
+        self.pickup_lat = load.pickup_lat
+        self.pickup_lng = load.pickup_lng
+        self.drop_lat = load.drop_lat
+        self.drop_lng = load.drop_lng
+        self.deadline = load.deadline
+        self.weight = load.weight
+        self.category = load.category
+
+
+class _LaneBucket:
+    """Open inventory on one lane, kept sorted by time so a window is two bisects."""
+    __slots__ = ("times", "items")
+
+    def __init__(self):
+        self.times: List[datetime] = []
+        self.items: List = []
+
+    def insert(self, when: datetime, item) -> None:
+        pos = bisect.bisect_right(self.times, when)
+        self.times.insert(pos, when)
+        self.items.insert(pos, item)
+
+    def remove(self, when: datetime, item_id: uuid.UUID) -> None:
+        pos = bisect.bisect_left(self.times, when)
+        while pos < len(self.times) and self.times[pos] == when:
+            if self.items[pos].id == item_id:
+                del self.times[pos]
+                del self.items[pos]
+                return
+            pos += 1
+
+    def window(self, start: datetime, end: datetime) -> List:
+        lo = bisect.bisect_left(self.times, start)
+        hi = bisect.bisect_right(self.times, end)
+        return self.items[lo:hi]
+
+
+class LaneIndex:
+    """
+    In-process index of open trucks and loads keyed by canonical (pickup, drop) city ids.
+
+    The database stays the source of truth: the index is rebuilt on startup and
+    kept current by the write paths that move inventory in or out of 'open'.
+    """
+
+    def __init__(self):
+        self._truck_lanes: Dict[Tuple[uuid.UUID, uuid.UUID], _LaneBucket] = {}
+        self._load_lanes: Dict[Tuple[uuid.UUID, uuid.UUID], _LaneBucket] = {}
+        self._trucks: Dict[uuid.UUID, IndexedTruck] = {}
+        self._loads: Dict[uuid.UUID, IndexedLoad] = {}
+        # Adjacency for chained trips: open loads by (pickup city id, pickup day)
+        self._pickups: Dict[Tuple[uuid.UUID, int], List[IndexedLoad]] = {}
+        # Owner ratings for scoring, so ranking never needs a users lookup
+        self._ratings: Dict[uuid.UUID, float] = {}
+        # Secondary radius index, only maintained when geo matching is enabled
+        self.geo: Optional[GeoIndex] = GeoIndex(settings.GEO_GRID_CELL_DEG) if settings.MATCHING_MODE == "geo" else None
+        self.ready = False
+
+    # --- Maintenance ---
+
+    def upsert_truck(self, truck: Truck) -> None:
+        self.discard_truck(truck.id)
+        if truck.status != FreightStatus.OPEN:
+            return
+        entry = IndexedTruck(truck)
+        if entry.source_city_id is not None and entry.destination_city_id is not None:
+            lane = (entry.source_city_id, entry.destination_city_id)
+            self._truck_lanes.setdefault(lane, _LaneBucket()).insert(entry.departure_time, entry)
+        if self.geo:
+            self.geo.add_truck(entry, truck)
+        self._trucks[entry.id] = entry
+
+    def upsert_load(self, load: Load) -> None:
+        self.discard_load(load.id)
+        if load.status != FreightStatus.OPEN:
+            return
+        entry = IndexedLoad(load)
+        if entry.pickup_city_id is not None and entry.drop_city_id is not None:
+            lane = (entry.pickup_city_id, entry.drop_city_id)
+            self._load_lanes.setdefault(lane, _LaneBucket()).insert(entry.deadline, entry)
+            self._pickups.setdefault((entry.pickup_city_id, entry.deadline.toordinal()), []).append(entry)
+        if self.geo:
+            self.geo.add_load(entry, load)
+        self._loads[entry.id] = entry
+
+    def discard_truck(self, truck_id: uuid.UUID) -> None:
+        entry = self._trucks.pop(truck_id, None)
+        if entry is None:
+            return
+        if self.geo:
+            self.geo.trucks.remove(truck_id)
+        lane = (entry.source_city_id, entry.destination_city_id)
+        bucket = self._truck_lanes.get(lane)
+        if bucket:
+            bucket.remove(entry.departure_time, entry.id)
+            if not bucket.items:
+                del self._truck_lanes[lane]
+
+    def discard_load(self, load_id: uuid.UUID) -> None:
+        entry = self._loads.pop(load_id, None)
+        if entry is None:
+            return
+        if self.geo:
+            self.geo.loads.remove(load_id)
+        lane = (entry.pickup_city_id, entry.drop_city_id)
+        bucket = self._load_lanes.get(lane)
+        if bucket:
+            bucket.remove(entry.deadline, entry.id)
+            if not bucket.items:
+                del self._load_lanes[lane]
+        day = (entry.pickup_city_id, entry.deadline.toordinal())
+        departing = self._pickups.get(day)
+        if departing:
+            departing[:] = [load for load in departing if load.id != load_id]
+            if not departing:
+                del self._pickups[day]
+
+    def set_rating(self, user_id: uuid.UUID, rating: float) -> None:
+        self._ratings[user_id] = rating
+
+    def rating(self, user_id: uuid.UUID) -> float:
+        return self._ratings.get(user_id, DEFAULT_RATING)
+
+    def has_rating(self, user_id: uuid.UUID) -> bool:
+        return user_id in self._ratings
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        started = time.perf_counter()
+        self._truck_lanes.clear()
+        self._load_lanes.clear()
+        self._pickups.clear()
+        self._trucks.clear()
+        self._loads.clear()
+        self._ratings.clear()
+        if self.geo:
+            self.geo.clear()
+
+        trucks = await db.execute(select(Truck).where(Truck.status == FreightStatus.OPEN))
+        for truck in trucks.scalars():
+            self.upsert_truck(truck)
+
+        loads = await db.execute(select(Load).where(Load.status == FreightStatus.OPEN))
+        for load in loads.scalars():
+            self.upsert_load(load)
+
+        ratings = await db.execute(select(User.id, User.rating).where(or_(
+            User.id.in_(select(Truck.driver_id).where(Truck.status == FreightStatus.OPEN)),
+            User.id.in_(select(Load.shipper_id).where(Load.status == FreightStatus.OPEN))
+        )))
+        for user_id, rating in ratings:
+            self._ratings[user_id] = rating
+
+        self.ready = True
+        log_event(
+            "lane_index_rebuilt",
+            trucks=len(self._trucks),
+            loads=len(self._loads),
+            lanes=len(self._truck_lanes) + len(self._load_lanes),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
+
+    # --- Lookups ---
+
+    def loads_for_truck(self, truck: Truck) -> List[IndexedLoad]:
+        bucket = self._load_lanes.get((truck.source_city_id, truck.destination_city_id))
+        if not bucket:
+            return []
+        candidates = bucket.window(truck.departure_time - MATCH_WINDOW, truck.departure_time + MATCH_WINDOW)
+        return [load for load in candidates if load.weight <= truck.capacity_available]
+
+    def trucks_for_load(self, load: Load) -> List[IndexedTruck]:
+        bucket = self._truck_lanes.get((load.pickup_city_id, load.drop_city_id))
+        if not bucket:
+            return []
+        candidates = bucket.window(load.deadline - MATCH_WINDOW, load.deadline + MATCH_WINDOW)
+        return [truck for truck in candidates if truck.capacity_available >= load.weight]
+
+    def loads_departing(self, city_id: uuid.UUID, start: datetime, end: datetime) -> List[IndexedLoad]:
+        """Open loads picked up in a city on the days from start to end (by pickup day)."""
+        loads = []
+        for day in range(start.toordinal(), end.toordinal() + 1):
+            loads.extend(self._pickups.get((city_id, day), ()))
+        return loads
+
+    def trucks_near_load(self, load: Load) -> List[IndexedTruck]:
+        return self.geo.trucks_near_load(load, settings.GEO_MATCH_RADIUS_KM)
+
+    def loads_near_truck(self, truck: Truck) -> List[IndexedLoad]:
+        return self.geo.loads_near_truck(truck, settings.GEO_MATCH_RADIUS_KM)
+
+    def stats(self) -> Dict[str, int]:
+        stats = {
+            "ready": self.ready,
+            "trucks": len(self._trucks),
+            "loads": len(self._loads),
+            "truck_lanes": len(self._truck_lanes),
+            "load_lanes": len(self._load_lanes)
+        }
+        if self.geo:
+            stats["geo_trucks"] = len(self.geo.trucks)
+            stats["geo_loads"] = len(self.geo.loads)
+        return stats
+
+
+lane_index = LaneIndex()
@@ -0,0 +1,56 @@
+import heapq
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Trucks and loads match when departure_time and deadline are within this window
+MATCH_WINDOW = timedelta(days=1)
+MAX_RATING = 5.0
+
+
+def match_score(weight: float, capacity: float, departure_time: datetime, deadline: datetime, rating: float) -> float:
+    """
+    Weighted score in [0, 1] for pairing a load with a truck, seen from either side.
+
+    - capacity fit: share of the truck's available capacity the load fills
+    - time fit: how close the departure is to the deadline within MATCH_WINDOW
+    - rating: the counterpart's User.rating
+    """
+    capacity_fit = min(weight / capacity, 1.0) if capacity > 0 else 0.0
+    time_fit = max(0.0, 1.0 - abs((departure_time - deadline).total_seconds()) / MATCH_WINDOW.total_seconds())
+    rating_fit = min(max(rating / MAX_RATING, 0.0), 1.0)
+
+    total_weight = settings.MATCH_WEIGHT_CAPACITY + settings.MATCH_WEIGHT_TIME + settings.MATCH_WEIGHT_RATING
+    if total_weight <= 0:
+        return 0.0
+    return (
+        settings.MATCH_WEIGHT_CAPACITY * capacity_fit
+        + settings.MATCH_WEIGHT_TIME * time_fit
+        + settings.MATCH_WEIGHT_RATING * rating_fit
+    ) / total_weight
+
+
+# (score, id as str): the order matches are ranked in, highest first
+RankKey = Tuple[float, str]
+
+
+def rank_key(entry: Tuple[float, uuid.UUID, T]) -> RankKey:
+    return entry[0], str(entry[1])
+
+
+def top_k_ranked(scored: Iterable[Tuple[float, uuid.UUID, T]], k: int, after: Optional[RankKey] = None) -> List[Tuple[RankKey, T]]:
+    """
+    Best k items from (score, id, item) tuples, highest score first, with their rank keys.
+
+    heapq.nlargest keeps a bounded heap of size k, so the candidate set is never
+    sorted or held in full. Ties are broken on the id so results are deterministic.
+    With `after`, only items ranked below that key count: the next page after an
+    item, without ranking and skipping the pages before it.
+    """
+    if after is not None:
+        scored = (entry for entry in scored if rank_key(entry) < after)
+    return [(rank_key(entry), entry[2]) for entry in heapq.nlargest(k, scored, key=rank_key)]
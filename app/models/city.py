@@ -0,0 +1,26 @@
+import uuid
+from typing import List
+from sqlalchemy import String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from datetime import datetime
+from app.db.base import Base
+
+
+class City(Base):
+    __tablename__ = "cities"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    # Normalized lookup key (see city_service.normalize_city)
+    key: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    display_name: Mapped[str] = mapped_column(String(100))
+    aliases: Mapped[List[str]] = mapped_column(ARRAY(String(100)), default=list)
+
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_cities_aliases", "aliases", postgresql_using="gin"),
+    )
@@ -15,6 +15,7 @@ class ConversationSession(Base):
     current_flow: Mapped[str] = mapped_column(String(50))
     current_step: Mapped[str] = mapped_column(String(50))
     collected_data: Mapped[dict] = mapped_column(JSONB, default=dict)
+    # Indexed for the idle-session sweeper
     updated_at: Mapped[datetime] = mapped_column(
-        default=datetime.utcnow, onupdate=datetime.utcnow
+        default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
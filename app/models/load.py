@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -20,6 +20,13 @@ class Load(Base):
     pickup_city: Mapped[str] = mapped_column(String, index=True)
     drop_city: Mapped[str] = mapped_column(String, index=True)
 
+    pickup_city_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cities.id"), nullable=True
+    )
+    drop_city_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cities.id"), nullable=True
+    )
+
     pickup_lat: Mapped[float]
     pickup_lng: Mapped[float]
     drop_lat: Mapped[float]
@@ -34,3 +41,8 @@ class Load(Base):
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
     shipper = relationship("User")
+
+    __table_args__ = (
+        # Equality lane match + time range scan used by MatchingEngine
+        Index("ix_loads_lane_status_deadline", "pickup_city_id", "drop_city_id", "status", "deadline"),
+    )
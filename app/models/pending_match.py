@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from app.db.base import Base
+
+
+class PendingMatchRow(Base):
+    """Numbered matches last shown to a phone, for BOOK <n> on any worker. Unlogged: rebuildable state."""
+    __tablename__ = "pending_matches"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    phone_number: Mapped[str] = mapped_column(String(20), primary_key=True)
+    # [[match_id, my_id, my_type, details], ...]
+    matches: Mapped[list] = mapped_column(JSONB)
+    # [my_type, my_id, score, last_id] of the last match shown, when MORE has another page
+    cursor: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class ProcessedMessage(Base):
+    """WhatsApp message ids already accepted by some worker, for cross-process webhook dedup."""
+    __tablename__ = "processed_messages"
+
+    message_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    received_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, index=True)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -20,6 +20,13 @@ class Truck(Base):
     source_city: Mapped[str] = mapped_column(String, index=True)
     destination_city: Mapped[str] = mapped_column(String, index=True)
 
+    source_city_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cities.id"), nullable=True
+    )
+    destination_city_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cities.id"), nullable=True
+    )
+
     source_lat: Mapped[float] = mapped_column(Float)
     source_lng: Mapped[float] = mapped_column(Float)
     dest_lat: Mapped[float] = mapped_column(Float)
@@ -34,3 +41,8 @@ class Truck(Base):
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
     driver = relationship("User")
+
+    __table_args__ = (
+        # Equality lane match + time range scan used by MatchingEngine
+        Index("ix_trucks_lane_status_departure", "source_city_id", "destination_city_id", "status", "departure_time"),
+    )
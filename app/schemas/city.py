@@ -0,0 +1,27 @@
+import uuid
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class CityBase(BaseModel):
+    key: str = Field(..., max_length=100)
+    display_name: str = Field(..., max_length=100)
+    aliases: List[str] = Field(default_factory=list)
+
+
+class CityCreate(CityBase):
+    pass
+
+
+class CityUpdate(BaseModel):
+    display_name: Optional[str] = Field(None, max_length=100)
+    aliases: Optional[List[str]] = None
+
+
+class CityResponse(CityBase):
+    id: uuid.UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -16,6 +16,8 @@ class LoadBase(BaseModel):
     category: str
     deadline: datetime
     status: str = "open"
+    pickup_city_id: Optional[uuid.UUID] = None
+    drop_city_id: Optional[uuid.UUID] = None
 
 
 class LoadCreate(LoadBase):
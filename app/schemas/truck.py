@@ -16,6 +16,8 @@ class TruckBase(BaseModel):
     capacity_total: float
     capacity_available: float
     status: str = "open"
+    source_city_id: Optional[uuid.UUID] = None
+    destination_city_id: Optional[uuid.UUID] = None
 
 
 class TruckCreate(TruckBase):
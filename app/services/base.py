@@ -3,6 +3,7 @@ from pydantic import BaseModel
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.db.unit_of_work import save
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -23,12 +24,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
+        """With commit=False the row is flushed but left for the caller's unit of work to commit."""
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        # Defaults come back with the INSERT (RETURNING), so no refresh round trip
+        await save(db, commit)
         return db_obj
 
     async def update(
@@ -36,18 +38,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: AsyncSession,
         *,
         db_obj: ModelType,
-        obj_in: UpdateSchemaType
+        obj_in: UpdateSchemaType,
+        commit: bool = True
     ) -> ModelType:
         obj_data = obj_in.model_dump(exclude_unset=True)
         for field in obj_data:
             setattr(db_obj, field, obj_data[field])
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await save(db, commit)
         return db_obj
 
-    async def remove(self, db: AsyncSession, *, id: uuid.UUID) -> ModelType:
+    async def remove(self, db: AsyncSession, *, id: uuid.UUID, commit: bool = True) -> ModelType:
         obj = await self.get(db, id)
         await db.delete(obj)
-        await db.commit()
+        await save(db, commit)
         return obj
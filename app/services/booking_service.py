@@ -12,24 +12,34 @@ from app.models.load import Load
 from app.models.enums import BookingStatus, PaymentStatus, FreightStatus
 from app.schemas.booking import BookingCreate, BookingUpdate
 from app.services.base import CRUDBase
+from app.matching.lane_index import lane_index
+from app.matching.consolidation import CAPACITY_EPSILON
+from app.db.unit_of_work import save, when_committed
+
+def booking_reference(truck_id: uuid.UUID, load_id: uuid.UUID) -> str:
+    # Deterministic Idempotency Reference
+    # (Concatenates truck and load ID to prevent duplicate exact pairings in quick succession)
+    raw_ref = f"{truck_id}_{load_id}"
+    return f"BKG-{hashlib.md5(raw_ref.encode()).hexdigest()[:8].upper()}"
 
 class CRUDBooking(CRUDBase[Booking, BookingCreate, BookingUpdate]):
+    async def get_by_pair(self, db: AsyncSession, truck_id: uuid.UUID, load_id: uuid.UUID) -> Optional[Booking]:
+        existing_stmt = select(Booking).where(Booking.booking_reference_id == booking_reference(truck_id, load_id))
+        existing_res = await db.execute(existing_stmt)
+        return existing_res.scalars().first()
+
     async def create_atomic_booking(
         self,
         db: AsyncSession,
         truck_id: uuid.UUID,
         load_id: uuid.UUID,
-        price: float
+        price: float,
+        commit: bool = True
     ) -> Tuple[Optional[Booking], Optional[str]]:
-        # Deterministic Idempotency Reference 
-        # (Concatenates truck and load ID to prevent duplicate exact pairings in quick succession)
-        raw_ref = f"{truck_id}_{load_id}"
-        reference_id = f"BKG-{hashlib.md5(raw_ref.encode()).hexdigest()[:8].upper()}"
+        reference_id = booking_reference(truck_id, load_id)
         
         # Immediate Idempotency Check
-        existing_stmt = select(Booking).where(Booking.booking_reference_id == reference_id)
-        existing_res = await db.execute(existing_stmt)
-        existing_booking = existing_res.scalars().first()
+        existing_booking = await self.get_by_pair(db, truck_id, load_id)
         if existing_booking:
             return existing_booking, None
 
@@ -50,6 +60,11 @@ class CRUDBooking(CRUDBase[Booking, BookingCreate, BookingUpdate]):
         if truck.status != FreightStatus.OPEN or load.status != FreightStatus.OPEN:
             await db.rollback()
             return None, "Truck or Load is no longer available."
+
+        # Consolidation: a truck carries several loads as long as their combined weight fits
+        if load.weight > truck.capacity_available + CAPACITY_EPSILON:
+            await db.rollback()
+            return None, "Truck does not have enough capacity left for this load."
             
         booking = Booking(
             truck_id=truck.id,
@@ -62,16 +77,24 @@ class CRUDBooking(CRUDBase[Booking, BookingCreate, BookingUpdate]):
             payment_reference_id=None,
             payment_expires_at=datetime.utcnow() + timedelta(minutes=15)
         )
-        truck.status = FreightStatus.RESERVED
+        truck.capacity_available = max(truck.capacity_available - load.weight, 0.0)
+        if truck.capacity_available <= CAPACITY_EPSILON:
+            truck.status = FreightStatus.RESERVED
         load.status = FreightStatus.RESERVED
         
         db.add(booking)
         db.add(truck)
         db.add(load)
         
-        await db.commit()
-        await db.refresh(booking)
+        await save(db, commit)
+        
+        # Re-index the truck with its remaining capacity (drops it once full)
+        await when_committed(db, commit, lambda: self._reindex(truck, load))
         
         return booking, None
 
+    def _reindex(self, truck: Truck, load: Load) -> None:
+        lane_index.upsert_truck(truck)
+        lane_index.discard_load(load.id)
+
 booking_service = CRUDBooking(Booking)
@@ -0,0 +1,56 @@
+import uuid
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert
+from app.models.city import City
+from app.schemas.city import CityCreate, CityUpdate
+from app.services.base import CRUDBase
+
+
+def normalize_city(name: str) -> str:
+    """Canonical lookup key for a free-text city: case-insensitive, whitespace collapsed."""
+    return " ".join(name.split()).lower()
+
+
+class CRUDCity(CRUDBase[City, CityCreate, CityUpdate]):
+    def __init__(self, model):
+        super().__init__(model)
+        # key/alias -> city id. Cities are append-only, so committed entries never go stale.
+        self._id_cache: Dict[str, uuid.UUID] = {}
+
+    async def get_by_name(self, db: AsyncSession, name: str) -> Optional[City]:
+        key = normalize_city(name)
+        result = await db.execute(
+            select(self.model).where(or_(self.model.key == key, self.model.aliases.contains([key])))
+        )
+        return result.scalars().first()
+
+    async def resolve_id(self, db: AsyncSession, name: str) -> uuid.UUID:
+        """
+        Returns the canonical city id for a free-text name, registering a new city
+        when neither a key nor an alias matches. Does not commit; the caller's
+        transaction owns the insert.
+        """
+        key = normalize_city(name)
+        city_id = self._id_cache.get(key)
+        if city_id:
+            return city_id
+
+        city = await self.get_by_name(db, name)
+        if city:
+            self._id_cache[key] = city.id
+            return city.id
+
+        # Not cached until a later lookup sees it committed, in case this transaction rolls back
+        stmt = insert(self.model).values(
+            key=key,
+            display_name=" ".join(name.split()).title(),
+            aliases=[]
+        ).on_conflict_do_update(
+            index_elements=['key'],
+            set_={'key': key}
+        ).returning(self.model.id)
+        return (await db.execute(stmt)).scalar_one()
+
+city_service = CRUDCity(City)
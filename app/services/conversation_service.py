@@ -1,76 +1,110 @@
 import uuid
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from sqlalchemy.dialects.postgresql import insert
-import json
-from app.whatsapp.logger import logger
+from sqlalchemy import select, delete, update, func, literal
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from app.whatsapp.logger import log_event
 from app.models.conversation_session import ConversationSession
 from app.schemas.conversation_session import ConversationSessionCreate, ConversationSessionUpdate
 from app.services.base import CRUDBase
+from app.db.unit_of_work import commit_unit, when_committed
+from app.services.session_cache import session_cache, CachedSession, INVALIDATION_CHANNEL
+
+SessionState = Union[ConversationSession, CachedSession]
 
 class CRUDConversationSession(CRUDBase[ConversationSession, ConversationSessionCreate, ConversationSessionUpdate]):
-    
-    async def get_active_session(self, db: AsyncSession, phone_number: str) -> Optional[ConversationSession]:
+
+    async def get_active_session(self, db: AsyncSession, phone_number: str) -> Optional[SessionState]:
+        if session_cache.enabled:
+            hit, state = session_cache.get(phone_number)
+            if hit:
+                return state
         result = await db.execute(select(self.model).where(self.model.phone_number == phone_number))
-        return result.scalars().first()
+        session_obj = result.scalars().first()
+        if session_cache.enabled:
+            session_cache.put(phone_number, CachedSession.from_row(session_obj) if session_obj else None)
+        return session_obj
 
-    async def start_session(self, db: AsyncSession, phone_number: str, flow: str, step: str) -> ConversationSession:
+    async def _commit(self, db: AsyncSession, phone_number: str, state: Optional[CachedSession], commit: bool) -> None:
+        """
+        Commit a session write, telling other processes to drop their cached copy,
+        then write the new state through the cache. With commit=False the cache is
+        written once the caller's unit of work commits.
+        """
+        try:
+            if session_cache.notify_enabled:
+                # NOTIFY is transactional: delivered only if the write commits
+                await db.execute(select(func.pg_notify(INVALIDATION_CHANNEL, session_cache.notify_payload(phone_number))))
+            if commit:
+                await commit_unit(db)
+        except Exception:
+            session_cache.invalidate(phone_number)
+            raise
+        if session_cache.enabled:
+            await when_committed(db, commit, lambda: session_cache.put(phone_number, state))
+
+    async def start_session(
+        self, db: AsyncSession, phone_number: str, flow: str, step: str, data: Optional[Dict[str, Any]] = None,
+        commit: bool = True
+    ) -> ConversationSession:
         # PostgreSQL UPSERT logic to ensure only one session per phone number
+        collected_data = data or {}
         stmt = insert(self.model).values(
             phone_number=phone_number,
             current_flow=flow,
             current_step=step,
-            collected_data={}
+            collected_data=collected_data
         )
-        
-        # On conflict (phone_number), overwrite with new flow
+
+        # On conflict (phone_number), overwrite with new flow and its initial data
         stmt = stmt.on_conflict_do_update(
             index_elements=['phone_number'],
             set_={
                 'current_flow': flow,
                 'current_step': step,
-                'collected_data': {}
+                'collected_data': collected_data,
+                'updated_at': datetime.utcnow()
             }
         ).returning(self.model)
-        
+
         result = await db.execute(stmt)
-        await db.commit()
         session_obj = result.scalars().first()
-        
-        logger.info(json.dumps({
-            "action": "session_started",
-            "phone": phone_number,
-            "flow": flow,
-            "step": step
-        }))
-        
+        await self._commit(db, phone_number, CachedSession.from_row(session_obj), commit)
+
+        log_event("session_started", phone=phone_number, flow=flow, step=step)
+
         return session_obj
 
-    async def update_step(self, db: AsyncSession, phone_number: str, step: str, new_data: Dict[str, Any]) -> Optional[ConversationSession]:
-        session_obj = await self.get_active_session(db, phone_number)
-        if not session_obj:
+    async def update_step(
+        self, db: AsyncSession, phone_number: str, step: str, new_data: Dict[str, Any], commit: bool = True
+    ) -> Optional[ConversationSession]:
+        # One atomic statement: Postgres merges the JSONB under the row lock, so
+        # concurrent steps cannot overwrite each other's keys
+        stmt = (
+            update(self.model)
+            .where(self.model.phone_number == phone_number)
+            .values(
+                current_step=step,
+                collected_data=self.model.collected_data.op("||", return_type=JSONB)(literal(new_data, JSONB))
+            )
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        session_obj = result.scalars().first()
+        if session_obj is None:
+            if commit:
+                await commit_unit(db)
+            session_cache.invalidate(phone_number)
             return None
-            
-        # Update JSONB data explicitly by merging dicts
-        updated_data = dict(session_obj.collected_data)
-        updated_data.update(new_data)
-        
-        session_obj.current_step = step
-        session_obj.collected_data = updated_data
-        
-        db.add(session_obj)
-        await db.commit()
-        await db.refresh(session_obj)
+        await self._commit(db, phone_number, CachedSession.from_row(session_obj), commit)
         return session_obj
 
-    async def clear_session(self, db: AsyncSession, phone_number: str) -> None:
+    async def clear_session(self, db: AsyncSession, phone_number: str, commit: bool = True) -> None:
         await db.execute(delete(self.model).where(self.model.phone_number == phone_number))
-        await db.commit()
-        
-        logger.info(json.dumps({
-            "action": "session_cleared",
-            "phone": phone_number
-        }))
+        await self._commit(db, phone_number, None, commit)
+
+        log_event("session_cleared", phone=phone_number)
 
 conversation_service = CRUDConversationSession(ConversationSession)
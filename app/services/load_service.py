@@ -1,13 +1,41 @@
 from typing import Tuple, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.load import Load
+from app.models.user import User
 from app.schemas.load import LoadCreate, LoadUpdate
 from app.services.base import CRUDBase
+from app.matching.lane_index import lane_index
+from app.services.city_service import city_service
+from app.matching.events import inventory_events
+from app.db.unit_of_work import when_committed
 
 class CRUDLoad(CRUDBase[Load, LoadCreate, LoadUpdate]):
-    async def create_with_matches(self, db: AsyncSession, *, obj_in: LoadCreate) -> Tuple[Load, List]:
+    async def create(self, db: AsyncSession, *, obj_in: LoadCreate, commit: bool = True) -> Load:
+        if obj_in.pickup_city_id is None:
+            obj_in.pickup_city_id = await city_service.resolve_id(db, obj_in.pickup_city)
+        if obj_in.drop_city_id is None:
+            obj_in.drop_city_id = await city_service.resolve_id(db, obj_in.drop_city)
+        # Owners from get_or_create_by_phone are already rated; skip the users lookup
+        if not lane_index.has_rating(obj_in.shipper_id):
+            owner = await db.get(User, obj_in.shipper_id)
+            if owner:
+                lane_index.set_rating(owner.id, owner.rating)
+        load = await super().create(db=db, obj_in=obj_in, commit=commit)
+        await when_committed(db, commit, lambda: self._publish(load))
+        return load
+
+    async def _publish(self, load: Load) -> None:
+        lane_index.upsert_load(load)
+        await inventory_events.publish_load(load)
+
+    async def update(self, db: AsyncSession, *, db_obj: Load, obj_in: LoadUpdate, commit: bool = True) -> Load:
+        load = await super().update(db=db, db_obj=db_obj, obj_in=obj_in, commit=commit)
+        await when_committed(db, commit, lambda: lane_index.upsert_load(load))
+        return load
+
+    async def create_with_matches(self, db: AsyncSession, *, obj_in: LoadCreate, commit: bool = True) -> Tuple[Load, List]:
         from app.matching.engine import matching_engine
-        load = await super().create(db=db, obj_in=obj_in)
+        load = await self.create(db=db, obj_in=obj_in, commit=commit)
         matches = await matching_engine.find_trucks_for_load(db, load=load)
         return load, matches
 
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.whatsapp.logger import logger, log_event
+
+# Postgres NOTIFY channel for cross-process invalidation
+INVALIDATION_CHANNEL = "conversation_session_changed"
+
+
+class CachedSession:
+    """Read-only snapshot of a ConversationSession row, with the attributes the engine reads."""
+    __slots__ = ("phone_number", "current_flow", "current_step", "collected_data", "updated_at")
+
+    def __init__(self, phone_number: str, current_flow: str, current_step: str, collected_data: Dict[str, Any], updated_at: datetime):
+        self.phone_number = phone_number
+        self.current_flow = current_flow
+        self.current_step = current_step
+        self.collected_data = collected_data
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_row(cls, row) -> "CachedSession":
+        return cls(row.phone_number, row.current_flow, row.current_step, dict(row.collected_data or {}), row.updated_at)
+
+
+class SessionStateCache:
+    """
+    Bounded LRU of conversation state by phone, entries expiring after
+    CONVERSATION_CACHE_TTL_SECONDS. Phones with no session are cached too (as None),
+    since most messages from idle users are exactly that lookup.
+
+    CRUDConversationSession writes through it; with CONVERSATION_CACHE_INVALIDATION
+    set to "postgres" every write also NOTIFYs the other processes, which drop
+    their copy.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[float, Optional[CachedSession]]]" = OrderedDict()
+        # Tags our own notifications so the listener can skip them
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._listener: Optional[asyncio.Task] = None
+        self.metrics = {"hits": 0, "misses": 0, "evicted": 0, "invalidated": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CONVERSATION_CACHE_ENABLED
+
+    def get(self, phone: str) -> Tuple[bool, Optional[CachedSession]]:
+        entry = self._entries.get(phone)
+        if entry is None or time.monotonic() - entry[0] > settings.CONVERSATION_CACHE_TTL_SECONDS:
+            self.metrics["misses"] += 1
+            return False, None
+        self._entries.move_to_end(phone)
+        self.metrics["hits"] += 1
+        return True, entry[1]
+
+    def put(self, phone: str, state: Optional[CachedSession]) -> None:
+        self._entries[phone] = (time.monotonic(), state)
+        self._entries.move_to_end(phone)
+        while len(self._entries) > settings.CONVERSATION_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+            self.metrics["evicted"] += 1
+
+    def invalidate(self, phone: str) -> None:
+        if self._entries.pop(phone, None) is not None:
+            self.metrics["invalidated"] += 1
+
+    # --- Cross-process invalidation ---
+
+    @property
+    def notify_enabled(self) -> bool:
+        return self.enabled and settings.CONVERSATION_CACHE_INVALIDATION == "postgres"
+
+    def notify_payload(self, phone: str) -> str:
+        return f"{self.origin}|{phone}"
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        origin, _, phone = payload.partition("|")
+        if origin != self.origin:
+            self.invalidate(phone)
+
+    async def _listen(self) -> None:
+        from app.db.session import engine
+
+        while True:
+            try:
+                # A dedicated pooled connection, held until it drops
+                async with engine.connect() as conn:
+                    driver = (await conn.get_raw_connection()).driver_connection
+                    lost = asyncio.Event()
+                    driver.add_termination_listener(lambda _: lost.set())
+                    await driver.add_listener(INVALIDATION_CHANNEL, self._on_notify)
+                    # Anything may have changed while nobody was listening
+                    self._entries.clear()
+                    log_event("session_cache_listening", origin=self.origin)
+                    await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session cache listener error: {str(e)}")
+            await asyncio.sleep(5)
+
+    def start_listener(self) -> None:
+        if self.notify_enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "invalidation": settings.CONVERSATION_CACHE_INVALIDATION
+        }
+
+
+session_cache = SessionStateCache()
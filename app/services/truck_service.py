@@ -1,13 +1,41 @@
 from typing import Tuple, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.truck import Truck
+from app.models.user import User
 from app.schemas.truck import TruckCreate, TruckUpdate
 from app.services.base import CRUDBase
+from app.matching.lane_index import lane_index
+from app.services.city_service import city_service
+from app.matching.events import inventory_events
+from app.db.unit_of_work import when_committed
 
 class CRUDTruck(CRUDBase[Truck, TruckCreate, TruckUpdate]):
-    async def create_with_matches(self, db: AsyncSession, *, obj_in: TruckCreate) -> Tuple[Truck, List]:
+    async def create(self, db: AsyncSession, *, obj_in: TruckCreate, commit: bool = True) -> Truck:
+        if obj_in.source_city_id is None:
+            obj_in.source_city_id = await city_service.resolve_id(db, obj_in.source_city)
+        if obj_in.destination_city_id is None:
+            obj_in.destination_city_id = await city_service.resolve_id(db, obj_in.destination_city)
+        # Owners from get_or_create_by_phone are already rated; skip the users lookup
+        if not lane_index.has_rating(obj_in.driver_id):
+            owner = await db.get(User, obj_in.driver_id)
+            if owner:
+                lane_index.set_rating(owner.id, owner.rating)
+        truck = await super().create(db=db, obj_in=obj_in, commit=commit)
+        await when_committed(db, commit, lambda: self._publish(truck))
+        return truck
+
+    async def _publish(self, truck: Truck) -> None:
+        lane_index.upsert_truck(truck)
+        await inventory_events.publish_truck(truck)
+
+    async def update(self, db: AsyncSession, *, db_obj: Truck, obj_in: TruckUpdate, commit: bool = True) -> Truck:
+        truck = await super().update(db=db, db_obj=db_obj, obj_in=obj_in, commit=commit)
+        await when_committed(db, commit, lambda: lane_index.upsert_truck(truck))
+        return truck
+
+    async def create_with_matches(self, db: AsyncSession, *, obj_in: TruckCreate, commit: bool = True) -> Tuple[Truck, List]:
         from app.matching.engine import matching_engine
-        truck = await super().create(db=db, obj_in=obj_in)
+        truck = await self.create(db=db, obj_in=obj_in, commit=commit)
         matches = await matching_engine.find_loads_for_truck(db, truck=truck)
         return truck, matches
 
@@ -1,8 +1,74 @@
-from app.models.user import User
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
 from app.services.base import CRUDBase
+from app.matching.lane_index import lane_index
+from app.db.unit_of_work import commit_unit, when_committed
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    pass
+    def __init__(self, model):
+        super().__init__(model)
+        # phone -> (user id, rating), LRU-bounded by USER_ID_CACHE_MAX_ENTRIES
+        self._by_phone: "OrderedDict[str, Tuple[uuid.UUID, float]]" = OrderedDict()
+        self.metrics = {"hits": 0, "misses": 0, "evicted": 0}
+
+    async def get_or_create_by_phone(
+        self, db: AsyncSession, phone_number: str, role: UserRole, commit: bool = True
+    ) -> uuid.UUID:
+        """
+        The id of the user with this phone, created with the given role if new.
+        Cached users cost no query; otherwise one upsert, which is also safe when
+        the same number posts twice at once. An existing user keeps their role.
+        """
+        cached = self._by_phone.get(phone_number)
+        if cached is not None:
+            self._by_phone.move_to_end(phone_number)
+            self.metrics["hits"] += 1
+            user_id, rating = cached
+        else:
+            self.metrics["misses"] += 1
+            stmt = insert(self.model).values(
+                phone_number=phone_number, role=role
+            ).on_conflict_do_update(
+                # A no-op update, so RETURNING also yields the existing row
+                index_elements=["phone_number"],
+                set_={"phone_number": phone_number}
+            ).returning(self.model.id, self.model.rating)
+            user_id, rating = (await db.execute(stmt)).one()
+            if commit:
+                await commit_unit(db)
+            # A user created in a transaction that rolls back must not be cached
+            await when_committed(db, commit, lambda: self._remember(phone_number, user_id, rating))
+        if not lane_index.has_rating(user_id):
+            lane_index.set_rating(user_id, rating)
+        return user_id
+
+    def _remember(self, phone_number: str, user_id: uuid.UUID, rating: float) -> None:
+        self._by_phone[phone_number] = (user_id, rating)
+        self._by_phone.move_to_end(phone_number)
+        while len(self._by_phone) > settings.USER_ID_CACHE_MAX_ENTRIES:
+            self._by_phone.popitem(last=False)
+            self.metrics["evicted"] += 1
+
+    async def update(self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate, commit: bool = True) -> User:
+        self._by_phone.pop(db_obj.phone_number, None)
+        user = await super().update(db=db, db_obj=db_obj, obj_in=obj_in, commit=commit)
+        # Keep match ranking in step with rating changes
+        await when_committed(db, commit, lambda: lane_index.set_rating(user.id, user.rating))
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: uuid.UUID, commit: bool = True) -> User:
+        user = await super().remove(db=db, id=id, commit=commit)
+        if user is not None:
+            self._by_phone.pop(user.phone_number, None)
+        return user
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "entries": len(self._by_phone)}
 
 user_service = CRUDUser(User)
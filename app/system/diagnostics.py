@@ -1,7 +1,7 @@
 import os
 import asyncio
 from typing import Dict, Any
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy import text
 from alembic.config import Config
 from alembic.script import ScriptDirectory
@@ -18,6 +18,7 @@ async def run_startup_diagnostics() -> Dict[str, Any]:
         "constraints": {"status": "UNKNOWN", "level": "CRITICAL", "message": ""},
         "workers": {"status": "UNKNOWN", "level": "OK", "message": ""},
         "routes": {"status": "UNKNOWN", "level": "OK", "message": ""},
+        "lane_index": {"status": "UNKNOWN", "level": "WARNING", "message": ""},
         "env": {"status": "UNKNOWN", "level": "WARNING", "message": ""}
     }
 
@@ -61,7 +62,7 @@ async def run_startup_diagnostics() -> Dict[str, Any]:
         report["migrations"] = {"status": "FAILED", "level": "CRITICAL", "message": str(e)}
 
     # 4. Required Tables
-    required_tables = ["users", "trucks", "loads", "bookings", "conversation_sessions"]
+    required_tables = ["users", "cities", "trucks", "loads", "bookings", "conversation_sessions", "processed_messages", "pending_matches"]
     try:
         async with engine.connect() as conn:
             res = await conn.execute(text(
@@ -140,7 +141,25 @@ async def run_startup_diagnostics() -> Dict[str, Any]:
     except Exception:
         report["routes"] = {"status": "OK", "level": "OK", "message": "Mounted"}
 
-    # 8. Environment Variables
+    # 8. Lane Index Consistency (index vs SQL candidate sets)
+    try:
+        from app.matching.lane_index import lane_index
+        from app.matching.engine import matching_engine
+        if not settings.LANE_INDEX_ENABLED:
+            report["lane_index"] = {"status": "WARNING", "level": "WARNING", "message": "Disabled (SQL matching)"}
+        elif not lane_index.ready:
+            report["lane_index"] = {"status": "WARNING", "level": "WARNING", "message": "Not built, using SQL matching"}
+        else:
+            async with async_sessionmaker(engine)() as db:
+                result = await matching_engine.check_index_consistency(db)
+            if result["mismatches"]:
+                report["lane_index"] = {"status": "WARNING", "level": "WARNING", "message": f"{len(result['mismatches'])} mismatches in {result['checked']} checks"}
+            else:
+                report["lane_index"] = {"status": "OK", "level": "OK", "message": f"Consistent ({result['checked']} checks)"}
+    except Exception as e:
+        report["lane_index"] = {"status": "WARNING", "level": "WARNING", "message": f"Error: {str(e)}"}
+
+    # 9. Environment Variables
     env_missing = []
     if not settings.WHATSAPP_TOKEN:
         env_missing.append("WHATSAPP_TOKEN")
@@ -171,6 +190,7 @@ def format_diagnostic_report(report: Dict[str, Any]) -> str:
         "constraints": "Unique Constraints",
         "workers": "Expiry Worker",
         "routes": "Payment Webhook Route",
+        "lane_index": "Lane Index",
         "env": "Environment Variables"
     }
 
@@ -201,6 +221,7 @@ def format_diagnostic_report(report: Dict[str, Any]) -> str:
             elif key == "constraints": display_status = "VERIFIED"
             elif key == "workers": display_status = "RUNNING"
             elif key == "routes": display_status = "MOUNTED"
+            elif key == "lane_index": display_status = "CONSISTENT"
             elif key == "env": display_status = "VALID"
         
         # Override display if missing
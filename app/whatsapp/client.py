@@ -1,15 +1,29 @@
-from pywa import WhatsApp
-from app.core.config import settings
+from typing import Any, Dict, Union
+
+from app.whatsapp.transport import graph_transport
+
+# A text body, or an interactive message payload
+Content = Union[str, Dict[str, Any]]
+
+
+async def deliver(phone: str, content: Content) -> None:
+    """
+    One Graph API send through graph_transport: a shared blocking client on a
+    thread pool by default, or pooled async httpx with WHATSAPP_TRANSPORT=async.
+    """
+    if isinstance(content, str):
+        await graph_transport.send_text(phone, content)
+    else:
+        await graph_transport.send_interactive(phone, content)
 
-# Initialize PyWa client
-wa = WhatsApp(
-    phone_id=settings.WHATSAPP_PHONE_NUMBER_ID,
-    token=settings.WHATSAPP_TOKEN
-)
 
 async def send_message(phone: str, text: str) -> None:
     """Helper to send a WhatsApp text message."""
-    wa.send_message(
-        to=phone,
-        text=text
-    )
+    from app.whatsapp.outbound import outbound_sender
+    await outbound_sender.enqueue(phone, text)
+
+
+async def send_interactive(phone: str, interactive: Dict[str, Any]) -> None:
+    """Helper to send a WhatsApp interactive message (list, buttons)."""
+    from app.whatsapp.outbound import outbound_sender
+    await outbound_sender.enqueue(phone, interactive)
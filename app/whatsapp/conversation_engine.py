@@ -1,27 +1,37 @@
-import json
+import logging
 import re
+import uuid
 from datetime import datetime
+from typing import Any, Dict, Optional
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.whatsapp.logger import logger
-from app.whatsapp.client import send_message
+from app.core.config import settings
+from app.whatsapp.logger import logger, log_event
+from app.whatsapp.replies import ReplyBuffer
 from app.services.conversation_service import conversation_service
+from app.db.unit_of_work import commit_unit
 from app.whatsapp.validators import PickupDropCityValidator, CapacityValidator, DateValidator
+from app.whatsapp.flows import Flow, Step, compile_flows
+from app.whatsapp.formatters import (
+    format_truck_matches, format_load_matches, format_consolidation_suggestion, format_trip_chains,
+    format_matches_summary, format_remaining_matches, load_match_details, truck_match_details, load_match_row, truck_match_row
+)
+from app.whatsapp.match_store import pending_matches, matches_for_post, cursor_for_page
+from app.matching.engine import matching_engine
 from app.models.truck import Truck
+from app.models.load import Load
+from app.schemas.truck import TruckCreate
+from app.schemas.load import LoadCreate
 from app.services.truck_service import truck_service
-from app.models.user import User, UserRole
+from app.services.load_service import load_service
+from app.services.booking_service import booking_service
+from app.models.user import UserRole
 from app.services.user_service import user_service
 
-def is_reserved_command(text: str) -> bool:
-    text_lower = text.lower().strip()
-    return text_lower in ["post truck", "post load", "help"] or text_lower.startswith("book")
-
-def is_cancel(text: str) -> bool:
-    return text.lower().strip() == "cancel"
+CITY_PATTERN = re.compile(r"^[A-Za-z ]{2,50}$")
 
 def validate_city(text: str) -> bool:
-    return bool(re.match(r"^[A-Za-z ]{2,50}$", text.strip()))
+    return bool(CITY_PATTERN.match(text.strip()))
 
 def validate_capacity(text: str) -> bool:
     try:
@@ -37,283 +47,442 @@ def validate_date(text: str) -> bool:
     except ValueError:
         return False
 
+def is_confirm(text: str) -> bool:
+    return text.lower().strip() == "confirm"
+
+async def resolve_city_reply(
+    db: AsyncSession, phone: str, session_obj, text: str, reply: ReplyBuffer
+) -> Optional[PickupDropCityValidator]:
+    """
+    Validates a city answer, asking "did you mean" for near misses of known cities.
+    Returns None when a suggestion was sent and the step should wait for the reply.
+    Raises ValidationError like PickupDropCityValidator.
+    """
+    data = session_obj.collected_data
+    suggested = data.get("suggested_city")
+    if suggested and text.lower().strip() == "yes":
+        return PickupDropCityValidator(city=suggested)
+
+    val = PickupDropCityValidator(city=text)
+    # A user who retypes the same name after a suggestion means it verbatim
+    if val.suggestion and text.lower().strip() != (data.get("suggested_for") or "").lower().strip():
+        await conversation_service.update_step(db, phone, step=session_obj.current_step, new_data={
+            "suggested_city": val.suggestion,
+            "suggested_for": text
+        }, commit=False)
+        await commit_unit(db)
+        reply.add(f"Did you mean {val.suggestion}? Reply YES to confirm, or type the city again.")
+        return None
+    return val
+
+# --- Answer parsers: reply text -> data merged into the session ---
+
+def city_answer(prefix: str):
+    city_key, lat_key, lng_key = f"{prefix}_city", f"{prefix}_lat", f"{prefix}_lng"
+
+    async def parse(db: AsyncSession, phone: str, session_obj, text: str, reply: ReplyBuffer) -> Optional[Dict[str, Any]]:
+        val = await resolve_city_reply(db, phone, session_obj, text, reply)
+        if not val:
+            return None
+        return {city_key: val.city, lat_key: val.lat, lng_key: val.lng, "suggested_city": None, "suggested_for": None}
+    return parse
+
+def tons_answer(key: str):
+    async def parse(db: AsyncSession, phone: str, session_obj, text: str, reply: ReplyBuffer) -> Dict[str, Any]:
+        return {key: CapacityValidator(capacity=int(text)).capacity}
+    return parse
+
+async def category_answer(db: AsyncSession, phone: str, session_obj, text: str, reply: ReplyBuffer) -> Dict[str, Any]:
+    return {"category": text.strip()}
+
+async def date_answer(db: AsyncSession, phone: str, session_obj, text: str, reply: ReplyBuffer) -> Dict[str, Any]:
+    val = DateValidator(date_str=text)
+    return {"date": datetime.strptime(val.date_str, "%d-%m-%Y")}
+
+# --- Finish actions for the last step of each flow ---
+# Each message is one unit of work: writes are staged with commit=False and
+# committed once. Replies are collected in the turn's ReplyBuffer and sent after.
+
+async def finish_truck_post(
+    db: AsyncSession, phone: str, session_obj, answer: Dict[str, Any], reply: ReplyBuffer
+) -> None:
+    final_data = session_obj.collected_data
+    user_id = await user_service.get_or_create_by_phone(db, phone, UserRole.DRIVER, commit=False)
+
+    truck_in = TruckCreate(
+        driver_id=user_id,
+        source_city=final_data["pickup_city"],
+        destination_city=final_data["drop_city"],
+        # Gazetteer coordinates; 0.0 when the city is not in the gazetteer
+        source_lat=final_data.get("pickup_lat") or 0.0,
+        source_lng=final_data.get("pickup_lng") or 0.0,
+        dest_lat=final_data.get("drop_lat") or 0.0,
+        dest_lng=final_data.get("drop_lng") or 0.0,
+        departure_time=answer["date"],
+        capacity_total=float(final_data["capacity_tons"]),
+        capacity_available=float(final_data["capacity_tons"])
+    )
+    truck, matches = await truck_service.create_with_matches(db=db, obj_in=truck_in, commit=False)
+    await conversation_service.clear_session(db, phone, commit=False)
+    cursor = cursor_for_page("truck", truck.id, matches.after)
+
+    # Several smaller loads can share the truck; make sure the best combination is listed
+    bundle = await matching_engine.suggest_consolidation(db, truck)
+    if len(bundle) > 1:
+        listed = {m.id for m in matches}
+        matches = list(matches) + [m for m in bundle if m.id not in listed]
+
+    await commit_unit(db)
+    log_event("truck_created_with_matches", phone=phone, truck_id=str(truck.id), matches_found=len(matches))
+    reply.add("Truck posted successfully ✅")
+
+    if matches:
+        await pending_matches.put(phone, matches_for_post(
+            "truck", truck.id, [(m.id, load_match_details(m)) for m in matches]
+        ), cursor)
+        reply.add_matches(
+            format_truck_matches(matches, more=cursor is not None),
+            format_matches_summary("loads", len(matches), more=cursor is not None),
+            "Matching loads", [load_match_row(m) for m in matches]
+        )
+    else:
+        reply.add(format_truck_matches(matches))
+    if len(bundle) > 1:
+        bundle_ids = {m.id for m in bundle}
+        numbers = [i for i, m in enumerate(matches, start=1) if m.id in bundle_ids]
+        reply.add(format_consolidation_suggestion(
+            numbers, sum(m.weight for m in bundle), truck.capacity_available
+        ))
+
+    # Chained trips: what the truck can carry once it reaches its destination
+    chains = matching_engine.find_trip_chains(truck)
+    if chains:
+        reply.add(format_trip_chains(truck, chains))
+
+async def finish_load_post(
+    db: AsyncSession, phone: str, session_obj, answer: Dict[str, Any], reply: ReplyBuffer
+) -> None:
+    final_data = session_obj.collected_data
+    user_id = await user_service.get_or_create_by_phone(db, phone, UserRole.SHIPPER, commit=False)
+
+    load_in = LoadCreate(
+        shipper_id=user_id,
+        pickup_city=final_data["pickup_city"],
+        drop_city=final_data["drop_city"],
+        pickup_lat=final_data.get("pickup_lat") or 0.0,
+        pickup_lng=final_data.get("pickup_lng") or 0.0,
+        drop_lat=final_data.get("drop_lat") or 0.0,
+        drop_lng=final_data.get("drop_lng") or 0.0,
+        deadline=answer["date"],
+        weight=float(final_data["weight_tons"]),
+        category=final_data["category"]
+    )
+    load, matches = await load_service.create_with_matches(db=db, obj_in=load_in, commit=False)
+    await conversation_service.clear_session(db, phone, commit=False)
+    cursor = cursor_for_page("load", load.id, matches.after)
+
+    await commit_unit(db)
+    log_event("load_created_with_matches", phone=phone, load_id=str(load.id), matches_found=len(matches))
+    reply.add("Load posted successfully ✅")
+
+    if matches:
+        await pending_matches.put(phone, matches_for_post(
+            "load", load.id, [(m.id, truck_match_details(m)) for m in matches]
+        ), cursor)
+        reply.add_matches(
+            format_load_matches(matches, more=cursor is not None),
+            format_matches_summary("trucks", len(matches), more=cursor is not None),
+            "Matching trucks", [truck_match_row(m) for m in matches]
+        )
+    else:
+        reply.add(format_load_matches(matches))
+
+async def confirm_booking(
+    db: AsyncSession, phone: str, session_obj, answer: Dict[str, Any], reply: ReplyBuffer
+) -> None:
+    data = session_obj.collected_data
+    booked = False
+    try:
+        truck_id = uuid.UUID(data["my_id"] if data["my_type"] == "truck" else data["match_id"])
+        load_id = uuid.UUID(data["match_id"] if data["my_type"] == "truck" else data["my_id"])
+
+        if await booking_service.get_by_pair(db, truck_id, load_id) is not None:
+            await conversation_service.clear_session(db, phone, commit=False)
+            await commit_unit(db)
+            booked = True
+            reply.add("ℹ️ This match is already booked.")
+        else:
+            booking, error = await booking_service.create_atomic_booking(db, truck_id, load_id, 0.0, commit=False)
+            await conversation_service.clear_session(db, phone, commit=False)
+            await commit_unit(db)
+            if error:
+                reply.add(f"⚠️ Booking failed: {error}")
+            else:
+                booked = True
+                reply.add("Booking reserved successfully.\nPayment link will be generated shortly.")
+    except Exception as e:
+        logger.error(f"Booking error: {str(e)}")
+        await db.rollback()
+        await conversation_service.clear_session(db, phone)
+        reply.add("⚠️ An error occurred while creating booking.")
+
+    # A refused booking leaves every match bookable; a truck with capacity left
+    # can book more loads from the same list
+    if booked:
+        await drop_booked_load(phone, str(load_id), reply)
+
+async def drop_booked_load(phone: str, load_id: str, reply: ReplyBuffer) -> None:
+    """
+    Removes every listed match involving a load that is now booked, and re-lists what
+    is left since the numbers shift.
+    """
+    entry = await pending_matches.get_with_cursor(phone)
+    if not entry:
+        return
+    shown, cursor = entry
+    remaining = [m for m in shown if (m.id if m.my_type == "truck" else m.my_id) != load_id]
+    if cursor is not None and cursor.my_type == "load" and cursor.my_id == load_id:
+        cursor = None
+    if not remaining:
+        await pending_matches.discard(phone)
+        return
+    if len(remaining) < len(shown):
+        await pending_matches.put(phone, remaining, cursor)
+        reply.add(format_remaining_matches([m.details for m in remaining]))
+
+# --- Flow definitions ---
+
+INVALID_CITY = "⚠️ Enter a valid city or category name (letters only). Example: Jaipur"
+INVALID_TONS = "⚠️ Enter a valid number between 1 and 100."
+INVALID_DATE = "⚠️ Enter a valid future date in format DD-MM-YYYY."
+
+def city_step(prefix: str, prompt: str) -> Step:
+    return Step(
+        f"{prefix}_city", prompt,
+        check=validate_city, check_error=INVALID_CITY,
+        parse=city_answer(prefix),
+        errors=(ValidationError,),
+        error_reply=f"Invalid city. Must be at least 3 characters. Please enter the {prefix} city again:"
+    )
+
+FLOWS = [
+    Flow("post_truck", command="post truck", steps=[
+        city_step("pickup", "Great! Let's post a truck. Please enter the pickup city:"),
+        city_step("drop", "Got it. Now, please enter the drop city:"),
+        Step(
+            "capacity_tons", "Perfect. What is the truck's capacity in tons? (e.g., 20)",
+            check=validate_capacity, check_error=INVALID_TONS,
+            parse=tons_answer("capacity_tons"),
+            errors=(ValueError, ValidationError),
+            error_reply="Invalid capacity. Must be a number between 1 and 100. Please enter the capacity again:"
+        ),
+        Step(
+            "available_date", "Noted. When is the truck available? Please use the format DD-MM-YYYY:",
+            check=validate_date, check_error=INVALID_DATE,
+            parse=date_answer,
+            errors=(ValidationError,),
+            error_reply="{error}. Please enter the available date (DD-MM-YYYY) again:",
+            finish=finish_truck_post
+        ),
+    ]),
+    Flow("post_load", command="post load", steps=[
+        city_step("pickup", "Great! Let's post a load. Please enter the pickup city:"),
+        city_step("drop", "Got it. Now, please enter the drop city:"),
+        Step(
+            "weight_tons", "Perfect. What is the load's weight in tons? (e.g., 20)",
+            check=validate_capacity, check_error=INVALID_TONS,
+            parse=tons_answer("weight_tons"),
+            errors=(ValueError, ValidationError),
+            error_reply="Invalid weight. Must be a number between 1 and 100. Please enter the weight again:"
+        ),
+        Step(
+            "category", "Noted. What is the category of the load? (e.g., General, Electronics):",
+            check=validate_city, check_error=INVALID_CITY,
+            parse=category_answer
+        ),
+        Step(
+            "pickup_date", "Got it. When is the pickup date? Please use the format DD-MM-YYYY:",
+            check=validate_date, check_error=INVALID_DATE,
+            parse=date_answer,
+            errors=(ValidationError,),
+            error_reply="{error}. Please enter the pickup date (DD-MM-YYYY) again:",
+            finish=finish_load_post
+        ),
+    ]),
+    # Started by BOOK <n> with the selected match, not by a command
+    Flow("booking", steps=[
+        Step(
+            "confirm_booking",
+            check=is_confirm, check_error="⚠️ Please reply CONFIRM to proceed or CANCEL to abort.",
+            finish=confirm_booking
+        ),
+    ]),
+]
+
+STEPS, FLOW_COMMANDS = compile_flows(FLOWS)
+
+# --- Commands outside a flow ---
+
+HELP_REPLY = "Welcome to Freight Matching! You can say 'post truck' or 'post load' to get started."
+UNKNOWN_REPLY = "I didn't quite understand that. Please reply with 'help' for instructions."
+
+def start_flow(flow: Flow):
+    first = flow.steps[0]
+
+    async def command(db: AsyncSession, phone: str, reply: ReplyBuffer) -> None:
+        await conversation_service.start_session(db, phone, flow=flow.name, step=first.name, commit=False)
+        await commit_unit(db)
+        reply.add(first.prompt)
+    return command
+
+async def send_help(db: AsyncSession, phone: str, reply: ReplyBuffer) -> None:
+    reply.add(HELP_REPLY)
+
+NO_MORE_REPLY = "No more matches right now. We will notify you when new ones appear."
+
+async def show_more_matches(db: AsyncSession, phone: str, reply: ReplyBuffer) -> None:
+    """
+    The next page for the post behind the user's last match list. The page resumes
+    below the stored cursor, is numbered on from the matches already shown and is
+    added to them, so BOOK <n> works for any page.
+    """
+    entry = await pending_matches.get_with_cursor(phone)
+    if not entry:
+        reply.add("⚠️ No active matches. Please post a load or truck first.")
+        return
+    shown, cursor = entry
+    post = await db.get(Truck if cursor.my_type == "truck" else Load, uuid.UUID(cursor.my_id)) if cursor else None
+    if post is None:
+        reply.add(NO_MORE_REPLY)
+        return
+
+    if cursor.my_type == "truck":
+        find_page = matching_engine.find_loads_for_truck
+        details, counterpart, section = load_match_details, "loads", "Matching loads"
+        format_matches, row = format_truck_matches, load_match_row
+    else:
+        find_page = matching_engine.find_trucks_for_load
+        details, counterpart, section = truck_match_details, "trucks", "Matching trucks"
+        format_matches, row = format_load_matches, truck_match_row
+    # Rankings can shift between pages and consolidation loads are listed early;
+    # never list the same match twice, and skip pages that only repeat listed ones
+    listed = {m.id for m in shown}
+    after = cursor.after
+    while True:
+        page = await find_page(db, post, after=after)
+        fresh = [m for m in page if str(m.id) not in listed]
+        if fresh or page.after is None or page.after == after:
+            break
+        after = page.after
+    if len(shown) + len(fresh) >= settings.MATCH_MORE_MAX_RESULTS:
+        fresh = fresh[:max(settings.MATCH_MORE_MAX_RESULTS - len(shown), 0)]
+        page.after = None
+    next_cursor = cursor_for_page(cursor.my_type, post.id, page.after)
+    await pending_matches.put(
+        phone, list(shown) + matches_for_post(cursor.my_type, post.id, [(m.id, details(m)) for m in fresh]), next_cursor
+    )
+    if not fresh:
+        reply.add(NO_MORE_REPLY)
+        return
+    start, more = len(shown) + 1, next_cursor is not None
+    reply.add_matches(
+        format_matches(fresh, start=start, more=more),
+        format_matches_summary(counterpart, len(fresh), start=start, more=more),
+        section, [row(m) for m in fresh], start=start
+    )
+
+COMMANDS = {command: start_flow(flow) for command, flow in FLOW_COMMANDS.items()}
+COMMANDS["help"] = send_help
+COMMANDS["more"] = show_more_matches
+
+async def book_match(db: AsyncSession, phone: str, text_lower: str, reply: ReplyBuffer) -> None:
+    parts = text_lower.split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        reply.add(UNKNOWN_REPLY)
+        return
+    index = int(parts[1])
+    matches = await pending_matches.get(phone)
+    if not matches:
+        reply.add("⚠️ No active matches to book. Please post a load or truck first.")
+        return
+    if index < 1 or index > len(matches):
+        reply.add(f"⚠️ Invalid selection. Please choose a number between 1 and {len(matches)}.")
+        return
+    selected = matches[index - 1]
+
+    await conversation_service.start_session(db, phone, flow="booking", step="confirm_booking", data={
+        # Alerts can list matches for several of the user's posts, each tagged with its own
+        "my_type": selected.my_type,
+        "my_id": selected.my_id,
+        "match_id": selected.id,
+        "details": selected.details
+    }, commit=False)
+    await commit_unit(db)
+    reply.add(f"You selected:\n{selected.details}\nReply CONFIRM to proceed or CANCEL to abort.")
+
+def validation_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return e.errors()[0].get("msg", "Invalid input")
+    return str(e)
+
 async def handle_conversation(phone: str, text: str, db: AsyncSession) -> None:
+    reply = ReplyBuffer(phone)
+    try:
+        await respond(phone, text, db, reply)
+    finally:
+        # Whatever the turn produced goes out as one message, even if it failed part way
+        await reply.flush()
+
+async def respond(phone: str, text: str, db: AsyncSession, reply: ReplyBuffer) -> None:
     session_obj = await conversation_service.get_active_session(db, phone)
     text_lower = text.lower().strip()
 
-    # Pre-step guards for active sessions
-    if session_obj:
-        if is_cancel(text):
-            await conversation_service.clear_session(db, phone)
-            await send_message(phone, "Flow cancelled. You may type 'post truck' or 'post load' to begin again.")
-            return
-            
-        if is_reserved_command(text):
-            await send_message(phone, "⚠️ You are currently in an active flow. Please complete it or type CANCEL to restart.")
-            return
-
-        step = session_obj.current_step
-        if step in ["pickup_city", "drop_city", "category"]:
-            if not validate_city(text):
-                await send_message(phone, "⚠️ Enter a valid city or category name (letters only). Example: Jaipur")
-                return
-        elif step in ["capacity_tons", "weight_tons"]:
-            if not validate_capacity(text):
-                await send_message(phone, "⚠️ Enter a valid number between 1 and 100.")
-                return
-        elif step in ["available_date", "pickup_date"]:
-            if not validate_date(text):
-                await send_message(phone, "⚠️ Enter a valid future date in format DD-MM-YYYY.")
-                return
-
-    # 1. No active session
+    # 1. No active session: commands
     if not session_obj:
-        if text_lower == "post truck":
-            await conversation_service.start_session(db, phone, flow="post_truck", step="pickup_city")
-            await send_message(phone, "Great! Let's post a truck. Please enter the pickup city:")
-        elif text_lower == "post load":
-            await conversation_service.start_session(db, phone, flow="post_load", step="pickup_city")
-            await send_message(phone, "Great! Let's post a load. Please enter the pickup city:")
-        elif text_lower == "help":
-            await send_message(phone, "Welcome to Freight Matching! You can say 'post truck' or 'post load' to get started.")
+        command = COMMANDS.get(text_lower)
+        if command is not None:
+            await command(db, phone, reply)
         elif text_lower.startswith("book "):
-            parts = text_lower.split()
-            if len(parts) == 2 and parts[1].isdigit():
-                index = int(parts[1])
-                from app.whatsapp.memcache import PENDING_MATCHES
-                pending = PENDING_MATCHES.get(phone)
-                if not pending:
-                    await send_message(phone, "⚠️ No active matches to book. Please post a load or truck first.")
-                    return
-                matches = pending.get("matches", [])
-                if index < 1 or index > len(matches):
-                    await send_message(phone, f"⚠️ Invalid selection. Please choose a number between 1 and {len(matches)}.")
-                    return
-                selected = matches[index - 1]
-                
-                await conversation_service.start_session(db, phone, flow="booking", step="confirm_booking")
-                await conversation_service.update_step(db, phone, step="confirm_booking", new_data={
-                    "my_type": pending["type"],
-                    "my_id": pending["my_id"],
-                    "match_id": selected["id"],
-                    "details": selected["details"]
-                })
-                await send_message(phone, f"You selected:\n{selected['details']}\nReply CONFIRM to proceed or CANCEL to abort.")
-            else:
-                await send_message(phone, "I didn't quite understand that. Please reply with 'help' for instructions.")
+            await book_match(db, phone, text_lower, reply)
         else:
-            await send_message(phone, "I didn't quite understand that. Please reply with 'help' for instructions.")
+            reply.add(UNKNOWN_REPLY)
         return
 
-    # 2. Active session: post_truck flow
-    if session_obj.current_flow == "post_truck":
-        step = session_obj.current_step
-
-        if step == "pickup_city":
-            try:
-                PickupDropCityValidator(city=text)
-                await conversation_service.update_step(db, phone, step="drop_city", new_data={"pickup_city": text})
-                await send_message(phone, "Got it. Now, please enter the drop city:")
-            except ValidationError:
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid city. Must be at least 3 characters. Please enter the pickup city again:")
-
-        elif step == "drop_city":
-            try:
-                PickupDropCityValidator(city=text)
-                await conversation_service.update_step(db, phone, step="capacity_tons", new_data={"drop_city": text})
-                await send_message(phone, "Perfect. What is the truck's capacity in tons? (e.g., 20)")
-            except ValidationError:
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid city. Must be at least 3 characters. Please enter the drop city again:")
-
-        elif step == "capacity_tons":
-            try:
-                val = CapacityValidator(capacity=int(text))
-                await conversation_service.update_step(db, phone, step="available_date", new_data={"capacity_tons": val.capacity})
-                await send_message(phone, "Noted. When is the truck available? Please use the format DD-MM-YYYY:")
-            except (ValueError, ValidationError):
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid capacity. Must be a number between 1 and 100. Please enter the capacity again:")
-
-        elif step == "available_date":
-            try:
-                val = DateValidator(date_str=text)
-                date_obj = datetime.strptime(val.date_str, "%d-%m-%Y")
-                
-                # Validation passed, finalize creation
-                final_data = session_obj.collected_data
-                
-                # Check if user exists, else create
-                result = await db.execute(select(User).where(User.phone_number == phone))
-                user = result.scalars().first()
-                if not user:
-                    from app.schemas.user import UserCreate
-                    user = await user_service.create(db=db, obj_in=UserCreate(phone_number=phone, role=UserRole.DRIVER))
-                
-                # Create Truck
-                from app.schemas.truck import TruckCreate
-                truck_in = TruckCreate(
-                    driver_id=user.id,
-                    source_city=final_data["pickup_city"],
-                    destination_city=final_data["drop_city"],
-                    source_lat=0.0, # Placeholder until PostGIS Geocoding
-                    source_lng=0.0,
-                    dest_lat=0.0,
-                    dest_lng=0.0,
-                    departure_time=date_obj,
-                    capacity_total=float(final_data["capacity_tons"]),
-                    capacity_available=float(final_data["capacity_tons"])
-                )
-                truck, matches = await truck_service.create_with_matches(db=db, obj_in=truck_in)
-                
-                logger.info(json.dumps({
-                    "action": "truck_created_with_matches",
-                    "phone": phone,
-                    "truck_id": str(truck.id),
-                    "matches_found": len(matches)
-                }))
-                
-                # Clear session
-                await conversation_service.clear_session(db, phone)
-                await send_message(phone, "Truck posted successfully ✅")
-                
-                # Format Matches and send
-                from app.whatsapp.formatters import format_truck_matches
-                from app.whatsapp.memcache import PENDING_MATCHES
-                
-                if matches:
-                    PENDING_MATCHES[phone] = {
-                        "type": "truck",
-                        "my_id": str(truck.id),
-                        "matches": [{"id": str(m.id), "details": f"{m.weight} tons - {m.pickup_city} -> {m.drop_city} - {m.deadline.strftime('%d-%m-%Y')}"} for m in matches]
-                    }
-                await send_message(phone, format_truck_matches(matches))
-                
-            except ValidationError as e:
-                err_msg = e.errors()[0].get('msg', 'Invalid Date')
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "error": err_msg}))
-                await send_message(phone, f"{err_msg}. Please enter the available date (DD-MM-YYYY) again:")
-
-    # 3. Active session: post_load flow
-    elif session_obj.current_flow == "post_load":
-        step = session_obj.current_step
-
-        if step == "pickup_city":
-            try:
-                PickupDropCityValidator(city=text)
-                await conversation_service.update_step(db, phone, step="drop_city", new_data={"pickup_city": text})
-                await send_message(phone, "Got it. Now, please enter the drop city:")
-            except ValidationError:
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid city. Must be at least 3 characters. Please enter the pickup city again:")
-
-        elif step == "drop_city":
-            try:
-                PickupDropCityValidator(city=text)
-                await conversation_service.update_step(db, phone, step="weight_tons", new_data={"drop_city": text})
-                await send_message(phone, "Perfect. What is the load's weight in tons? (e.g., 20)")
-            except ValidationError:
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid city. Must be at least 3 characters. Please enter the drop city again:")
-
-        elif step == "weight_tons":
-            try:
-                val = CapacityValidator(capacity=int(text))
-                await conversation_service.update_step(db, phone, step="category", new_data={"weight_tons": val.capacity})
-                await send_message(phone, "Noted. What is the category of the load? (e.g., General, Electronics):")
-            except (ValueError, ValidationError):
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "input": text}))
-                await send_message(phone, "Invalid weight. Must be a number between 1 and 100. Please enter the weight again:")
-
-        elif step == "category":
-            await conversation_service.update_step(db, phone, step="pickup_date", new_data={"category": text.strip()})
-            await send_message(phone, "Got it. When is the pickup date? Please use the format DD-MM-YYYY:")
-
-        elif step == "pickup_date":
-            try:
-                val = DateValidator(date_str=text)
-                date_obj = datetime.strptime(val.date_str, "%d-%m-%Y")
-                
-                # Validation passed, finalize creation
-                final_data = session_obj.collected_data
-                
-                # Check if user exists, else create
-                result = await db.execute(select(User).where(User.phone_number == phone))
-                user = result.scalars().first()
-                if not user:
-                    from app.schemas.user import UserCreate
-                    user = await user_service.create(db=db, obj_in=UserCreate(phone_number=phone, role=UserRole.SHIPPER))
-                
-                # Create Load
-                from app.schemas.load import LoadCreate
-                from app.services.load_service import load_service
-                load_in = LoadCreate(
-                    shipper_id=user.id,
-                    pickup_city=final_data["pickup_city"],
-                    drop_city=final_data["drop_city"],
-                    pickup_lat=0.0,
-                    pickup_lng=0.0,
-                    drop_lat=0.0,
-                    drop_lng=0.0,
-                    deadline=date_obj,
-                    weight=float(final_data["weight_tons"]),
-                    category=final_data["category"]
-                )
-                load, matches = await load_service.create_with_matches(db=db, obj_in=load_in)
-                
-                logger.info(json.dumps({
-                    "action": "load_created_with_matches",
-                    "phone": phone,
-                    "load_id": str(load.id),
-                    "matches_found": len(matches)
-                }))
-                
-                # Clear session
-                await conversation_service.clear_session(db, phone)
-                await send_message(phone, "Load posted successfully ✅")
-                
-                # Format Matches and send
-                from app.whatsapp.formatters import format_load_matches
-                from app.whatsapp.memcache import PENDING_MATCHES
-                
-                if matches:
-                    PENDING_MATCHES[phone] = {
-                        "type": "load",
-                        "my_id": str(load.id),
-                        "matches": [{"id": str(m.id), "details": f"{m.capacity_available} tons - {m.source_city} -> {m.destination_city} - {m.departure_time.strftime('%d-%m-%Y')}"} for m in matches]
-                    }
-                await send_message(phone, format_load_matches(matches))
-                
-            except ValidationError as e:
-                err_msg = e.errors()[0].get('msg', 'Invalid Date')
-                logger.warning(json.dumps({"action": "validation_failed", "step": step, "phone": phone, "error": err_msg}))
-                await send_message(phone, f"{err_msg}. Please enter the pickup date (DD-MM-YYYY) again:")
-
-    # 4. Active session: booking flow
-    elif session_obj.current_flow == "booking":
-        step = session_obj.current_step
-        if step == "confirm_booking":
-            if text_lower == "confirm":
-                data = session_obj.collected_data
-                from app.services.booking_service import booking_service
-                import uuid
-                
-                try:
-                    truck_id = uuid.UUID(data["my_id"] if data["my_type"] == "truck" else data["match_id"])
-                    load_id = uuid.UUID(data["match_id"] if data["my_type"] == "truck" else data["my_id"])
-                    
-                    booking, error = await booking_service.create_atomic_booking(db, truck_id, load_id, 0.0)
-                    if error:
-                        await send_message(phone, f"⚠️ Booking failed: {error}")
-                    else:
-                        await send_message(phone, "Booking reserved successfully.\nPayment link will be generated shortly.")
-                except Exception as e:
-                    logger.error(f"Booking error: {str(e)}")
-                    await send_message(phone, "⚠️ An error occurred while creating booking.")
-                    
-                await conversation_service.clear_session(db, phone)
-                from app.whatsapp.memcache import PENDING_MATCHES
-                PENDING_MATCHES.pop(phone, None)
-            else:
-                await send_message(phone, "⚠️ Please reply CONFIRM to proceed or CANCEL to abort.")
+    # 2. Active session: guards that apply in every flow
+    if text_lower == "cancel":
+        await conversation_service.clear_session(db, phone, commit=False)
+        await commit_unit(db)
+        reply.add("Flow cancelled. You may type 'post truck' or 'post load' to begin again.")
+        return
+    if text_lower in COMMANDS or text_lower.startswith("book"):
+        reply.add("⚠️ You are currently in an active flow. Please complete it or type CANCEL to restart.")
+        return
+
+    # 3. The session's current step
+    step = STEPS.get((session_obj.current_flow, session_obj.current_step))
+    if step is None:
+        log_event(
+            "unknown_step",
+            level=logging.WARNING,
+            phone=phone,
+            flow=session_obj.current_flow,
+            step=session_obj.current_step
+        )
+        return
+    if step.check is not None and not step.check(text):
+        reply.add(step.check_error)
+        return
+    try:
+        data = await step.parse(db, phone, session_obj, text, reply) if step.parse is not None else {}
+        if data is None:
+            return
+        if step.finish is not None:
+            await step.finish(db, phone, session_obj, data, reply)
+        else:
+            await conversation_service.update_step(db, phone, step=step.next_step, new_data=data, commit=False)
+            await commit_unit(db)
+            reply.add(step.next_prompt)
+    except step.errors as e:
+        err_msg = validation_message(e)
+        log_event("validation_failed", level=logging.WARNING, step=step.name, phone=phone, input=text, error=err_msg)
+        reply.add(step.error_reply.format(error=err_msg))
@@ -0,0 +1,114 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.models.processed_message import ProcessedMessage
+from app.whatsapp.logger import logger
+
+# How often the Postgres backend deletes ids older than the TTL
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def _key(message_id: str) -> int:
+    # 64-bit digest instead of the ~60 char id string: a fraction of the memory per entry
+    return int.from_bytes(hashlib.blake2b(message_id.encode(), digest_size=8).digest(), "big")
+
+
+class MessageDeduplicator:
+    """
+    Drops redelivered webhook messages by WhatsApp message id.
+
+    Ids seen by this process live in an insertion-ordered map capped at
+    WEBHOOK_DEDUP_MAX_ENTRIES and expired after WEBHOOK_DEDUP_TTL_SECONDS. With
+    WEBHOOK_DEDUP_BACKEND="postgres" a local miss also claims the id in
+    processed_messages (INSERT ... ON CONFLICT DO NOTHING), so several workers
+    never both process one delivery. Either way this runs before a conversation
+    DB session is opened.
+    """
+
+    def __init__(self):
+        self._seen: "OrderedDict[int, float]" = OrderedDict()
+        self._last_purge = 0.0
+        self.metrics = {"hits": 0, "misses": 0, "db_hits": 0, "evicted": 0, "db_errors": 0}
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - settings.WEBHOOK_DEDUP_TTL_SECONDS
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if seen_at >= cutoff and len(self._seen) < settings.WEBHOOK_DEDUP_MAX_ENTRIES:
+                return
+            self._seen.popitem(last=False)
+            self.metrics["evicted"] += 1
+
+    async def claim(self, message_id: Optional[str]) -> bool:
+        """True the first time an id is seen (process it), False for a redelivery."""
+        if not message_id:
+            return True
+        now = time.monotonic()
+        key = _key(message_id)
+        self._expire(now)
+        if key in self._seen:
+            self.metrics["hits"] += 1
+            return False
+        if settings.WEBHOOK_DEDUP_BACKEND == "postgres" and not await self._claim_db(message_id, now):
+            self.metrics["hits"] += 1
+            self.metrics["db_hits"] += 1
+            self._seen[key] = now
+            return False
+        self.metrics["misses"] += 1
+        self._seen[key] = now
+        return True
+
+    async def release(self, message_id: Optional[str]) -> None:
+        """Forget an id that was claimed but not processed, so its redelivery is."""
+        if not message_id:
+            return
+        self._seen.pop(_key(message_id), None)
+        if settings.WEBHOOK_DEDUP_BACKEND == "postgres":
+            from app.db.session import engine
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(delete(ProcessedMessage).where(ProcessedMessage.message_id == message_id))
+            except Exception as e:
+                self.metrics["db_errors"] += 1
+                logger.error(f"Dedup release error: {str(e)}")
+
+    async def _claim_db(self, message_id: str, now: float) -> bool:
+        from app.db.session import engine
+        try:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    insert(ProcessedMessage)
+                    .values(message_id=message_id, received_at=datetime.utcnow())
+                    .on_conflict_do_nothing()
+                    .returning(ProcessedMessage.message_id)
+                )
+                claimed = result.first() is not None
+                if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+                    self._last_purge = now
+                    cutoff = datetime.utcnow() - timedelta(seconds=settings.WEBHOOK_DEDUP_TTL_SECONDS)
+                    await conn.execute(delete(ProcessedMessage).where(ProcessedMessage.received_at < cutoff))
+                return claimed
+        except Exception as e:
+            # Fail open: a rare duplicate beats dropping a user's message
+            self.metrics["db_errors"] += 1
+            logger.error(f"Dedup claim error: {str(e)}")
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "backend": settings.WEBHOOK_DEDUP_BACKEND,
+            "entries": len(self._seen),
+            "hit_rate": round(self.metrics["hits"] / total, 4) if total else None
+        }
+
+
+message_dedup = MessageDeduplicator()
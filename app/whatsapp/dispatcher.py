@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.whatsapp.logger import logger, log_event
+from app.whatsapp.outbound import LATENCY_SAMPLES, percentile
+
+
+class IncomingMessage:
+    __slots__ = ("phone", "text", "received_at")
+
+    def __init__(self, phone: str, text: str):
+        self.phone = phone
+        self.text = text
+        self.received_at = time.perf_counter()
+
+
+async def process_message(phone: str, text: str) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.whatsapp.conversation_engine import handle_conversation
+
+    async with AsyncSessionLocal() as db_session:
+        await handle_conversation(phone, text, db_session)
+
+
+class WebhookDispatcher:
+    """
+    Incoming messages queued for WEBHOOK_CONSUMERS consumers, at most
+    WEBHOOK_QUEUE_SIZE waiting in total.
+
+    Each phone hashes to one consumer, so a user's messages are handled one at a
+    time and in arrival order, and no more than WEBHOOK_CONSUMERS DB sessions are
+    open for conversations at once. When the queue is full, submit waits up to
+    WEBHOOK_ENQUEUE_TIMEOUT and then refuses, so the webhook can answer 503 and
+    let Meta redeliver later.
+    """
+
+    def __init__(self):
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._accepting = False
+        self._depth = 0
+        self._waits: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._durations: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.metrics = {"submitted": 0, "processed": 0, "failed": 0, "rejected": 0, "max_depth": 0}
+
+    async def submit(self, phone: str, text: str) -> bool:
+        if not self._accepting:
+            if self._slots is None:
+                # Never started (scripts): handle inline
+                await process_message(phone, text)
+                return True
+            # Draining for shutdown
+            self.metrics["rejected"] += 1
+            return False
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=settings.WEBHOOK_ENQUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.metrics["rejected"] += 1
+            log_event("webhook_queue_full", level=logging.WARNING, phone=phone, queue_depth=self._depth)
+            return False
+        self._depth += 1
+        self.metrics["submitted"] += 1
+        self.metrics["max_depth"] = max(self.metrics["max_depth"], self._depth)
+        self._queues[hash(phone) % len(self._queues)].put_nowait(IncomingMessage(phone, text))
+        return True
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            message = await queue.get()
+            started = time.perf_counter()
+            self._waits.append((started - message.received_at) * 1000)
+            try:
+                await process_message(message.phone, message.text)
+                self.metrics["processed"] += 1
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Webhook dispatch error: {str(e)}")
+            finally:
+                self._durations.append((time.perf_counter() - started) * 1000)
+                self._depth -= 1
+                self._slots.release()
+                queue.task_done()
+
+    def start(self, consumers: Optional[int] = None) -> None:
+        if self._tasks:
+            return
+        consumers = max(consumers or settings.WEBHOOK_CONSUMERS, 1)
+        self._slots = asyncio.Semaphore(settings.WEBHOOK_QUEUE_SIZE)
+        self._queues = [asyncio.Queue() for _ in range(consumers)]
+        self._tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+        self._accepting = True
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting, finish what is queued (up to the timeout), then cancel consumers."""
+        if not self._tasks:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout or settings.WEBHOOK_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log_event("webhook_drain_timeout", level=logging.WARNING, queue_depth=self._depth)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        log_event("webhook_dispatcher_stopped", **self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        waits, durations = list(self._waits), list(self._durations)
+        return {
+            **self.metrics,
+            "consumers": len(self._tasks),
+            "queue_depth": self._depth,
+            "queue_capacity": settings.WEBHOOK_QUEUE_SIZE,
+            "wait_ms_p50": percentile(waits, 0.50),
+            "wait_ms_p99": percentile(waits, 0.99),
+            "handle_ms_p99": percentile(durations, 0.99)
+        }
+
+
+webhook_dispatcher = WebhookDispatcher()
@@ -0,0 +1,89 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Type
+
+# parse(db, phone, session_obj, text, reply) -> data to store, or None when it already replied
+Parse = Callable[..., Awaitable[Optional[Dict[str, Any]]]]
+# finish(db, phone, session_obj, data, reply) on a flow's last step
+Finish = Callable[..., Awaitable[None]]
+
+
+class Step:
+    """
+    One question of a flow. The reply is screened by `check` (answered with
+    `check_error` when it fails) and turned into session data by `parse`. The data
+    is then merged into the session before moving to the next step, or, on the
+    last step, handed to `finish`. Exceptions listed in `errors` are answered with
+    `error_reply`, in which {error} is the validation message.
+
+    `prompt` is the question sent when the flow arrives at this step.
+    """
+    __slots__ = (
+        "name", "prompt", "check", "check_error", "parse", "errors", "error_reply", "finish",
+        "flow", "next_step", "next_prompt"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        prompt: Optional[str] = None,
+        check: Optional[Callable[[str], bool]] = None,
+        check_error: Optional[str] = None,
+        parse: Optional[Parse] = None,
+        errors: Tuple[Type[Exception], ...] = (),
+        error_reply: str = "",
+        finish: Optional[Finish] = None
+    ):
+        self.name = name
+        self.prompt = prompt
+        self.check = check
+        self.check_error = check_error
+        self.parse = parse
+        self.errors = errors
+        self.error_reply = error_reply
+        self.finish = finish
+        # Filled in by compile_flows
+        self.flow: Optional[str] = None
+        self.next_step: Optional[str] = None
+        self.next_prompt: Optional[str] = None
+
+
+class Flow:
+    """An ordered list of steps, optionally started from idle by a command such as "post truck"."""
+    __slots__ = ("name", "steps", "command")
+
+    def __init__(self, name: str, steps: Iterable[Step], command: Optional[str] = None):
+        self.name = name
+        self.steps = list(steps)
+        self.command = command
+
+
+def compile_flows(flows: Iterable[Flow]) -> Tuple[Dict[Tuple[str, str], Step], Dict[str, Flow]]:
+    """
+    Link each step to the one after it and index them by (flow, step), the pair a
+    conversation session stores. Returns that table and the flows by start command.
+    Raises ValueError for definitions that could strand a session.
+    """
+    table: Dict[Tuple[str, str], Step] = {}
+    commands: Dict[str, Flow] = {}
+    for flow in flows:
+        if not flow.steps:
+            raise ValueError(f"Flow {flow.name} has no steps")
+        for position, step in enumerate(flow.steps):
+            key = (flow.name, step.name)
+            if key in table:
+                raise ValueError(f"Duplicate step {flow.name}.{step.name}")
+            if step.check is not None and not step.check_error:
+                raise ValueError(f"Step {flow.name}.{step.name} has a check but no check_error")
+            step.flow = flow.name
+            if step.finish is None:
+                if position + 1 == len(flow.steps):
+                    raise ValueError(f"Last step {flow.name}.{step.name} needs a finish action")
+                following = flow.steps[position + 1]
+                if not following.prompt:
+                    raise ValueError(f"Step {flow.name}.{following.name} needs a prompt")
+                step.next_step, step.next_prompt = following.name, following.prompt
+            table[key] = step
+        if flow.command:
+            if flow.command in commands:
+                raise ValueError(f"Command {flow.command!r} starts two flows")
+            commands[flow.command] = flow
+    return table, commands
@@ -1,21 +1,97 @@
-def format_truck_matches(loads: list) -> str:
+MORE_HINT = "\nReply MORE to see more matches."
+
+def format_truck_matches(loads: list, start: int = 1, more: bool = False) -> str:
     if not loads:
         return "No matching loads found yet. We will notify you when one appears."
     
     msg = "🚛 Matching Loads Found:\n\n"
-    for i, load in enumerate(loads, start=1):
+    for i, load in enumerate(loads, start=start):
         date_str = load.deadline.strftime("%d-%m-%Y")
         msg += f"{i}️⃣ {load.weight} tons\n   {load.pickup_city} → {load.drop_city}\n   Pickup: {date_str}\n\n"
     msg += "Reply: BOOK <number> to reserve."
+    if more:
+        msg += MORE_HINT
     return msg
 
-def format_load_matches(trucks: list) -> str:
+def format_load_matches(trucks: list, start: int = 1, more: bool = False) -> str:
     if not trucks:
         return "No matching trucks found yet. We will notify you when one appears."
     
     msg = "🚛 Matching Trucks Found:\n\n"
-    for i, truck in enumerate(trucks, start=1):
+    for i, truck in enumerate(trucks, start=start):
         date_str = truck.departure_time.strftime("%d-%m-%Y")
         msg += f"{i}️⃣ {truck.capacity_available} tons available\n   {truck.source_city} → {truck.destination_city}\n   Departure: {date_str}\n\n"
     msg += "Reply: BOOK <number> to reserve."
+    if more:
+        msg += MORE_HINT
+    return msg
+
+def format_batch_proposal(details: list, start: int = 1) -> str:
+    noun = "matches" if len(details) != 1 else "match"
+    msg = f"🔔 New {noun} found for your posts:\n\n"
+    for i, line in enumerate(details, start=start):
+        msg += f"{i}️⃣ {line}\n"
+    msg += "\nReply: BOOK <number> to reserve."
+    return msg
+
+def truck_match_details(truck) -> str:
+    return f"{truck.capacity_available} tons - {truck.source_city} -> {truck.destination_city} - {truck.departure_time.strftime('%d-%m-%Y')}"
+
+def load_match_details(load) -> str:
+    return f"{load.weight} tons - {load.pickup_city} -> {load.drop_city} - {load.deadline.strftime('%d-%m-%Y')}"
+
+def format_match_alert(matches: list, start: int = 1) -> str:
+    """matches: (my_type, details) pairs; one alert can cover the user's trucks and loads."""
+    types = {my_type for my_type, _ in matches}
+    if len(types) == 1:
+        my_type = types.pop()
+        counterpart = "trucks" if my_type == "load" else "loads"
+        msg = f"🔔 New {counterpart} matching your {my_type}:\n\n"
+    else:
+        msg = "🔔 New matches found for your posts:\n\n"
+    for i, (_, line) in enumerate(matches, start=start):
+        msg += f"{i}️⃣ {line}\n"
+    msg += "\nReply: BOOK <number> to reserve."
+    return msg
+
+def format_remaining_matches(details: list) -> str:
+    msg = "Your remaining matches:\n\n"
+    for i, line in enumerate(details, start=1):
+        msg += f"{i}️⃣ {line}\n"
+    msg += "\nReply: BOOK <number> to reserve."
+    return msg
+
+def format_consolidation_suggestion(numbers: list, total: float, capacity: float) -> str:
+    picks = " + ".join(str(n) for n in numbers)
+    return (
+        f"📦 Fill your truck: loads {picks} together weigh {total:g} of your {capacity:g} tons.\n"
+        f"Reply BOOK <number> for each load you want to carry."
+    )
+
+def format_trip_chains(truck, chains: list) -> str:
+    msg = f"🔁 Onward loads after {truck.destination_city}:\n\n"
+    for i, chain in enumerate(chains, start=1):
+        legs = " ⇒ ".join(
+            f"{load.pickup_city} → {load.drop_city} ({load.weight} tons, {load.deadline.strftime('%d-%m-%Y')})"
+            for load in chain.loads
+        )
+        msg += f"{i}️⃣ {legs}\n"
+    msg += f"\nPost a truck from {truck.destination_city} to book these."
     return msg
+
+def format_matches_summary(counterpart: str, count: int, start: int = 1, more: bool = False) -> str:
+    noun = counterpart if count != 1 else counterpart.rstrip("s")
+    found = f"{count} more matching {noun}" if start > 1 else f"{count} matching {noun} found"
+    msg = f"🚛 {found}. Tap View matches to pick one, or reply BOOK <number>."
+    if more:
+        msg += MORE_HINT
+    return msg
+
+def load_match_row(load) -> tuple:
+    return f"{load.weight} tons", f"{load.pickup_city} → {load.drop_city} · Pickup {load.deadline.strftime('%d-%m-%Y')}"
+
+def truck_match_row(truck) -> tuple:
+    return (
+        f"{truck.capacity_available} tons free",
+        f"{truck.source_city} → {truck.destination_city} · Departs {truck.departure_time.strftime('%d-%m-%Y')}"
+    )
@@ -1,15 +1,97 @@
+import atexit
+import json
 import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
 from app.core.config import settings
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is ~5x slower on large payloads
+    orjson = None
+
+
+def encode_json(fields: Dict[str, Any]) -> str:
+    if orjson is not None:
+        # default=str keeps parity with values json.dumps callers used to str() themselves
+        return orjson.dumps(fields, default=str).decode()
+    return json.dumps(fields, default=str)
+
+
+class LogEvent:
+    """A structured log message, encoded only when a handler formats it."""
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return encode_json(self.fields)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are, so formatting and JSON
+    encoding happen there instead of on the event loop. A full queue drops the
+    record (counted) rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 # Setting up structured logging
 logger = logging.getLogger("whatsapp_layer")
-logger.setLevel(logging.INFO)
+logger.setLevel(settings.LOG_LEVEL)
 
 formatter = logging.Formatter(
     '{"time": "%(asctime)s", "level": "%(levelname)s", "module": "%(name)s", "message": %(message)s}'
 )
 
+queue_handler = None
 if not logger.handlers:
     ch = logging.StreamHandler()
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    if settings.LOG_QUEUE_ENABLED:
+        queue_handler = BackgroundQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        listener = QueueListener(queue_handler.queue, ch)
+        listener.start()
+        # Flushes what is still queued on interpreter exit
+        atexit.register(listener.stop)
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(ch)
+
+
+def log_event(action: str, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    Log {"action": action, **fields} as JSON. Nothing is built when the level is
+    disabled, and actions listed in LOG_SAMPLE_RATES are kept at that rate.
+    Encoding happens later on the listener thread, so do not mutate the values.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = settings.LOG_SAMPLE_RATES.get(action)
+    if rate is not None and random.random() >= rate:
+        return
+    logger.log(level, LogEvent({"action": action, **fields}))
+
+
+def log_stats() -> Dict[str, Any]:
+    return {
+        "queued": queue_handler.queue.qsize() if queue_handler else 0,
+        "dropped": queue_handler.dropped if queue_handler else 0,
+        "encoder": "orjson" if orjson is not None else "json"
+    }
@@ -0,0 +1,201 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.models.pending_match import PendingMatchRow
+from app.whatsapp.logger import log_event
+
+# How often the Postgres backend deletes expired entries
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class PendingMatch:
+    """
+    One numbered match shown to a user: the counterpart id, the line they saw, and
+    which of their own posts it is for. Ids are kept as 16 raw bytes, and a list of
+    matches for one post shares a single my_id object.
+    """
+    __slots__ = ("_id", "_my_id", "my_type", "details")
+
+    def __init__(self, match_id, my_id, my_type: str, details: str):
+        self._id = _id_bytes(match_id)
+        self._my_id = my_id if isinstance(my_id, bytes) else _id_bytes(my_id)
+        self.my_type = "truck" if my_type == "truck" else "load"  # interned literal
+        self.details = details
+
+    @property
+    def id(self) -> str:
+        return str(uuid.UUID(bytes=self._id))
+
+    @property
+    def my_id(self) -> str:
+        return str(uuid.UUID(bytes=self._my_id))
+
+    def to_json(self) -> List[str]:
+        return [self.id, self.my_id, self.my_type, self.details]
+
+    @classmethod
+    def from_json(cls, item: List[str]) -> "PendingMatch":
+        return cls(*item)
+
+
+class MatchCursor:
+    """
+    Where MORE resumes for one of the user's posts: the rank key (score, id) of the
+    last match shown. The next page is whatever ranks below it.
+    """
+    __slots__ = ("my_type", "_my_id", "score", "last_id")
+
+    def __init__(self, my_type: str, my_id, score: float, last_id: str):
+        self.my_type = "truck" if my_type == "truck" else "load"
+        self._my_id = _id_bytes(my_id)
+        self.score = score
+        self.last_id = last_id
+
+    @property
+    def my_id(self) -> str:
+        return str(uuid.UUID(bytes=self._my_id))
+
+    @property
+    def after(self) -> Tuple[float, str]:
+        return self.score, self.last_id
+
+    def to_json(self) -> List[Any]:
+        return [self.my_type, self.my_id, self.score, self.last_id]
+
+    @classmethod
+    def from_json(cls, item: List[Any]) -> "MatchCursor":
+        return cls(*item)
+
+
+def cursor_for_page(my_type: str, my_id, after: Optional[Tuple[float, str]]) -> Optional[MatchCursor]:
+    """The cursor after a MatchPage, or None when it was the last page."""
+    return MatchCursor(my_type, my_id, *after) if after is not None else None
+
+
+def _id_bytes(value) -> bytes:
+    return (value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))).bytes
+
+
+def matches_for_post(my_type: str, my_id, counterparts: Iterable[Tuple[Any, str]]) -> List[PendingMatch]:
+    """PendingMatch records for (counterpart id, details) pairs that all belong to one post."""
+    my_id = _id_bytes(my_id)
+    return [PendingMatch(match_id, my_id, my_type, details) for match_id, details in counterparts]
+
+
+class MemoryMatchStore:
+    """Per-process LRU of pending matches by phone, bounded by PENDING_MATCH_MAX_USERS and expired by TTL."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[PendingMatch, ...], Optional[MatchCursor]]]" = OrderedDict()
+        self.metrics = {"puts": 0, "hits": 0, "misses": 0, "evicted": 0}
+
+    async def put(self, phone: str, matches: List[PendingMatch], cursor: Optional[MatchCursor] = None) -> None:
+        self.metrics["puts"] += 1
+        self._entries[phone] = (time.monotonic() + settings.PENDING_MATCH_TTL_SECONDS, tuple(matches), cursor)
+        self._entries.move_to_end(phone)
+        while len(self._entries) > settings.PENDING_MATCH_MAX_USERS:
+            self._entries.popitem(last=False)
+            self.metrics["evicted"] += 1
+
+    async def get(self, phone: str) -> Optional[Tuple[PendingMatch, ...]]:
+        entry = await self.get_with_cursor(phone)
+        return entry[0] if entry is not None else None
+
+    async def get_with_cursor(self, phone: str) -> Optional[Tuple[Tuple[PendingMatch, ...], Optional[MatchCursor]]]:
+        entry = self._entries.get(phone)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[phone]
+            self.metrics["misses"] += 1
+            return None
+        self._entries.move_to_end(phone)
+        self.metrics["hits"] += 1
+        return entry[1], entry[2]
+
+    async def discard(self, phone: str) -> None:
+        self._entries.pop(phone, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "backend": "memory", "users": len(self._entries)}
+
+
+class PostgresMatchStore:
+    """
+    Pending matches in the UNLOGGED pending_matches table, so any worker can serve a
+    user's BOOK. Unlogged: no WAL cost, and losing the contents on a crash only means
+    users are asked to repost, the same as a restart with the memory backend.
+    """
+
+    def __init__(self):
+        self._last_purge = 0.0
+        self.metrics = {"puts": 0, "hits": 0, "misses": 0}
+
+    async def put(self, phone: str, matches: List[PendingMatch], cursor: Optional[MatchCursor] = None) -> None:
+        from app.db.session import engine
+
+        self.metrics["puts"] += 1
+        expires_at = datetime.utcnow() + timedelta(seconds=settings.PENDING_MATCH_TTL_SECONDS)
+        payload = [m.to_json() for m in matches]
+        cursor_payload = cursor.to_json() if cursor is not None else None
+        stmt = insert(PendingMatchRow).values(
+            phone_number=phone, matches=payload, cursor=cursor_payload, expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["phone_number"],
+            set_={"matches": payload, "cursor": cursor_payload, "expires_at": expires_at}
+        )
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+            now = time.monotonic()
+            if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = now
+                await conn.execute(delete(PendingMatchRow).where(PendingMatchRow.expires_at < datetime.utcnow()))
+
+    async def get(self, phone: str) -> Optional[Tuple[PendingMatch, ...]]:
+        entry = await self.get_with_cursor(phone)
+        return entry[0] if entry is not None else None
+
+    async def get_with_cursor(self, phone: str) -> Optional[Tuple[Tuple[PendingMatch, ...], Optional[MatchCursor]]]:
+        from app.db.session import engine
+
+        async with engine.connect() as conn:
+            row = (await conn.execute(
+                select(PendingMatchRow.matches, PendingMatchRow.cursor).where(
+                    PendingMatchRow.phone_number == phone,
+                    PendingMatchRow.expires_at > datetime.utcnow()
+                )
+            )).one_or_none()
+        if row is None:
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["hits"] += 1
+        cursor = MatchCursor.from_json(row.cursor) if row.cursor else None
+        return tuple(PendingMatch.from_json(item) for item in row.matches), cursor
+
+    async def discard(self, phone: str) -> None:
+        from app.db.session import engine
+
+        async with engine.begin() as conn:
+            await conn.execute(delete(PendingMatchRow).where(PendingMatchRow.phone_number == phone))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "backend": "postgres"}
+
+
+def _create_store():
+    if settings.PENDING_MATCH_BACKEND == "postgres":
+        return PostgresMatchStore()
+    if settings.PENDING_MATCH_BACKEND != "memory":
+        log_event("unknown_pending_match_backend", level=logging.WARNING, backend=settings.PENDING_MATCH_BACKEND)
+    return MemoryMatchStore()
+
+
+pending_matches = _create_store()
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.whatsapp.client import send_message
+from app.whatsapp.formatters import format_match_alert
+from app.whatsapp.logger import logger, log_event
+from app.whatsapp.match_store import PendingMatch, pending_matches
+
+
+class _PendingAlert:
+    __slots__ = ("phone", "matches", "first_seen")
+
+    def __init__(self, phone: str):
+        self.phone = phone
+        self.matches: List[PendingMatch] = []
+        self.first_seen = time.monotonic()
+
+
+class MatchNotifier:
+    """
+    Coalesces match alerts per phone over NOTIFY_COALESCE_SECONDS and sends one
+    message per phone, paced to NOTIFY_MAX_PER_SECOND. The number of phones waiting
+    is bounded; alerts beyond it are dropped and counted rather than queued.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, _PendingAlert] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"alerts": 0, "coalesced": 0, "dropped": 0, "sent": 0, "failed": 0}
+
+    def notify(self, phone: str, my_type: str, my_id: str, match_id: str, details: str) -> None:
+        self.metrics["alerts"] += 1
+        alert = self._pending.get(phone)
+        if alert is None:
+            if len(self._pending) >= settings.NOTIFY_MAX_PENDING_USERS:
+                self.metrics["dropped"] += 1
+                return
+            alert = self._pending[phone] = _PendingAlert(phone)
+        else:
+            self.metrics["coalesced"] += 1
+        if len(alert.matches) < settings.MATCH_TOP_K and all((m.my_id, m.id) != (my_id, match_id) for m in alert.matches):
+            # Each match carries its own post id: one message can cover several of the user's posts
+            alert.matches.append(PendingMatch(match_id, my_id, my_type, details))
+
+    async def flush_due(self, force: bool = False) -> int:
+        now = time.monotonic()
+        due = [
+            phone for phone, alert in self._pending.items()
+            if force or now - alert.first_seen >= settings.NOTIFY_COALESCE_SECONDS
+        ]
+        interval = 1.0 / settings.NOTIFY_MAX_PER_SECOND if settings.NOTIFY_MAX_PER_SECOND > 0 else 0.0
+        for phone in due:
+            alert = self._pending.pop(phone)
+            try:
+                # Appended to the user's current list (cursor kept), numbered on from it
+                entry = await pending_matches.get_with_cursor(phone)
+                shown, cursor = entry if entry else ((), None)
+                listed = {(m.my_id, m.id) for m in shown}
+                fresh = [m for m in alert.matches if (m.my_id, m.id) not in listed]
+                if fresh:
+                    await pending_matches.put(phone, list(shown) + fresh, cursor)
+                    await send_message(phone, format_match_alert(
+                        [(m.my_type, m.details) for m in fresh], start=len(shown) + 1
+                    ))
+                    self.metrics["sent"] += 1
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Match alert error: {str(e)}")
+            if interval:
+                await asyncio.sleep(interval)
+        return len(due)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            try:
+                await self.flush_due()
+            except Exception as e:
+                logger.error(f"Match notifier error: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush_due(force=True)
+        log_event("match_notifier_stopped", **self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "pending_users": len(self._pending)}
+
+
+match_notifier = MatchNotifier()
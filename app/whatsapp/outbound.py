@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.whatsapp.client import Content, deliver
+from app.whatsapp.transport import GraphAPIError
+from app.whatsapp.logger import logger, log_event
+
+Transport = Callable[[str, Content], Awaitable[None]]
+
+# Recent send latencies kept for percentiles
+LATENCY_SAMPLES = 2048
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts up to `capacity`."""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OutboundMessage:
+    __slots__ = ("phone", "content", "attempts", "enqueued_at")
+
+    def __init__(self, phone: str, content: Content):
+        self.phone = phone
+        self.content = content
+        self.attempts = 0
+        self.enqueued_at = time.perf_counter()
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Network failures, throttling (429) and server errors are worth another try."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, GraphAPIError):
+        return exc.is_transient or exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    ceiling = min(settings.OUTBOUND_RETRY_MAX_SECONDS, settings.OUTBOUND_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+class OutboundSender:
+    """
+    Queued outbound messages drained by OUTBOUND_WORKERS senders sharing one token
+    bucket sized to the WhatsApp throughput tier.
+
+    Each phone always maps to the same worker, so replies to one user go out in the
+    order they were queued even while other users' messages run in parallel. Retries
+    back off on the owning worker for the same reason. When the workers are not
+    running (scripts, one-off tasks) enqueue sends inline.
+    """
+
+    def __init__(self, transport: Transport = deliver):
+        self._transport = transport
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._bucket = TokenBucket(settings.OUTBOUND_RATE_PER_SECOND, settings.OUTBOUND_BURST)
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._waits: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.metrics = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def enqueue(self, phone: str, content: Content) -> None:
+        message = OutboundMessage(phone, content)
+        if not self.running:
+            await self._deliver(message)
+            return
+        self.metrics["queued"] += 1
+        # Blocks when the shard is full: backpressure instead of unbounded memory
+        await self._queues[hash(phone) % len(self._queues)].put(message)
+
+    async def _deliver(self, message: OutboundMessage) -> None:
+        while True:
+            await self._bucket.acquire()
+            started = time.perf_counter()
+            if message.attempts == 0:
+                self._waits.append((started - message.enqueued_at) * 1000)
+            try:
+                await self._transport(message.phone, message.content)
+            except Exception as e:
+                if message.attempts < settings.OUTBOUND_MAX_RETRIES and is_retryable(e):
+                    message.attempts += 1
+                    self.metrics["retried"] += 1
+                    await asyncio.sleep(backoff_delay(message.attempts))
+                    continue
+                self.metrics["failed"] += 1
+                logger.error(f"Outbound send error: {str(e)}")
+                return
+            self._latencies.append((time.perf_counter() - started) * 1000)
+            self.metrics["sent"] += 1
+            return
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            message = await queue.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                logger.error(f"Outbound worker error: {str(e)}")
+            finally:
+                queue.task_done()
+
+    def start(self, workers: Optional[int] = None) -> None:
+        if self._tasks:
+            return
+        workers = max(workers or settings.OUTBOUND_WORKERS, 1)
+        shard_size = max(settings.OUTBOUND_QUEUE_SIZE // workers, 1)
+        self._queues = [asyncio.Queue(maxsize=shard_size) for _ in range(workers)]
+        self._tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            log_event("outbound_drain_timeout", level=logging.WARNING, queue_depth=self.queue_depth())
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        log_event("outbound_sender_stopped", **self.stats())
+
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def stats(self) -> Dict[str, Any]:
+        latencies, waits = list(self._latencies), list(self._waits)
+        return {
+            **self.metrics,
+            "workers": len(self._tasks),
+            "queue_depth": self.queue_depth(),
+            "send_ms_p50": percentile(latencies, 0.50),
+            "send_ms_p99": percentile(latencies, 0.99),
+            "queue_wait_ms_p99": percentile(waits, 0.99)
+        }
+
+
+outbound_sender = OutboundSender()
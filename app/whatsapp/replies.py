@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.whatsapp.client import Content, send_interactive, send_message
+
+# Graph API limits for text and list messages
+TEXT_LIMIT = 4096
+LIST_BODY_LIMIT = 1024
+LIST_MAX_ROWS = 10
+ROW_TITLE_LIMIT = 24
+ROW_DESCRIPTION_LIMIT = 72
+LIST_BUTTON = "View matches"
+
+reply_metrics: Dict[str, int] = {"turns": 0, "parts": 0, "requests": 0, "lists": 0}
+
+
+class MatchList:
+    """Numbered matches, as plain text and as list rows; the row id is the BOOK command it stands for."""
+    __slots__ = ("text", "summary", "section", "rows", "start")
+
+    def __init__(self, text: str, summary: str, section: str, rows: List[Tuple[str, str]], start: int = 1):
+        self.text = text
+        self.summary = summary
+        self.section = section
+        self.rows = rows
+        self.start = start
+
+
+class ReplyBuffer:
+    """
+    Everything the bot says to one phone during a turn, sent as one message when
+    the turn ends instead of one Graph API request per line. A turn with a match
+    list goes out as an interactive list message when the list fits its limits,
+    otherwise all parts are joined into one text.
+    """
+    __slots__ = ("phone", "parts", "matches")
+
+    def __init__(self, phone: str):
+        self.phone = phone
+        self.parts: List[Any] = []
+        self.matches: Optional[MatchList] = None
+
+    def add(self, text: str) -> None:
+        self.parts.append(text)
+
+    def add_matches(
+        self, text: str, summary: str, section: str, rows: List[Tuple[str, str]], start: int = 1
+    ) -> None:
+        """A match list numbered from `start`: `text` for plain text, `summary` and `rows` for a list message."""
+        self.matches = MatchList(text, summary, section, rows, start)
+        self.parts.append(self.matches)
+
+    def build(self) -> List[Content]:
+        """The messages to send for this turn, usually exactly one."""
+        if not self.parts:
+            return []
+        if self.matches is not None and self.matches.rows and settings.WHATSAPP_INTERACTIVE_LISTS:
+            interactive = self._as_list()
+            if interactive is not None:
+                return [interactive]
+        texts = [part.text if isinstance(part, MatchList) else part for part in self.parts]
+        return _join_within(texts, TEXT_LIMIT)
+
+    def _as_list(self) -> Optional[Dict[str, Any]]:
+        matches = self.matches
+        body = "\n\n".join(part.summary if part is matches else part for part in self.parts)
+        if len(body) > LIST_BODY_LIMIT or len(matches.rows) > LIST_MAX_ROWS:
+            return None
+        return {
+            "type": "list",
+            "body": {"text": body},
+            "action": {
+                "button": LIST_BUTTON,
+                "sections": [{
+                    "title": matches.section[:ROW_TITLE_LIMIT],
+                    "rows": [
+                        {
+                            "id": f"BOOK {i}",
+                            "title": f"{i}. {title}"[:ROW_TITLE_LIMIT],
+                            "description": description[:ROW_DESCRIPTION_LIMIT]
+                        }
+                        for i, (title, description) in enumerate(matches.rows, start=matches.start)
+                    ]
+                }]
+            }
+        }
+
+    async def flush(self) -> int:
+        """Sends what was collected and empties the buffer. Returns the number of requests made."""
+        messages = self.build()
+        reply_metrics["turns"] += 1
+        reply_metrics["parts"] += len(self.parts)
+        reply_metrics["requests"] += len(messages)
+        self.parts, self.matches = [], None
+        for message in messages:
+            if isinstance(message, str):
+                await send_message(self.phone, message)
+            else:
+                reply_metrics["lists"] += 1
+                await send_interactive(self.phone, message)
+        return len(messages)
+
+
+def _join_within(texts: List[str], limit: int) -> List[str]:
+    """Joins texts with blank lines, starting a new message only where one would exceed `limit`."""
+    messages: List[str] = []
+    for text in texts:
+        if messages and len(messages[-1]) + 2 + len(text) <= limit:
+            messages[-1] += "\n\n" + text
+        else:
+            messages.append(text)
+    return messages
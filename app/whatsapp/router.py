@@ -1,5 +1,4 @@
-import json
-from app.whatsapp.logger import logger
+from app.whatsapp.logger import log_event
 from app.whatsapp.handlers import (
     handle_post_truck,
     handle_post_load,
@@ -33,8 +32,4 @@ async def route_intent(phone: str, text: str) -> None:
         intent = "unknown"
         await handle_unknown(phone)
         
-    logger.info(json.dumps({
-        "action": "intent_routed",
-        "phone": phone,
-        "intent_detected": intent
-    }))
+    log_event("intent_routed", phone=phone, intent_detected=intent)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.whatsapp.logger import log_event
+
+try:
+    import h2  # noqa: F401  (httpx only negotiates HTTP/2 when h2 is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class GraphAPIError(Exception):
+    """Non-2xx response from the Graph API, with its error body when there is one."""
+
+    def __init__(self, status_code: int, error: Dict[str, Any]):
+        self.status_code = status_code
+        self.code = error.get("code")
+        self.is_transient = bool(error.get("is_transient"))
+        super().__init__(f"Graph API {status_code}: {error.get('message', 'unknown error')} (code {self.code})")
+
+
+class GraphTransport:
+    """
+    Shared async client for the Graph API messages endpoint: keep-alive pooled
+    connections, HTTP/2 when available, limits and timeouts from settings.
+    Opened on app startup and closed on shutdown; scripts get one lazily.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            "base_url": f"{settings.WHATSAPP_API_BASE_URL.rstrip('/')}/v{settings.WHATSAPP_API_VERSION}",
+            # No token configured: let the API answer 401 rather than send an illegal header
+            "headers": {"Authorization": f"Bearer {settings.WHATSAPP_TOKEN}"} if settings.WHATSAPP_TOKEN else {},
+            "http2": settings.WHATSAPP_HTTP2 and HTTP2_AVAILABLE,
+            "limits": httpx.Limits(
+                max_connections=settings.WHATSAPP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WHATSAPP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.WHATSAPP_KEEPALIVE_EXPIRY
+            ),
+            "timeout": httpx.Timeout(
+                settings.WHATSAPP_READ_TIMEOUT,
+                connect=settings.WHATSAPP_CONNECT_TIMEOUT,
+                pool=settings.WHATSAPP_POOL_TIMEOUT
+            )
+        }
+
+    def _opened(self, options: Dict[str, Any]) -> None:
+        log_event(
+            "graph_transport_opened",
+            transport=type(self).__name__,
+            http2=options["http2"],
+            max_connections=settings.WHATSAPP_MAX_CONNECTIONS
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            options = self._client_options()
+            self._client = httpx.AsyncClient(**options)
+            self._opened(options)
+        return self._client
+
+    def start(self) -> None:
+        self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send_text(self, phone: str, text: str) -> Dict[str, Any]:
+        return await self._send(phone, {"type": "text", "text": {"body": text, "preview_url": False}})
+
+    async def send_interactive(self, phone: str, interactive: Dict[str, Any]) -> Dict[str, Any]:
+        """An interactive message, e.g. a list whose rows the user can tap."""
+        return await self._send(phone, {"type": "interactive", "interactive": interactive})
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> httpx.Response:
+        return await self.client.post(path, json=body)
+
+    async def _send(self, phone: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._post(f"/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages", {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": phone,
+            **message
+        })
+        if response.status_code >= 400:
+            try:
+                error = response.json().get("error") or {}
+            except ValueError:
+                error = {"message": response.text[:200]}
+            raise GraphAPIError(response.status_code, error)
+        return response.json()
+
+
+class ThreadedGraphTransport(GraphTransport):
+    """
+    The same sends over a shared blocking client, run on one thread per outbound
+    worker. Costs less client CPU per send than the async pool, which decides
+    latency when the sender shares its CPU (see scripts/bench_transport.py).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sync_client: Optional[httpx.Client] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            options = self._client_options()
+            self._sync_client = httpx.Client(**options)
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.OUTBOUND_WORKERS, thread_name_prefix="wa-send"
+            )
+            self._opened(options)
+        return self._sync_client
+
+    def start(self) -> None:
+        self.sync_client
+
+    async def close(self) -> None:
+        if self._sync_client is not None:
+            self._executor.shutdown(wait=True)
+            self._sync_client.close()
+            self._sync_client = None
+            self._executor = None
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> httpx.Response:
+        client = self.sync_client
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: client.post(path, json=body))
+
+
+def _create_transport() -> GraphTransport:
+    if settings.WHATSAPP_TRANSPORT == "async":
+        return GraphTransport()
+    if settings.WHATSAPP_TRANSPORT != "threads":
+        log_event("unknown_whatsapp_transport", level=logging.WARNING, transport=settings.WHATSAPP_TRANSPORT)
+    return ThreadedGraphTransport()
+
+
+graph_transport = _create_transport()
@@ -1,8 +1,26 @@
-from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
 import datetime
+from app.geocoding.gazetteer import gazetteer
+from app.geocoding.fuzzy import get_city_resolver
 
 class PickupDropCityValidator(BaseModel):
     city: str = Field(..., min_length=3)
+    # Filled from the offline gazetteer; None when the city is not in it
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    # Closest known city when the input is not an exact (or alias) match
+    suggestion: Optional[str] = None
+
+    @model_validator(mode="after")
+    def geocode(self) -> "PickupDropCityValidator":
+        resolution = get_city_resolver().resolve(self.city)
+        if resolution and resolution.exact:
+            point = gazetteer.lookup(resolution.name)
+            self.city, self.lat, self.lng = point.name, point.lat, point.lng
+        elif resolution:
+            self.suggestion = resolution.name
+        return self
 
 class CapacityValidator(BaseModel):
     capacity: int = Field(..., ge=1, le=100)
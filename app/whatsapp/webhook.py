@@ -1,12 +1,26 @@
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Request, Response, HTTPException
-import json
+import logging
 from app.core.config import settings
-from app.whatsapp.logger import logger
+from app.whatsapp.logger import log_event
 from app.whatsapp.router import route_intent
+from app.whatsapp.dispatcher import webhook_dispatcher
+from app.whatsapp.dedup import message_dedup
 
 router = APIRouter()
 
+def message_text(message: dict) -> Optional[str]:
+    """
+    The text of a text message, or the row id of a tapped list reply, which is the
+    command it stands for (e.g. "BOOK 2"). None for other message types.
+    """
+    if message.get("type") == "text":
+        return message.get("text", {}).get("body")
+    if message.get("type") == "interactive":
+        interactive = message.get("interactive", {})
+        return (interactive.get("list_reply") or interactive.get("button_reply") or {}).get("id")
+    return None
+
 @router.get("/webhook")
 async def verify_webhook(request: Request) -> Response:
     """
@@ -17,10 +31,10 @@ async def verify_webhook(request: Request) -> Response:
     challenge = request.query_params.get("hub.challenge")
 
     if mode == "subscribe" and token == settings.WHATSAPP_VERIFY_TOKEN:
-        logger.info(json.dumps({"action": "webhook_verified"}))
+        log_event("webhook_verified")
         return Response(content=challenge, status_code=200)
     
-    logger.warning(json.dumps({"action": "webhook_verification_failed"}))
+    log_event("webhook_verification_failed", level=logging.WARNING)
     raise HTTPException(status_code=403, detail="Verification failed")
 
 
@@ -34,10 +48,7 @@ async def receive_webhook(request: Request) -> Any:
     except ValueError:
         return Response(status_code=400)
         
-    logger.info(json.dumps({
-        "action": "incoming_webhook",
-        "payload": data
-    }))
+    log_event("incoming_webhook", payload=data)
 
     if data.get("object") == "whatsapp_business_account":
         for entry in data.get("entry", []):
@@ -46,29 +57,21 @@ async def receive_webhook(request: Request) -> Any:
                 messages = value.get("messages", [])
                 
                 for message in messages:
-                    # Ignore non-text messages
-                    if message.get("type") != "text":
-                        continue
-                        
                     phone = message.get("from")
-                    text = message.get("text", {}).get("body")
+                    text = message_text(message)
                     
                     if phone and text:
-                        logger.info(json.dumps({
-                            "action": "message_parsed",
-                            "phone": phone,
-                            "text": text
-                        }))
-                        
-                        # Acquire DB Session from async session maker (since this is an event loop triggered fast background task)
-                        from app.db.session import AsyncSessionLocal
-                        from app.whatsapp.conversation_engine import handle_conversation
+                        # Meta retries deliveries: handle each message id once
+                        message_id = message.get("id")
+                        if not await message_dedup.claim(message_id):
+                            log_event("duplicate_message_skipped", message_id=message_id)
+                            continue
+
+                        log_event("message_parsed", phone=phone, text=text)
                         
-                        async def process_msg():
-                            async with AsyncSessionLocal() as db_session:
-                                await handle_conversation(phone, text, db_session)
-                                
-                        import asyncio
-                        asyncio.create_task(process_msg())
+                        # Queued per phone; a full queue asks Meta to redeliver later
+                        if not await webhook_dispatcher.submit(phone, text):
+                            await message_dedup.release(message_id)
+                            return Response(content="Busy", status_code=503)
 
     return Response(content="OK", status_code=200)
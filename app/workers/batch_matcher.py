@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.truck import Truck
+from app.models.load import Load
+from app.models.user import User
+from app.models.booking import Booking
+from app.models.enums import FreightStatus
+from app.matching.assignment import solve_assignment
+from app.matching.scoring import MATCH_WINDOW
+from app.whatsapp.client import send_message
+from app.whatsapp.formatters import format_batch_proposal, truck_match_details, load_match_details
+from app.whatsapp.logger import logger, log_event
+from app.whatsapp.match_store import PendingMatch, pending_matches
+
+_EPOCH = datetime(1970, 1, 1)
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Pairs already proposed, pruned to open inventory each run so nobody is told twice.
+# Process-local: after a restart, bookings and the users' pending match lists tell
+# which pairs were already seen.
+_proposed: Set[Tuple[str, str]] = set()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: never fork a process that is running an event loop and DB pool
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.BATCH_MATCH_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _iter_chunks(db: AsyncSession, model, columns, owner_fk) -> AsyncIterator[list]:
+    """Open rows of model as column tuples, keyset-paginated by id."""
+    last_id = None
+    while True:
+        query = select(*columns, User.rating, User.phone_number).join(
+            User, User.id == owner_fk
+        ).where(model.status == FreightStatus.OPEN).order_by(model.id).limit(settings.BATCH_MATCH_CHUNK_SIZE)
+        if last_id is not None:
+            query = query.where(model.id > last_id)
+        rows = (await db.execute(query)).all()
+        if rows:
+            yield rows
+        if len(rows) < settings.BATCH_MATCH_CHUNK_SIZE:
+            return
+        last_id = rows[-1].id
+
+
+async def run_batch_match() -> Dict[str, Any]:
+    started = time.perf_counter()
+    truck_rows, load_rows = [], []
+    trucks: Dict[str, Any] = {}
+    loads: Dict[str, Any] = {}
+
+    async with AsyncSessionLocal() as db:
+        truck_columns = (
+            Truck.id, Truck.source_city_id, Truck.destination_city_id, Truck.capacity_available,
+            Truck.departure_time, Truck.source_city, Truck.destination_city, Truck.driver_id
+        )
+        async for chunk in _iter_chunks(db, Truck, truck_columns, Truck.driver_id):
+            for row in chunk:
+                if row.source_city_id is None or row.destination_city_id is None:
+                    continue
+                truck_id = str(row.id)
+                trucks[truck_id] = row
+                truck_rows.append((
+                    truck_id, str(row.source_city_id), str(row.destination_city_id),
+                    row.capacity_available, (row.departure_time - _EPOCH).total_seconds(), row.rating,
+                    str(row.driver_id)
+                ))
+
+        load_columns = (
+            Load.id, Load.pickup_city_id, Load.drop_city_id, Load.weight,
+            Load.deadline, Load.pickup_city, Load.drop_city, Load.shipper_id
+        )
+        async for chunk in _iter_chunks(db, Load, load_columns, Load.shipper_id):
+            for row in chunk:
+                if row.pickup_city_id is None or row.drop_city_id is None:
+                    continue
+                load_id = str(row.id)
+                loads[load_id] = row
+                load_rows.append((
+                    load_id, str(row.pickup_city_id), str(row.drop_city_id),
+                    row.weight, (row.deadline - _EPOCH).total_seconds(), row.rating,
+                    str(row.shipper_id)
+                ))
+    fetched = time.perf_counter()
+
+    weights = (settings.MATCH_WEIGHT_CAPACITY, settings.MATCH_WEIGHT_TIME, settings.MATCH_WEIGHT_RATING)
+    loop = asyncio.get_running_loop()
+    proposals = await loop.run_in_executor(
+        _get_pool(), solve_assignment, truck_rows, load_rows, MATCH_WINDOW.total_seconds(), weights
+    )
+    solved = time.perf_counter()
+
+    stale = {pair for pair in _proposed if pair[0] not in trucks or pair[1] not in loads}
+    _proposed.difference_update(stale)
+    fresh = [(truck_id, load_id) for truck_id, load_id, _ in proposals if (truck_id, load_id) not in _proposed]
+    _proposed.update(fresh)
+    async with AsyncSessionLocal() as db:
+        booked = await _booked_pairs(db, fresh)
+
+    # One message per phone, however many of the user's posts were matched
+    by_phone: Dict[str, List[PendingMatch]] = {}
+    for truck_id, load_id in fresh:
+        if (truck_id, load_id) in booked:
+            continue
+        truck, load = trucks[truck_id], loads[load_id]
+        by_phone.setdefault(truck.phone_number, []).append(
+            PendingMatch(load.id, truck.id, "truck", load_match_details(load))
+        )
+        by_phone.setdefault(load.phone_number, []).append(
+            PendingMatch(truck.id, load.id, "load", truck_match_details(truck))
+        )
+    notified = 0
+    for phone, matches in by_phone.items():
+        notified += await _notify_phone(phone, matches)
+
+    stats = {
+        "trucks": len(truck_rows),
+        "loads": len(load_rows),
+        "proposals": len(proposals),
+        "notified": notified,
+        "fetch_ms": round((fetched - started) * 1000, 1),
+        "solve_ms": round((solved - fetched) * 1000, 1),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    log_event("batch_match_completed", **stats)
+    return stats
+
+
+async def _booked_pairs(db: AsyncSession, pairs: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Pairs that were booked before, including bookings that later expired or were cancelled."""
+    booked: Set[Tuple[str, str]] = set()
+    truck_ids = sorted({uuid.UUID(truck_id) for truck_id, _ in pairs})
+    for i in range(0, len(truck_ids), settings.BATCH_MATCH_CHUNK_SIZE):
+        chunk = truck_ids[i:i + settings.BATCH_MATCH_CHUNK_SIZE]
+        rows = await db.execute(select(Booking.truck_id, Booking.load_id).where(Booking.truck_id.in_(chunk)))
+        booked.update((str(truck_id), str(load_id)) for truck_id, load_id in rows)
+    return booked
+
+
+async def _notify_phone(phone: str, proposals: List[PendingMatch]) -> int:
+    """
+    Appends proposals to the user's numbered match list, keeping its MORE cursor,
+    and sends them as one message numbered on from the matches already listed.
+    """
+    try:
+        entry = await pending_matches.get_with_cursor(phone)
+        shown, cursor = entry if entry else ((), None)
+        # Matches the user was already shown, e.g. when the post was created
+        listed = {(m.my_id, m.id) for m in shown}
+        fresh = [m for m in proposals if (m.my_id, m.id) not in listed]
+        if not fresh:
+            return 0
+        await pending_matches.put(phone, list(shown) + fresh, cursor)
+        await send_message(phone, format_batch_proposal([m.details for m in fresh], start=len(shown) + 1))
+        return 1
+    except Exception as e:
+        logger.error(f"Batch match notification error: {str(e)}")
+        return 0
+
+
+async def start_batch_matcher_worker():
+    while True:
+        await asyncio.sleep(settings.BATCH_MATCH_INTERVAL_SECONDS)
+        try:
+            await run_batch_match()
+        except Exception as e:
+            logger.error(f"Batch matcher error: {str(e)}")
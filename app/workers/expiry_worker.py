@@ -6,8 +6,8 @@ from app.models.booking import Booking
 from app.models.truck import Truck
 from app.models.load import Load
 from app.models.enums import BookingStatus, PaymentStatus, FreightStatus
-from app.whatsapp.logger import logger
-import json
+from app.whatsapp.logger import logger, log_event
+from app.matching.lane_index import lane_index
 
 async def start_reservation_expiry_worker():
     while True:
@@ -21,6 +21,7 @@ async def start_reservation_expiry_worker():
                 
                 res = await db.execute(stmt)
                 expired_bookings = res.scalars().all()
+                reopened = []
                 
                 for booking in expired_bookings:
                     booking.status = BookingStatus.EXPIRED
@@ -32,19 +33,34 @@ async def start_reservation_expiry_worker():
                     truck = (await db.execute(truck_stmt)).scalars().first()
                     load = (await db.execute(load_stmt)).scalars().first()
                     
-                    if truck and truck.status == FreightStatus.RESERVED:
-                        truck.status = FreightStatus.OPEN
+                    # Only a load still held by this booking releases its share of the truck;
+                    # one dropped or rebooked since has nothing to give back
                     if load and load.status == FreightStatus.RESERVED:
                         load.status = FreightStatus.OPEN
+                        reopened.append(load)
+                        if truck:
+                            # Give the load's share of the truck back; a full truck reopens
+                            truck.capacity_available = min(truck.capacity_available + load.weight, truck.capacity_total)
+                            if truck.status in (FreightStatus.RESERVED, FreightStatus.BOOKED):
+                                truck.status = FreightStatus.OPEN
+                            if truck.status == FreightStatus.OPEN:
+                                reopened.append(truck)
                         
-                    logger.info(json.dumps({
-                        "action": "booking_expired",
-                        "booking_id": str(booking.id),
-                        "reference_id": booking.booking_reference_id
-                    }))
+                    log_event(
+                        "booking_expired",
+                        booking_id=str(booking.id),
+                        reference_id=booking.booking_reference_id
+                    )
                 
                 if expired_bookings:
                     await db.commit()
+                    
+                    # Released inventory becomes matchable again
+                    for obj in reopened:
+                        if isinstance(obj, Truck):
+                            lane_index.upsert_truck(obj)
+                        else:
+                            lane_index.upsert_load(obj)
         except Exception as e:
             logger.error(f"Expiry worker error: {str(e)}")
             
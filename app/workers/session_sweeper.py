@@ -0,0 +1,89 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.session_cache import session_cache, INVALIDATION_CHANNEL
+from app.whatsapp.logger import logger, log_event
+
+# One bounded batch of idle sessions. ctid avoids a second index lookup per row,
+# and SKIP LOCKED leaves sessions a message is updating right now alone.
+SWEEP_BATCH = text("""
+    DELETE FROM conversation_sessions
+    WHERE ctid IN (
+        SELECT ctid FROM conversation_sessions
+        WHERE updated_at < :cutoff
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING phone_number
+""")
+
+NOTIFY_SWEPT = text(
+    "SELECT pg_notify(:channel, :origin || '|' || phone) FROM unnest(:phones) AS phone"
+).bindparams(bindparam("phones", type_=ARRAY(String)))
+
+sweeper_metrics: Dict[str, Any] = {
+    "runs": 0, "failed_runs": 0, "swept_total": 0,
+    "last_swept": 0, "last_batches": 0, "last_duration_ms": 0.0, "last_run_at": None
+}
+
+
+async def _sweep_batch(cutoff: datetime) -> List[str]:
+    async with engine.begin() as conn:
+        phones = list((await conn.execute(
+            SWEEP_BATCH, {"cutoff": cutoff, "batch_size": settings.SESSION_SWEEP_BATCH_SIZE}
+        )).scalars())
+        if phones and session_cache.notify_enabled:
+            # Transactional like the delete: other workers drop their copies only if it commits
+            await conn.execute(NOTIFY_SWEPT, {
+                "channel": INVALIDATION_CHANNEL, "origin": session_cache.origin, "phones": phones
+            })
+    return phones
+
+
+async def run_session_sweep() -> Dict[str, Any]:
+    """Deletes sessions idle for longer than SESSION_TTL_SECONDS, one batch per transaction."""
+    started = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SESSION_TTL_SECONDS)
+    swept = batches = 0
+    while True:
+        phones = await _sweep_batch(cutoff)
+        batches += 1
+        swept += len(phones)
+        for phone in phones:
+            session_cache.invalidate(phone)
+        if len(phones) < settings.SESSION_SWEEP_BATCH_SIZE:
+            break
+        # Let queued messages use the pool between batches
+        await asyncio.sleep(0)
+
+    stats = {
+        "swept": swept,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    sweeper_metrics["runs"] += 1
+    sweeper_metrics["swept_total"] += swept
+    sweeper_metrics["last_swept"] = swept
+    sweeper_metrics["last_batches"] = batches
+    sweeper_metrics["last_duration_ms"] = stats["duration_ms"]
+    sweeper_metrics["last_run_at"] = datetime.utcnow().isoformat()
+    if swept:
+        log_event("session_sweep_completed", **stats)
+    return stats
+
+
+async def start_session_sweeper_worker():
+    while True:
+        try:
+            await run_session_sweep()
+        except Exception as e:
+            sweeper_metrics["failed_runs"] += 1
+            logger.error(f"Session sweeper error: {str(e)}")
+        await asyncio.sleep(settings.SESSION_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,71 @@
+"""
+Timing of the batch assignment solve over synthetic open inventory.
+
+    python scripts/bench_batch_matcher.py --trucks 10000 --loads 10000 --cities 40
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.matching.assignment import solve_assignment  # noqa: E402
+
+DAY = 86400.0
+WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def make_rows(rng: random.Random, count: int, cities: int, prefix: str, amount_range):
+    # A few hub cities carry most of the traffic, as in real freight data
+    hubs = [f"city-{i}" for i in range(cities)]
+    popularity = [1.0 / (i + 1) for i in range(cities)]
+    rows = []
+    for i in range(count):
+        src, dst = rng.choices(hubs, popularity, k=2)
+        rows.append((
+            f"{prefix}-{i}", src, dst, rng.uniform(*amount_range),
+            rng.uniform(0, 14 * DAY), rng.uniform(3.0, 5.0), f"user-{rng.randrange(count)}"
+        ))
+    return rows
+
+
+async def solve_in_pool(trucks, loads) -> float:
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Warm the worker so process start-up is not part of the measurement
+        await loop.run_in_executor(pool, solve_assignment, [], [], DAY, WEIGHTS)
+        started = time.perf_counter()
+        await loop.run_in_executor(pool, solve_assignment, trucks, loads, DAY, WEIGHTS)
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trucks", type=int, default=10_000)
+    parser.add_argument("--loads", type=int, default=10_000)
+    parser.add_argument("--cities", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    trucks = make_rows(rng, args.trucks, args.cities, "truck", (5.0, 30.0))
+    loads = make_rows(rng, args.loads, args.cities, "load", (1.0, 30.0))
+
+    started = time.perf_counter()
+    proposals = solve_assignment(trucks, loads, DAY, WEIGHTS)
+    inline_s = time.perf_counter() - started
+    pool_s = asyncio.run(solve_in_pool(trucks, loads))
+
+    print(f"inventory           : {args.trucks} trucks x {args.loads} loads over {args.cities} cities")
+    print(f"pairs proposed      : {len(proposals)} (total score {sum(p[2] for p in proposals):.1f})")
+    print(f"solve inline        : {inline_s:.2f}s")
+    print(f"solve in worker     : {pool_s:.2f}s (incl. pickling)")
+
+
+if __name__ == "__main__":
+    main()
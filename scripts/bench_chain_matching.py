@@ -0,0 +1,79 @@
+"""
+Chained-trip search latency over synthetic open loads.
+
+    python scripts/bench_chain_matching.py --loads 50000 --cities 200 --legs 3
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.matching.chains import find_chains  # noqa: E402
+from app.matching.lane_index import lane_index  # noqa: E402
+from app.models.enums import FreightStatus  # noqa: E402
+
+# Rough bounding box of India
+LAT_RANGE = (8.0, 32.0)
+LNG_RANGE = (68.0, 90.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=50_000)
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--legs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    base = datetime(2026, 11, 1)
+    cities = [
+        SimpleNamespace(id=uuid.uuid4(), name=f"city-{i}", lat=rng.uniform(*LAT_RANGE), lng=rng.uniform(*LNG_RANGE))
+        for i in range(args.cities)
+    ]
+
+    started = time.perf_counter()
+    for _ in range(args.loads):
+        pickup, drop = rng.sample(cities, 2)
+        lane_index.upsert_load(SimpleNamespace(
+            id=uuid.uuid4(), shipper_id=uuid.uuid4(), status=FreightStatus.OPEN, category="general",
+            pickup_city=pickup.name, drop_city=drop.name, pickup_city_id=pickup.id, drop_city_id=drop.id,
+            pickup_lat=pickup.lat, pickup_lng=pickup.lng, drop_lat=drop.lat, drop_lng=drop.lng,
+            deadline=base + timedelta(days=rng.randint(0, args.days)), weight=float(rng.randint(1, 30))
+        ))
+    lane_index.ready = True
+    build_s = time.perf_counter() - started
+
+    latencies = []
+    found = legs = 0
+    for _ in range(args.queries):
+        source, dest = rng.sample(cities, 2)
+        truck = SimpleNamespace(
+            driver_id=uuid.uuid4(), destination_city_id=dest.id, capacity_total=float(rng.choice([10, 20, 30])),
+            source_lat=source.lat, source_lng=source.lng, dest_lat=dest.lat, dest_lng=dest.lng,
+            departure_time=base + timedelta(days=rng.randint(0, args.days - 5))
+        )
+        t0 = time.perf_counter()
+        chains = find_chains(truck, max_legs=args.legs)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found += bool(chains)
+        legs += max((len(c.loads) for c in chains), default=0)
+
+    latencies.sort()
+    print(f"loads indexed       : {args.loads} over {args.cities} cities in {build_s:.2f}s")
+    print(f"queries             : {args.queries} (up to {args.legs} legs)")
+    print(f"trucks with a chain : {found / args.queries:.1%}, avg longest chain {legs / args.queries:.2f} legs")
+    print(f"latency p50 / p99   : {statistics.median(latencies):.3f} ms / {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
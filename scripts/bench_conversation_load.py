@@ -0,0 +1,296 @@
+"""
+Conversation load generator: N simulated phones drive full conversations through
+the real POST /webhook endpoint, webhook dispatcher, conversation engine and
+database, and the run is compared against a stored JSON baseline.
+
+Phones work in pairs on one lane: the shipper posts a load, then the driver posts
+a truck, books the first match and confirms. Each phone sends its next message
+once the reply to the previous one arrives, so latency is webhook POST to reply.
+Turn replies are captured in-process instead of sent; match alerts from the
+notifier and batch matcher are counted but not waited for.
+
+Reports throughput, p50/p95/p99 latency per step, database round trips per
+message (BEGIN, statements and COMMIT/ROLLBACK from every path, background
+workers included) and connection pool checkout time.
+
+Needs Postgres migrated to head (DATABASE_* settings). The app boots with its
+own startup handler, so workers and diagnostics run as in production.
+
+    python scripts/bench_conversation_load.py --phones 100 --write-baseline
+    python scripts/bench_conversation_load.py --phones 100   # exits 1 on regression
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app.whatsapp.notifier as notifier  # noqa: E402
+import app.whatsapp.replies as replies  # noqa: E402
+import app.workers.batch_matcher as batch_matcher  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.main import app, startup_event, shutdown_event  # noqa: E402
+from app.whatsapp.outbound import percentile  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "conversation_load.json"
+CITIES = ["Jaipur", "Delhi", "Mumbai", "Pune", "Ahmedabad", "Surat", "Lucknow", "Kanpur", "Indore", "Bhopal"]
+LANES = list(itertools.permutations(CITIES, 2))
+WEBHOOK_PATH = f"{settings.API_V1_STR}/whatsapp/webhook"
+DATE = (datetime.utcnow() + timedelta(days=2)).strftime("%d-%m-%Y")
+# Latency checks allow this much on top of the relative tolerance, so sub-millisecond noise is not a regression
+LATENCY_SLACK_MS = 2.0
+
+
+def load_script(pickup: str, drop: str) -> List[tuple]:
+    return [
+        ("post_load/start", "post load"),
+        ("post_load/pickup_city", pickup),
+        ("post_load/drop_city", drop),
+        ("post_load/weight_tons", "8"),
+        ("post_load/category", "General"),
+        ("post_load/pickup_date", DATE),
+    ]
+
+
+def truck_script(pickup: str, drop: str) -> List[tuple]:
+    return [
+        ("post_truck/start", "post truck"),
+        ("post_truck/pickup_city", pickup),
+        ("post_truck/drop_city", drop),
+        ("post_truck/capacity_tons", "20"),
+        ("post_truck/available_date", DATE),
+        ("booking/book", "BOOK 1"),
+        ("booking/confirm", "CONFIRM"),
+    ]
+
+
+def webhook_payload(phone: str, text: str, message_id: str) -> Dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "bench",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "contacts": [{"profile": {"name": "Bench"}, "wa_id": phone}],
+                    "messages": [{
+                        "from": phone,
+                        "id": message_id,
+                        "timestamp": str(int(time.time())),
+                        "type": "text",
+                        "text": {"body": text}
+                    }]
+                }
+            }]
+        }]
+    }
+
+
+class Recorder:
+    """Stands in for the Graph API: turn replies wake the phone waiting for them."""
+
+    def __init__(self):
+        self.replies: Dict[str, asyncio.Queue] = defaultdict(asyncio.Queue)
+        self.alerts = 0
+
+    async def reply(self, phone: str, content) -> None:
+        self.replies[phone].put_nowait(time.perf_counter())
+
+    async def alert(self, phone: str, text: str) -> None:
+        self.alerts += 1
+
+
+class DatabaseProbe:
+    """Counts round trips on the app engine and times pool checkouts."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.checkout_ms: List[float] = []
+        sync_engine = engine.sync_engine
+        for name in ("begin", "before_cursor_execute", "commit", "rollback"):
+            event.listen(sync_engine, name, self._on_round_trip)
+        pool = sync_engine.pool
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                self.checkout_ms.append((time.perf_counter() - started) * 1000)
+        pool.connect = timed_connect
+
+    def _on_round_trip(self, *args) -> None:
+        self.round_trips += 1
+
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, reply_timeout: float):
+        self.client = client
+        self.recorder = recorder
+        self.reply_timeout = reply_timeout
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.message_ids = itertools.count(1)
+        self.messages = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    async def send(self, phone: str, step: str, text: str) -> bool:
+        started = time.perf_counter()
+        response = await self.client.post(WEBHOOK_PATH, json=webhook_payload(
+            phone, text, f"wamid.BENCH{phone}{next(self.message_ids):08d}"
+        ))
+        self.messages += 1
+        if response.status_code != 200:
+            self.rejected += 1
+            return False
+        try:
+            replied_at = await asyncio.wait_for(self.recorder.replies[phone].get(), timeout=self.reply_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return False
+        self.latencies[step].append((replied_at - started) * 1000)
+        return True
+
+    async def converse(self, phone: str, script: List[tuple]) -> None:
+        for step, text in script:
+            if not await self.send(phone, step, text):
+                return
+
+    async def pair(self, shipper: str, driver: str, lane: tuple) -> None:
+        await self.converse(shipper, load_script(*lane))
+        await self.converse(driver, truck_script(*lane))
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99)
+    }
+
+
+async def run(phones: int, reply_timeout: float) -> Dict[str, Any]:
+    engine.echo = False
+    recorder = Recorder()
+    replies.send_message = replies.send_interactive = recorder.reply
+    notifier.send_message = batch_matcher.send_message = recorder.alert
+    probe = DatabaseProbe()
+
+    await startup_event()
+    stamp = int(time.time()) % 100_000
+    pairs = max(phones // 2, 1)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            load_run = LoadRun(client, recorder, reply_timeout)
+            round_trips_before = probe.round_trips
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                load_run.pair(f"9{stamp:05d}{2 * i:06d}", f"9{stamp:05d}{2 * i + 1:06d}", LANES[i % len(LANES)])
+                for i in range(pairs)
+            ))
+            elapsed = time.perf_counter() - started
+            round_trips = probe.round_trips - round_trips_before
+    finally:
+        await shutdown_event()
+        await engine.dispose()
+
+    answered = sum(len(samples) for samples in load_run.latencies.values())
+    return {
+        "phones": pairs * 2,
+        "messages": load_run.messages,
+        "answered": answered,
+        "timeouts": load_run.timeouts,
+        "rejected": load_run.rejected,
+        "alerts": recorder.alerts,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_msg_s": round(answered / elapsed, 1) if elapsed else 0.0,
+        "db_round_trips_per_message": round(round_trips / max(load_run.messages, 1), 2),
+        "pool_checkout_ms": {**summarize(probe.checkout_ms), "total_ms": round(sum(probe.checkout_ms), 1)},
+        "overall": summarize([ms for samples in load_run.latencies.values() for ms in samples]),
+        "steps": {step: summarize(samples) for step, samples in sorted(load_run.latencies.items())}
+    }
+
+
+def regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    found = []
+
+    def latency(label: str, current: Optional[float], base: Optional[float]) -> None:
+        if current is not None and base is not None and current > base * (1 + tolerance) + LATENCY_SLACK_MS:
+            found.append(f"{label}: {current} ms (baseline {base} ms)")
+
+    for key in ("p95_ms", "p99_ms"):
+        latency(f"overall {key}", report["overall"][key], baseline["overall"][key])
+        latency(f"pool checkout {key}", report["pool_checkout_ms"][key], baseline["pool_checkout_ms"][key])
+    for step, stats in report["steps"].items():
+        if step in baseline["steps"]:
+            latency(f"{step} p95_ms", stats["p95_ms"], baseline["steps"][step]["p95_ms"])
+    if report["db_round_trips_per_message"] > baseline["db_round_trips_per_message"] * (1 + tolerance):
+        found.append(
+            f"db round trips/message: {report['db_round_trips_per_message']} "
+            f"(baseline {baseline['db_round_trips_per_message']})"
+        )
+    if report["throughput_msg_s"] < baseline["throughput_msg_s"] * (1 - tolerance):
+        found.append(f"throughput: {report['throughput_msg_s']} msg/s (baseline {baseline['throughput_msg_s']})")
+    if report["timeouts"] or report["rejected"]:
+        found.append(f"{report['timeouts']} reply timeout(s), {report['rejected']} rejected webhook(s)")
+    return found
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['phones']} phones, {report['messages']} messages in {report['elapsed_s']} s: "
+        f"{report['throughput_msg_s']} msg/s, {report['timeouts']} timeouts, {report['alerts']} alerts"
+    )
+    print(f"db round trips/message {report['db_round_trips_per_message']}, pool checkout {report['pool_checkout_ms']}")
+    print(f"{'step':28s} {'count':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for step, stats in [("overall", report["overall"])] + list(report["steps"].items()):
+        print(f"{step:28s} {stats['count']:6d} {stats['p50_ms'] or 0:8.1f} {stats['p95_ms'] or 0:8.1f} {stats['p99_ms'] or 0:8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phones", type=int, default=50, help="simulated phones; pairs run concurrently, so phones/2 conversations at once")
+    parser.add_argument("--reply-timeout", type=float, default=30.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.phones, args.reply_timeout))
+    print_report(report)
+
+    if args.write_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --write-baseline first")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("phones") != report["phones"]:
+        print(f"warning: baseline was recorded with {baseline.get('phones')} phones")
+    found = regressions(report, baseline, args.tolerance)
+    for line in found:
+        print(f"REGRESSION {line}")
+    if found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+CPU time per message spent in handle_conversation, for each conversation step.
+
+Session storage and sending are replaced by in-memory stand-ins, so the numbers are
+the engine's own dispatch, validation and formatting work. The final steps of
+post_truck/post_load (which create rows) and CONFIRM are not covered.
+
+    python scripts/bench_conversation_steps.py --iterations 20000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.whatsapp.conversation_engine as conversation_engine  # noqa: E402
+import app.whatsapp.replies as replies  # noqa: E402
+from app.services.session_cache import CachedSession  # noqa: E402
+from app.whatsapp.match_store import matches_for_post, pending_matches  # noqa: E402
+
+PHONE = "919000000001"
+TOMORROW = (datetime.utcnow() + timedelta(days=1)).strftime("%d-%m-%Y")
+
+# (label, session as (flow, step, data) or None, message)
+SCENARIOS = [
+    ("idle: help", None, "help"),
+    ("idle: post truck", None, "post truck"),
+    ("idle: book 1", None, "book 1"),
+    ("idle: unknown text", None, "hello there"),
+    ("post_truck/pickup_city", ("post_truck", "pickup_city", {}), "Jaipur"),
+    ("post_truck/drop_city", ("post_truck", "drop_city", {"pickup_city": "Jaipur"}), "Delhi"),
+    ("post_truck/capacity_tons", ("post_truck", "capacity_tons", {}), "20"),
+    ("post_truck/capacity_tons bad", ("post_truck", "capacity_tons", {}), "lots"),
+    ("post_truck/available_date bad", ("post_truck", "available_date", {}), "tomorrow"),
+    ("post_load/weight_tons", ("post_load", "weight_tons", {}), "12"),
+    ("post_load/category", ("post_load", "category", {}), "General"),
+    ("booking/confirm_booking other", ("booking", "confirm_booking", {}), "maybe"),
+    ("any flow: cancel", ("post_load", "category", {}), "cancel"),
+]
+
+
+class InMemorySessions:
+    """Stands in for conversation_service with the same calls the engine makes."""
+
+    def __init__(self):
+        self.sessions = {}
+
+    def set(self, phone, state) -> None:
+        if state is None:
+            self.sessions.pop(phone, None)
+        else:
+            flow, step, data = state
+            self.sessions[phone] = CachedSession(phone, flow, step, dict(data), datetime.utcnow())
+
+    async def get_active_session(self, db, phone_number):
+        return self.sessions.get(phone_number)
+
+    async def start_session(self, db, phone_number, flow, step, data=None, commit=True):
+        self.set(phone_number, (flow, step, data or {}))
+
+    async def update_step(self, db, phone_number, step, new_data, commit=True):
+        session = self.sessions[phone_number]
+        session.current_step = step
+        session.collected_data.update(new_data)
+
+    async def clear_session(self, db, phone_number, commit=True):
+        self.sessions.pop(phone_number, None)
+
+
+async def discard_message(phone: str, content) -> None:
+    return None
+
+
+async def skip_commit(db) -> None:
+    return None
+
+
+async def bench(iterations: int) -> None:
+    sessions = InMemorySessions()
+    conversation_engine.conversation_service = sessions
+    replies.send_message = replies.send_interactive = discard_message
+    conversation_engine.commit_unit = skip_commit
+    await pending_matches.put(PHONE, matches_for_post("truck", uuid.uuid4(), [(uuid.uuid4(), "20 tons - A -> B")]))
+    handle = conversation_engine.handle_conversation
+
+    print(f"{'step':34s} {'us/message':>10s}")
+    for label, state, text in SCENARIOS:
+        # Warm up caches (city resolver, pydantic) before timing
+        for _ in range(50):
+            sessions.set(PHONE, state)
+            await handle(PHONE, text, None)
+        elapsed = 0.0
+        for _ in range(iterations):
+            sessions.set(PHONE, state)
+            started = time.process_time()
+            await handle(PHONE, text, None)
+            elapsed += time.process_time() - started
+        print(f"{label:34s} {elapsed / iterations * 1e6:10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    # Log formatting is measured separately; keep it out of the engine numbers
+    logging.disable(logging.CRITICAL)
+    asyncio.run(bench(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
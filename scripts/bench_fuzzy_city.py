@@ -0,0 +1,78 @@
+"""
+Fuzzy city resolution latency over a synthetic 10k-city list.
+
+    python scripts/bench_fuzzy_city.py --cities 10000 --queries 5000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.geocoding.fuzzy import CityResolver  # noqa: E402
+
+SYLLABLES = [
+    "ja", "pur", "ba", "nag", "ar", "ga", "bad", "ab", "har", "ko", "ta", "ma", "li", "ra", "sh",
+    "wa", "ri", "dh", "an", "ka", "la", "ne", "ur", "pa", "ti", "gu", "da", "mo", "si", "vi"
+]
+
+
+def make_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def typo(rng: random.Random, name: str) -> str:
+    chars = list(name.lower())
+    op = rng.choice(["drop", "swap", "replace", "suffix"])
+    i = rng.randrange(len(chars))
+    if op == "drop" and len(chars) > 4:
+        del chars[i]
+    elif op == "swap" and i < len(chars) - 1:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    elif op == "replace":
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    else:
+        return name.upper() + " CITY"
+    return "".join(chars)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = set()
+    while len(names) < args.cities:
+        names.add(make_name(rng))
+    names = sorted(names)
+
+    resolver = CityResolver()
+    started = time.perf_counter()
+    resolver.build((name, name) for name in names)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    correct = 0
+    for _ in range(args.queries):
+        target = rng.choice(names)
+        query = typo(rng, target)
+        t0 = time.perf_counter()
+        result = resolver.resolve(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        correct += bool(result and result.name == target)
+
+    latencies.sort()
+    print(f"cities indexed      : {len(resolver)} in {build_ms:.1f} ms")
+    print(f"queries             : {args.queries}")
+    print(f"resolved to target  : {correct / args.queries:.1%}")
+    print(f"latency p50 / p99   : {statistics.median(latencies):.3f} ms / {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
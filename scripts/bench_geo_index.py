@@ -0,0 +1,117 @@
+"""
+Radius query latency of the geo index over synthetic open trucks.
+
+Trucks and load queries are drawn from the same set of lanes between gazetteer
+cities, with lane popularity skewed the way real posting volume is, so queries
+return realistic candidate counts instead of mostly probing empty grid cells.
+
+    python scripts/bench_geo_index.py --trucks 100000 --queries 2000
+"""
+import argparse
+import csv
+import itertools
+import math
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.geocoding.gazetteer import GAZETTEER_PATH  # noqa: E402
+from app.matching.geo_index import GeoIndex, KM_PER_DEGREE_LAT  # noqa: E402
+
+# Posts are geocoded to a city but drivers and shippers are spread around it
+JITTER_KM = 15.0
+MIN_LANE_KM = 150.0
+
+
+def load_cities():
+    with open(GAZETTEER_PATH, newline="", encoding="utf-8") as f:
+        return [(float(row["lat"]), float(row["lng"])) for row in csv.DictReader(f)]
+
+
+def build_lanes(rng: random.Random, cities, count: int, skew: float):
+    """count distinct city pairs, weighted so a few trunk lanes carry most of the volume."""
+    # The gazetteer lists the largest cities first
+    city_weights = [1.0 / (rank ** skew) for rank in range(1, len(cities) + 1)]
+    lanes = set()
+    while len(lanes) < count:
+        src, dst = rng.choices(range(len(cities)), weights=city_weights, k=2)
+        lat1, lng1 = cities[src]
+        lat2, lng2 = cities[dst]
+        if math.hypot(lat1 - lat2, (lng1 - lng2) * math.cos(math.radians(lat1))) * KM_PER_DEGREE_LAT >= MIN_LANE_KM:
+            lanes.add((src, dst))
+    lanes = sorted(lanes)
+    rng.shuffle(lanes)
+    lane_weights = [1.0 / (rank ** skew) for rank in range(1, len(lanes) + 1)]
+    return lanes, list(itertools.accumulate(lane_weights))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trucks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--lanes", type=int, default=2_000)
+    parser.add_argument("--skew", type=float, default=0.8, help="Zipf exponent of city and lane popularity")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--radius-km", type=float, default=50.0)
+    parser.add_argument("--cell-deg", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    base = datetime(2026, 11, 1)
+    cities = load_cities()
+    lanes, cum_weights = build_lanes(rng, cities, args.lanes, args.skew)
+    jitter_deg = JITTER_KM / KM_PER_DEGREE_LAT / 2
+
+    def near(city_row: int):
+        lat, lng = cities[city_row]
+        return lat + rng.gauss(0, jitter_deg), lng + rng.gauss(0, jitter_deg)
+
+    def on_lane():
+        src, dst = rng.choices(lanes, cum_weights=cum_weights)[0]
+        return near(src), near(dst)
+
+    index = GeoIndex(args.cell_deg)
+    started = time.perf_counter()
+    for _ in range(args.trucks):
+        src, dst = on_lane()
+        truck = SimpleNamespace(
+            id=uuid.uuid4(),
+            source_lat=src[0], source_lng=src[1], dest_lat=dst[0], dest_lng=dst[1],
+            capacity_available=rng.choice([10.0, 20.0, 30.0]),
+            departure_time=base + timedelta(hours=rng.randint(0, 24 * args.days))
+        )
+        index.add_truck(truck, truck)
+    build_s = time.perf_counter() - started
+
+    latencies = []
+    hits = []
+    for _ in range(args.queries):
+        pickup, drop = on_lane()
+        load = SimpleNamespace(
+            pickup_lat=pickup[0], pickup_lng=pickup[1], drop_lat=drop[0], drop_lng=drop[1],
+            weight=rng.uniform(1, 30), deadline=base + timedelta(hours=rng.randint(0, 24 * args.days))
+        )
+        t0 = time.perf_counter()
+        hits.append(len(index.trucks_near_load(load, args.radius_km)))
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    latencies.sort()
+    hits.sort()
+    print(f"trucks indexed      : {len(index.trucks)} in {build_s:.2f}s")
+    print(f"lanes               : {len(lanes)} between {len(cities)} gazetteer cities (skew {args.skew})")
+    print(f"queries             : {args.queries} (radius {args.radius_km} km, cell {args.cell_deg} deg)")
+    print(f"matches/query       : avg {sum(hits) / len(hits):.1f}, p50 {statistics.median(hits):.0f}, "
+          f"p90 {hits[int(len(hits) * 0.9) - 1]}, empty {sum(1 for h in hits if h == 0) / len(hits):.0%}")
+    print(f"latency p50 / p99   : {statistics.median(latencies):.3f} ms / {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
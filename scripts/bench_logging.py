@@ -0,0 +1,124 @@
+"""
+Logging cost per inbound message on the caller (event loop) side: the old
+synchronous StreamHandler + json.dumps against the queued pipeline, with and
+without sampling. Each message logs what a "post truck" delivery does:
+incoming_webhook (full payload), message_parsed and session_started.
+
+    python scripts/bench_logging.py --messages 20000 --output /tmp/bench.log
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Room for every record, so the comparison measures the caller rather than drops
+os.environ.setdefault("LOG_QUEUE_SIZE", "200000")
+
+import app.whatsapp.logger as logger_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.whatsapp.logger import log_event  # noqa: E402
+
+
+def webhook_payload(i: int) -> dict:
+    phone = f"91{9000000000 + i}"
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "102290129340398",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "15550783881", "phone_number_id": "106540352242922"},
+                    "contacts": [{"profile": {"name": "Driver"}, "wa_id": phone}],
+                    "messages": [{
+                        "from": phone,
+                        "id": f"wamid.HBgLMTY1MDM4Nzk0MzkVAgASGBQzQTRBNjU5OUFFRTAzODEwMTQ0RgA{i:08d}=",
+                        "timestamp": "1749416383",
+                        "type": "text",
+                        "text": {"body": "post truck"}
+                    }]
+                }
+            }]
+        }]
+    }
+
+
+def legacy_logger(path: str) -> logging.Logger:
+    legacy = logging.getLogger("bench_legacy")
+    legacy.setLevel(logging.INFO)
+    legacy.propagate = False
+    handler = logging.StreamHandler(open(path, "a"))
+    handler.setFormatter(logger_module.formatter)
+    legacy.addHandler(handler)
+    return legacy
+
+
+def run_legacy(legacy: logging.Logger, payloads) -> float:
+    started = time.perf_counter()
+    for data in payloads:
+        phone = data["entry"][0]["changes"][0]["value"]["messages"][0]["from"]
+        legacy.info(json.dumps({"action": "incoming_webhook", "payload": data}))
+        legacy.info(json.dumps({"action": "message_parsed", "phone": phone, "text": "post truck"}))
+        legacy.info(json.dumps({"action": "session_started", "phone": phone, "flow": "post_truck", "step": "pickup_city"}))
+    return time.perf_counter() - started
+
+
+def run_pipeline(payloads) -> float:
+    started = time.perf_counter()
+    for data in payloads:
+        phone = data["entry"][0]["changes"][0]["value"]["messages"][0]["from"]
+        log_event("incoming_webhook", payload=data)
+        log_event("message_parsed", phone=phone, text="post truck")
+        log_event("session_started", phone=phone, flow="post_truck", step="pickup_city")
+    return time.perf_counter() - started
+
+
+def wait_drained(timeout: float = 120.0) -> float:
+    started = time.perf_counter()
+    handler = logger_module.queue_handler
+    while handler is not None and handler.queue.qsize() and time.perf_counter() - started < timeout:
+        time.sleep(0.005)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--output", default=None, help="log file (default: a temporary file)")
+    args = parser.parse_args()
+    if logger_module.queue_handler is None:
+        sys.exit("LOG_QUEUE_ENABLED is off; nothing to compare")
+
+    path = args.output or tempfile.mkstemp(suffix=".log")[1]
+    # Point the pipeline's writer at the same file as the legacy handler
+    file_handler = logging.StreamHandler(open(path, "a"))
+    file_handler.setFormatter(logger_module.formatter)
+    logger_module.listener.handlers = (file_handler,)
+
+    payloads = [webhook_payload(i) for i in range(args.messages)]
+    per_message = lambda seconds: seconds / args.messages * 1e6  # noqa: E731
+    default_rates = dict(settings.LOG_SAMPLE_RATES)
+
+    print(f"{args.messages} messages, 3 log lines each, encoder={logger_module.log_stats()['encoder']}, output {path}")
+    elapsed = run_legacy(legacy_logger(path), payloads)
+    print(f"  sync StreamHandler + json.dumps : {per_message(elapsed):7.1f} us/message on the caller")
+
+    for label, rates in (("queued, no sampling", {}), (f"queued, sampling {default_rates}", default_rates)):
+        settings.LOG_SAMPLE_RATES = rates
+        elapsed = run_pipeline(payloads)
+        drained = wait_drained()
+        print(f"  {label:31s}: {per_message(elapsed):7.1f} us/message on the caller, writer done {drained * 1000:.0f} ms later")
+
+    print(f"  dropped by full queue: {logger_module.log_stats()['dropped']}")
+    if not args.output:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
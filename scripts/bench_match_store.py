@@ -0,0 +1,86 @@
+"""
+Memory held by the in-process pending-match store per 100k active users, against
+the plain dict-of-dicts layout it replaced.
+
+    python scripts/bench_match_store.py --users 100000 --matches 5
+"""
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.whatsapp.match_store import MemoryMatchStore, matches_for_post  # noqa: E402
+
+DETAILS = "12.5 tons - Jaipur -> Delhi - 21-10-2026"
+
+
+def make_users(users: int, matches: int):
+    for i in range(users):
+        phone = f"91{9000000000 + i}"
+        my_id = uuid.uuid4()
+        yield phone, my_id, [(uuid.uuid4(), DETAILS[:-2] + f"{i % 100:02d}") for _ in range(matches)]
+
+
+def measure(fill) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = fill()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return used
+
+
+def fill_dicts(users: int, matches: int):
+    store = {}
+    for phone, my_id, counterparts in make_users(users, matches):
+        store[phone] = {
+            "type": "truck",
+            "my_id": str(my_id),
+            "matches": [{"id": str(m), "details": d, "my_id": str(my_id), "my_type": "truck"} for m, d in counterparts]
+        }
+    return store
+
+
+def fill_store(users: int, matches: int):
+    store = MemoryMatchStore()
+
+    async def run():
+        for phone, my_id, counterparts in make_users(users, matches):
+            await store.put(phone, matches_for_post("truck", my_id, counterparts))
+    asyncio.run(run())
+    return store
+
+
+def fill_baseline(users: int, matches: int):
+    # Phones and detail strings alone, which both layouts have to keep
+    return [(phone, [d for _, d in counterparts]) for phone, _, counterparts in make_users(users, matches)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--matches", type=int, default=5)
+    args = parser.parse_args()
+    settings.PENDING_MATCH_MAX_USERS = args.users
+
+    scale = 100_000 / args.users
+    baseline = measure(lambda: fill_baseline(args.users, args.matches))
+    print(f"{args.users} users x {args.matches} matches; MiB per 100k users (phones + detail text alone: {baseline * scale / 2**20:.1f})")
+    for name, fill in (("dict of dicts", fill_dicts), ("MemoryMatchStore", fill_store)):
+        started = time.perf_counter()
+        used = measure(lambda: fill(args.users, args.matches))
+        print(f"  {name:17s} {used * scale / 2**20:7.1f} MiB  ({used / args.users:.0f} B/user, fill {time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
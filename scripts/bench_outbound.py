@@ -0,0 +1,118 @@
+"""
+Outbound throughput and event-loop stall: inline blocking sends vs the queued sender,
+against the local fake Graph API (started here as a subprocess). Needs
+requirements-bench.txt for pywa.
+
+    python scripts/bench_outbound.py --messages 500 --phones 100 --latency-ms 80
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def pywa_client(port: int):
+    """The original blocking pywa client, pointed at the fake server."""
+    import httpx
+    from pywa import WhatsApp
+
+    session = httpx.Client(timeout=10.0)
+    wa = WhatsApp(phone_id=os.environ["WHATSAPP_PHONE_NUMBER_ID"], token=os.environ["WHATSAPP_TOKEN"], session=session)
+    session.base_url = str(session.base_url).replace("https://graph.facebook.com", f"http://127.0.0.1:{port}")
+    return wa
+
+
+async def loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01) -> None:
+    """Records how late a 10 ms ticker wakes up: the time the loop was blocked."""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+async def measure(label: str, run, messages: int) -> None:
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(loop_lag(stop, lags))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    lags.sort()
+    worst = lags[-1] if lags else 0.0
+    print(f"{label:<8} {messages / elapsed:8.1f} msg/s   {elapsed:6.2f}s   max loop stall {worst:7.1f} ms")
+
+
+async def bench(args) -> None:
+    from app.whatsapp.outbound import outbound_sender
+
+    wa = pywa_client(args.port)
+
+    phones = [f"9199{i:08d}" for i in range(args.phones)]
+    texts = [(phones[i % len(phones)], f"bench message {i}") for i in range(args.messages)]
+
+    async def inline():
+        # The previous send_message: pywa's blocking call straight on the event loop
+        failed = 0
+        for phone, text in texts:
+            try:
+                wa.send_message(to=phone, text=text)
+            except Exception:
+                failed += 1
+        print(f"inline sends failed (no retries): {failed}")
+
+    async def queued():
+        outbound_sender.start(args.workers)
+        for phone, text in texts:
+            await outbound_sender.enqueue(phone, text)
+        await outbound_sender.drain()
+
+    if not args.skip_inline:
+        await measure("inline", inline, len(texts))
+    await measure("queued", queued, len(texts))
+    stats = outbound_sender.stats()
+    print(f"queued sends: p50 {stats['send_ms_p50']} ms, p99 {stats['send_ms_p99']} ms, "
+          f"retried {stats['retried']}, failed {stats['failed']}")
+    await outbound_sender.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--phones", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0.0, help="token bucket rate, 0 = unlimited")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--skip-inline", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "WHATSAPP_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "WHATSAPP_PHONE_NUMBER_ID": "100000000000001",
+        "WHATSAPP_TOKEN": "bench",
+        "OUTBOUND_RATE_PER_SECOND": str(args.rate),
+        "OUTBOUND_RETRY_BASE_SECONDS": "0.05",
+    })
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "scripts" / "fake_graph_api.py"), "--port", str(args.port),
+        "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate)
+    ])
+    try:
+        time.sleep(1.5)
+        asyncio.run(bench(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
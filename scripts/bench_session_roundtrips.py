@@ -0,0 +1,94 @@
+"""
+Database round trips per message for the conversation-state calls of a scripted
+post_truck flow, with the session cache off and on. Needs the app database
+(DATABASE_* settings) migrated to head.
+
+    python scripts/bench_session_roundtrips.py --users 50
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import engine, AsyncSessionLocal  # noqa: E402
+from app.services.conversation_service import conversation_service  # noqa: E402
+
+# (step answered, next step, data stored) for each message after "post truck"
+POST_TRUCK_TURNS = [
+    ("pickup_city", "drop_city", {"pickup_city": "Jaipur", "pickup_lat": 26.91, "pickup_lng": 75.79}),
+    ("drop_city", "capacity_tons", {"drop_city": "Delhi", "drop_lat": 28.61, "drop_lng": 77.21}),
+    ("capacity_tons", "available_date", {"capacity_tons": 20}),
+]
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args) -> None:
+        self.statements += 1
+
+    def _on_commit(self, *args) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = self.commits = 0
+
+
+async def run_flow(phone: str) -> int:
+    """One user's post_truck conversation, as handle_conversation drives the service. Returns messages."""
+    messages = 0
+    async with AsyncSessionLocal() as db:
+        # "post truck"
+        await conversation_service.get_active_session(db, phone)
+        await conversation_service.start_session(db, phone, flow="post_truck", step="pickup_city")
+        messages += 1
+        for _, next_step, data in POST_TRUCK_TURNS:
+            await conversation_service.get_active_session(db, phone)
+            await conversation_service.update_step(db, phone, step=next_step, new_data=data)
+            messages += 1
+        # date: the truck is created and the session cleared
+        await conversation_service.get_active_session(db, phone)
+        await conversation_service.clear_session(db, phone)
+        messages += 1
+    return messages
+
+
+async def bench(users: int) -> None:
+    counter = RoundTripCounter()
+    for enabled in (False, True):
+        settings.CONVERSATION_CACHE_ENABLED = enabled
+        counter.reset()
+        started = time.perf_counter()
+        messages = 0
+        for i in range(users):
+            messages += await run_flow(f"bench{int(time.time())}{i:05d}")
+        elapsed = time.perf_counter() - started
+        per_message = (counter.statements + counter.commits) / messages
+        print(
+            f"cache {'on ' if enabled else 'off'}: {counter.statements / messages:.2f} statements + "
+            f"{counter.commits / messages:.2f} commits = {per_message:.2f} round trips/message, "
+            f"{elapsed / messages * 1000:.2f} ms/message"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    engine.echo = False
+    asyncio.run(bench(args.users))
+
+
+if __name__ == "__main__":
+    main()
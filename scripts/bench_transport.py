@@ -0,0 +1,102 @@
+"""
+Per-send latency of the two Graph transports (WHATSAPP_TRANSPORT=threads, the default,
+and async) and of the original pywa path, against the local fake Graph API.
+Needs requirements-bench.txt for pywa.
+
+    python scripts/bench_transport.py --messages 1000 --concurrency 16 --latency-ms 40
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def report(label: str, latencies: list, elapsed: float, cpu: float) -> None:
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(
+        f"{label:<14} p50 {statistics.median(latencies):7.2f} ms   p99 {p99:7.2f} ms   "
+        f"{len(latencies) / elapsed:7.1f} msg/s   client cpu {cpu / len(latencies) * 1e6:6.0f} us/msg"
+    )
+
+
+async def run_concurrent(send, messages: int, concurrency: int) -> None:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            await send(f"9199{i % 500:08d}", f"bench message {i}")
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    return latencies, time.perf_counter() - started, time.process_time() - cpu_started
+
+
+async def bench(args) -> None:
+    import httpx
+    from pywa import WhatsApp
+    from app.whatsapp.transport import GraphTransport, ThreadedGraphTransport, HTTP2_AVAILABLE
+
+    session = httpx.Client(timeout=10.0)
+    wa = WhatsApp(phone_id=os.environ["WHATSAPP_PHONE_NUMBER_ID"], token=os.environ["WHATSAPP_TOKEN"], session=session)
+    session.base_url = str(session.base_url).replace("https://graph.facebook.com", os.environ["WHATSAPP_API_BASE_URL"])
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def pywa_send(phone: str, text: str) -> None:
+        await loop.run_in_executor(executor, lambda: wa.send_message(to=phone, text=text))
+
+    threaded, pooled = ThreadedGraphTransport(), GraphTransport()
+    paths = [("threads", threaded.send_text), ("async pooled", pooled.send_text), ("pywa+threads", pywa_send)]
+    # Warm every path so connection setup is not in the numbers
+    for _, send in paths:
+        await run_concurrent(send, args.concurrency, args.concurrency)
+    for _ in range(args.rounds):
+        for label, send in paths:
+            report(label, *await run_concurrent(send, args.messages, args.concurrency))
+    print(f"(http2 available: {HTTP2_AVAILABLE}; the fake server speaks HTTP/1.1)")
+    await threaded.close()
+    await pooled.close()
+    executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--rounds", type=int, default=2, help="alternate the paths to even out noise")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "WHATSAPP_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "WHATSAPP_PHONE_NUMBER_ID": "100000000000001",
+        "WHATSAPP_TOKEN": "bench",
+        "OUTBOUND_WORKERS": str(args.concurrency),
+    })
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "scripts" / "fake_graph_api.py"), "--port", str(args.port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", "5"
+    ])
+    try:
+        time.sleep(1.5)
+        asyncio.run(bench(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Outbound request count per conversation turn: drives post_truck, post_load,
+MORE and BOOK/CONFIRM conversations through handle_conversation and fails when
+any turn makes more than one Graph API request. "parts" is what the turn said, i.e. the
+separate sends it used to make.
+
+Sessions, services and matching are in-memory stand-ins (no database needed);
+sends are recorded instead of queued.
+
+    python scripts/check_replies_per_turn.py [--text-only] [--show]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.whatsapp.conversation_engine as conversation_engine  # noqa: E402
+import app.whatsapp.replies as replies  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.matching.engine import MatchPage  # noqa: E402
+from bench_conversation_steps import InMemorySessions  # noqa: E402
+
+DATE = (datetime.utcnow() + timedelta(days=2)).strftime("%d-%m-%Y")
+DEPARTURE = datetime.utcnow() + timedelta(days=2)
+
+CONVERSATIONS = [
+    ("post_truck", "919000000101", [
+        "help", "more", "post truck", "Jaipur", "Delhi", "20", DATE, "book 9", "more", "book 5", "confirm", "more", "book 1", "confirm"
+    ]),
+    ("post_load", "919000000102", ["post load", "Jaipur", "Delhi", "12", "General", "tomorrow", DATE, "more", "book 1", "cancel"]),
+]
+
+
+def fake_load(weight: float, pickup: str = "Jaipur", drop: str = "Delhi"):
+    return SimpleNamespace(id=uuid.uuid4(), weight=weight, pickup_city=pickup, drop_city=drop, deadline=DEPARTURE)
+
+
+def fake_truck(capacity: float):
+    return SimpleNamespace(
+        id=uuid.uuid4(), capacity_total=capacity, capacity_available=capacity,
+        source_city="Jaipur", destination_city="Delhi", departure_time=DEPARTURE
+    )
+
+
+class Fakes:
+    """The services handle_conversation calls, answering like a busy lane would."""
+
+    def __init__(self):
+        self.loads = [fake_load(w) for w in (8.0, 6.0, 5.0, 4.0, 2.0)]
+        self.posts = {}
+        self.booked = {}
+
+    async def get(self, model, post_id):
+        return self.posts.get(post_id)
+
+    async def get_or_create_by_phone(self, db, phone, role, commit=True):
+        return uuid.uuid4()
+
+    async def create_truck_with_matches(self, db, obj_in, commit=True):
+        truck = fake_truck(obj_in.capacity_available)
+        self.posts[truck.id] = truck
+        return truck, MatchPage(self.loads[:3], after=(0.5, str(self.loads[2].id)))
+
+    async def create_load_with_matches(self, db, obj_in, commit=True):
+        load = fake_load(obj_in.weight)
+        self.posts[load.id] = load
+        return load, MatchPage([fake_truck(c) for c in (20.0, 15.0, 12.0)], after=(0.5, "0"))
+
+    async def find_loads_for_truck(self, db, truck, after=None):
+        # The second and last page; its first load was already listed for consolidation
+        return MatchPage(self.loads[3:])
+
+    async def find_trucks_for_load(self, db, load, after=None):
+        return MatchPage()
+
+    async def suggest_consolidation(self, db, truck):
+        # Two listed loads plus one more that fills the truck
+        return [self.loads[0], self.loads[1], self.loads[3]]
+
+    def find_trip_chains(self, truck):
+        return [SimpleNamespace(loads=[fake_load(10.0, "Delhi", "Agra")])]
+
+    async def get_by_pair(self, db, truck_id, load_id):
+        return self.booked.get((truck_id, load_id))
+
+    async def create_atomic_booking(self, db, truck_id, load_id, price, commit=True):
+        booking = self.booked[(truck_id, load_id)] = SimpleNamespace(id=uuid.uuid4())
+        return booking, None
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, phone: str, content) -> None:
+        self.sent.append(content)
+
+
+async def skip_commit(db) -> None:
+    return None
+
+
+def install(fakes: Fakes, recorder: Recorder) -> None:
+    conversation_engine.conversation_service = InMemorySessions()
+    conversation_engine.commit_unit = skip_commit
+    conversation_engine.user_service = SimpleNamespace(get_or_create_by_phone=fakes.get_or_create_by_phone)
+    conversation_engine.truck_service = SimpleNamespace(create_with_matches=fakes.create_truck_with_matches)
+    conversation_engine.load_service = SimpleNamespace(create_with_matches=fakes.create_load_with_matches)
+    conversation_engine.booking_service = SimpleNamespace(
+        get_by_pair=fakes.get_by_pair, create_atomic_booking=fakes.create_atomic_booking
+    )
+    conversation_engine.matching_engine = SimpleNamespace(
+        suggest_consolidation=fakes.suggest_consolidation, find_trip_chains=fakes.find_trip_chains,
+        find_loads_for_truck=fakes.find_loads_for_truck, find_trucks_for_load=fakes.find_trucks_for_load
+    )
+    replies.send_message = replies.send_interactive = recorder.send
+
+
+async def check(show: bool) -> int:
+    recorder = Recorder()
+    fakes = Fakes()
+    install(fakes, recorder)
+    db = SimpleNamespace(get=fakes.get)
+    failures = 0
+    for name, phone, messages in CONVERSATIONS:
+        for text in messages:
+            parts_before, sent_before = replies.reply_metrics["parts"], len(recorder.sent)
+            await conversation_engine.handle_conversation(phone, text, db)
+            parts = replies.reply_metrics["parts"] - parts_before
+            sent = recorder.sent[sent_before:]
+            ok = len(sent) <= 1
+            failures += not ok
+            kinds = ", ".join("list" if isinstance(content, dict) else "text" for content in sent)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:10s} {text!r:14s} {parts} part(s) -> {len(sent)} request(s) [{kinds}]")
+            if show and any(isinstance(content, dict) for content in sent):
+                print(json.dumps(sent, ensure_ascii=False, indent=2))
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--text-only", action="store_true", help="as with WHATSAPP_INTERACTIVE_LISTS=false")
+    parser.add_argument("--show", action="store_true", help="print the list messages")
+    args = parser.parse_args()
+    if args.text_only:
+        settings.WHATSAPP_INTERACTIVE_LISTS = False
+    logging.disable(logging.CRITICAL)
+    failures = asyncio.run(check(args.show))
+    if failures:
+        print(f"{failures} turn(s) made more than one request")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
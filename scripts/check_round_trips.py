@@ -0,0 +1,112 @@
+"""
+Round-trip regression check for the conversation engine: drives scripted
+post_truck and post_load conversations through handle_conversation against the
+app database and fails when a message needs more database round trips, or more
+than one commit, than its budget below. Replies are not sent.
+
+Needs the app database (DATABASE_* settings) migrated to head.
+
+    python scripts/check_round_trips.py
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event  # noqa: E402
+
+import app.whatsapp.conversation_engine as conversation_engine  # noqa: E402
+import app.whatsapp.replies as replies  # noqa: E402
+from app.db.session import engine, AsyncSessionLocal  # noqa: E402
+
+DATE = (datetime.utcnow() + timedelta(days=2)).strftime("%d-%m-%Y")
+
+# (message, round trip budget). Round trips count BEGIN, each statement and COMMIT/ROLLBACK.
+# The session cache is on, so only a phone's first message reads its session.
+POST_TRUCK = [
+    ("post truck", 4),    # BEGIN, session SELECT, upsert RETURNING, COMMIT
+    ("Jaipur", 3),        # BEGIN, UPDATE .. RETURNING, COMMIT
+    ("Delhi", 3),
+    ("20", 3),
+    # BEGIN, user upsert, up to two city lookups + inserts, truck INSERT,
+    # match query, session DELETE, consolidation query, COMMIT
+    (DATE, 11),
+]
+# The same phone again: user id and cities cached, so no user or city queries
+REPEAT_TRUCK = POST_TRUCK[:-1] + [(DATE, 6)]
+POST_LOAD = [
+    ("post load", 4),
+    ("Jaipur", 3),
+    ("Delhi", 3),
+    ("12", 3),
+    ("General", 3),
+    (DATE, 10),
+]
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.round_trips = 0
+        self.commits = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "begin", self._on_round_trip)
+        event.listen(sync_engine, "before_cursor_execute", self._on_round_trip)
+        event.listen(sync_engine, "rollback", self._on_round_trip)
+        event.listen(sync_engine, "commit", self._on_commit)
+
+    def _on_round_trip(self, *args) -> None:
+        self.round_trips += 1
+
+    def _on_commit(self, *args) -> None:
+        self.round_trips += 1
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.round_trips = self.commits = 0
+
+
+async def discard_message(phone: str, content) -> None:
+    return None
+
+
+async def run_flow(counter: RoundTripCounter, name: str, phone: str, script) -> int:
+    failures = 0
+    for text, budget in script:
+        counter.reset()
+        async with AsyncSessionLocal() as db:
+            await conversation_engine.handle_conversation(phone, text, db)
+        ok = counter.round_trips <= budget and counter.commits <= 1
+        failures += not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {name:10s} {text!r:14s} "
+            f"{counter.round_trips:2d} round trips (budget {budget}), {counter.commits} commit(s)"
+        )
+    return failures
+
+
+async def check() -> int:
+    counter = RoundTripCounter()
+    replies.send_message = replies.send_interactive = discard_message
+    stamp = int(time.time()) % 10_000_000
+    failures = await run_flow(counter, "post_truck", f"91{stamp:08d}01", POST_TRUCK)
+    failures += await run_flow(counter, "again", f"91{stamp:08d}01", REPEAT_TRUCK)
+    failures += await run_flow(counter, "post_load", f"91{stamp:08d}02", POST_LOAD)
+    await engine.dispose()
+    return failures
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.strip().splitlines()[0]).parse_args()
+    engine.echo = False
+    failures = asyncio.run(check())
+    if failures:
+        print(f"{failures} message(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
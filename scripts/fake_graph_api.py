@@ -0,0 +1,68 @@
+"""
+Local stand-in for the WhatsApp Cloud (Graph) API messages endpoint, for exercising
+the outbound sender without touching Meta.
+
+    python scripts/fake_graph_api.py --port 8999 --latency-ms 80 --error-rate 0.05
+
+Point the app at it with WHATSAPP_API_BASE_URL=http://127.0.0.1:8999. Failures are
+split between 429 throttling and 500s, both in Graph's error format. GET /stats
+returns request counts.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float) -> FastAPI:
+    app = FastAPI()
+    counts = {"requests": 0, "accepted": 0, "throttled": 0, "errors": 0}
+    message_ids = itertools.count(1)
+
+    @app.post("/{version}/{phone_id}/messages")
+    async def send(version: str, phone_id: str, request: Request):
+        counts["requests"] += 1
+        body = await request.json()
+        await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+        if random.random() < error_rate:
+            if random.random() < 0.5:
+                counts["throttled"] += 1
+                return JSONResponse(status_code=429, content={"error": {
+                    "message": "(#130429) Rate limit hit", "type": "OAuthException", "code": 130429
+                }})
+            counts["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {
+                "message": "Service temporarily unavailable", "type": "OAuthException", "code": 2, "is_transient": True
+            }})
+        counts["accepted"] += 1
+        return {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": body.get("to"), "wa_id": body.get("to")}],
+            "messages": [{"id": f"wamid.FAKE{next(message_ids):012d}"}]
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()